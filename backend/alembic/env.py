@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.config import settings
 from app.database import Base
-from app.models import User, StudySession, ConversationMessage, TutorMemory, Question, UserResponse  # noqa: F401
+from app.models import User, StudySession, ConversationMessage, TutorMemory, Question, UserResponse, QuestionCursor, TaxonomyNode  # noqa: F401
 
 config = context.config
 
@@ -16,18 +16,28 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # FTS5 indexes and their shadow tables are managed by hand-written migrations
+    return not (type_ == "table" and reflected and compare_to is None and "_fts" in name)
+
+
 def run_migrations_offline() -> None:
     context.configure(
         url=settings.DATABASE_URL,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
 
 
 def do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,74 @@
+"""add questions_fts search index
+
+Revision ID: 0a9d53c8e6f1
+Revises: f2b67d0e9c13
+Create Date: 2026-10-16 22:44:19.913254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9d53c8e6f1'
+down_revision: Union[str, None] = 'f2b67d0e9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# questions_fts DDL as of this revision, frozen so replaying it always
+# creates the same index (app.models.fts holds the current definitions)
+QUESTION_FTS_CREATE = [
+    """
+    CREATE VIEW questions_fts_source AS
+    SELECT id, stem, passage, concepts_tested AS concepts FROM questions
+    """,
+    """
+    CREATE VIRTUAL TABLE questions_fts USING fts5(
+        stem, passage, concepts,
+        content='questions_fts_source', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO questions_fts(rowid, stem, passage, concepts)
+        VALUES (new.id, new.stem, new.passage, new.concepts_tested);
+    END
+    """,
+    """
+    CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN
+        INSERT INTO questions_fts(questions_fts, rowid, stem, passage, concepts)
+        VALUES ('delete', old.id, old.stem, old.passage, old.concepts_tested);
+    END
+    """,
+    """
+    CREATE TRIGGER questions_fts_update
+    AFTER UPDATE OF stem, passage, concepts_tested ON questions BEGIN
+        INSERT INTO questions_fts(questions_fts, rowid, stem, passage, concepts)
+        VALUES ('delete', old.id, old.stem, old.passage, old.concepts_tested);
+        INSERT INTO questions_fts(rowid, stem, passage, concepts)
+        VALUES (new.id, new.stem, new.passage, new.concepts_tested);
+    END
+    """,
+]
+
+QUESTION_FTS_DROP = [
+    "DROP TABLE IF EXISTS questions_fts",
+    "DROP VIEW IF EXISTS questions_fts_source",
+]
+
+
+def upgrade() -> None:
+    for statement in QUESTION_FTS_CREATE:
+        op.execute(statement)
+    # Index the questions that already exist
+    op.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for trigger in ("insert", "delete", "update"):
+        op.execute(f"DROP TRIGGER IF EXISTS questions_fts_{trigger}")
+    for statement in QUESTION_FTS_DROP:
+        op.execute(statement)
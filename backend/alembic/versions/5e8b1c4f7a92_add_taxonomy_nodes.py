@@ -0,0 +1,308 @@
+"""add taxonomy_nodes and question topic ids
+
+Revision ID: 5e8b1c4f7a92
+Revises: 0a9d53c8e6f1
+Create Date: 2026-10-16 23:18:41.220587
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b1c4f7a92'
+down_revision: Union[str, None] = '0a9d53c8e6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The taxonomy as of this revision, frozen so replaying it always seeds the
+# same ids: (id, parent_id, level, name)
+SEED_ROWS = [
+    (1, None, 'section', 'Chemical and Physical Foundations of Biological Systems'),
+    (2, 1, 'topic', 'General Chemistry'),
+    (3, 2, 'subtopic', 'Atomic Structure'),
+    (4, 2, 'subtopic', 'Periodic Table Trends'),
+    (5, 2, 'subtopic', 'Bonding and Chemical Interactions'),
+    (6, 2, 'subtopic', 'Stoichiometry'),
+    (7, 2, 'subtopic', 'Thermodynamics and Thermochemistry'),
+    (8, 2, 'subtopic', 'Kinetics'),
+    (9, 2, 'subtopic', 'Equilibrium'),
+    (10, 2, 'subtopic', 'Acids and Bases'),
+    (11, 2, 'subtopic', 'Solubility'),
+    (12, 2, 'subtopic', 'Electrochemistry'),
+    (13, 1, 'topic', 'Organic Chemistry'),
+    (14, 13, 'subtopic', 'Nomenclature'),
+    (15, 13, 'subtopic', 'Stereochemistry'),
+    (16, 13, 'subtopic', 'Nucleophilic Substitution and Elimination'),
+    (17, 13, 'subtopic', 'Electrophilic Addition'),
+    (18, 13, 'subtopic', 'Carbonyl Chemistry'),
+    (19, 13, 'subtopic', 'Carboxylic Acid Derivatives'),
+    (20, 13, 'subtopic', 'Aromatic Compounds'),
+    (21, 13, 'subtopic', 'Separations and Purifications'),
+    (22, 13, 'subtopic', 'Spectroscopy'),
+    (23, 1, 'topic', 'Physics'),
+    (24, 23, 'subtopic', 'Kinematics and Dynamics'),
+    (25, 23, 'subtopic', 'Work, Energy, and Power'),
+    (26, 23, 'subtopic', 'Fluids and Solids'),
+    (27, 23, 'subtopic', 'Electrostatics and Circuits'),
+    (28, 23, 'subtopic', 'Magnetism'),
+    (29, 23, 'subtopic', 'Waves and Sound'),
+    (30, 23, 'subtopic', 'Light and Optics'),
+    (31, 23, 'subtopic', 'Atomic and Nuclear Phenomena'),
+    (32, 1, 'topic', 'Biochemistry'),
+    (33, 32, 'subtopic', 'Amino Acids and Proteins'),
+    (34, 32, 'subtopic', 'Enzyme Kinetics'),
+    (35, 32, 'subtopic', 'Carbohydrate Metabolism'),
+    (36, 32, 'subtopic', 'Lipid Metabolism'),
+    (37, None, 'section', 'Biological and Biochemical Foundations of Living Systems'),
+    (38, 37, 'topic', 'Biochemistry'),
+    (39, 38, 'subtopic', 'Amino Acids and Proteins'),
+    (40, 38, 'subtopic', 'Enzyme Kinetics'),
+    (41, 38, 'subtopic', 'Carbohydrate Structure and Function'),
+    (42, 38, 'subtopic', 'Lipid Structure and Function'),
+    (43, 38, 'subtopic', 'Nucleotide and Nucleic Acid Structure'),
+    (44, 38, 'subtopic', 'Bioenergetics and Metabolism'),
+    (45, 38, 'subtopic', 'Glycolysis and Gluconeogenesis'),
+    (46, 38, 'subtopic', 'Citric Acid Cycle'),
+    (47, 38, 'subtopic', 'Oxidative Phosphorylation'),
+    (48, 38, 'subtopic', 'Fatty Acid Metabolism'),
+    (49, 38, 'subtopic', 'Amino Acid Metabolism'),
+    (50, 37, 'topic', 'Molecular Biology'),
+    (51, 50, 'subtopic', 'DNA Replication'),
+    (52, 50, 'subtopic', 'Transcription'),
+    (53, 50, 'subtopic', 'Translation'),
+    (54, 50, 'subtopic', 'Gene Regulation'),
+    (55, 50, 'subtopic', 'Recombinant DNA and Biotechnology'),
+    (56, 50, 'subtopic', 'Mutations and Repair'),
+    (57, 37, 'topic', 'Cell Biology'),
+    (58, 57, 'subtopic', 'Cell Theory and Structure'),
+    (59, 57, 'subtopic', 'Cell Membrane and Transport'),
+    (60, 57, 'subtopic', 'Cell Cycle and Mitosis'),
+    (61, 57, 'subtopic', 'Meiosis and Genetic Diversity'),
+    (62, 57, 'subtopic', 'Cellular Signaling'),
+    (63, 57, 'subtopic', 'Apoptosis'),
+    (64, 37, 'topic', 'Microbiology'),
+    (65, 64, 'subtopic', 'Bacteria Structure and Growth'),
+    (66, 64, 'subtopic', 'Viruses'),
+    (67, 64, 'subtopic', 'Fungi and Parasites'),
+    (68, 64, 'subtopic', 'Genetics of Prokaryotes'),
+    (69, 37, 'topic', 'Organ Systems'),
+    (70, 69, 'subtopic', 'Nervous System'),
+    (71, 69, 'subtopic', 'Endocrine System'),
+    (72, 69, 'subtopic', 'Cardiovascular System'),
+    (73, 69, 'subtopic', 'Respiratory System'),
+    (74, 69, 'subtopic', 'Immune System'),
+    (75, 69, 'subtopic', 'Digestive System'),
+    (76, 69, 'subtopic', 'Renal and Urinary System'),
+    (77, 69, 'subtopic', 'Musculoskeletal System'),
+    (78, 69, 'subtopic', 'Reproductive System'),
+    (79, 69, 'subtopic', 'Integumentary System'),
+    (80, 37, 'topic', 'Genetics and Evolution'),
+    (81, 80, 'subtopic', 'Mendelian Genetics'),
+    (82, 80, 'subtopic', 'Non-Mendelian Inheritance'),
+    (83, 80, 'subtopic', 'Population Genetics'),
+    (84, 80, 'subtopic', 'Hardy-Weinberg Equilibrium'),
+    (85, 80, 'subtopic', 'Natural Selection and Evolution'),
+    (86, 80, 'subtopic', 'Speciation'),
+    (87, None, 'section', 'Psychological, Social, and Biological Foundations of Behavior'),
+    (88, 87, 'topic', 'Psychology'),
+    (89, 88, 'subtopic', 'Sensation and Perception'),
+    (90, 88, 'subtopic', 'Learning and Memory'),
+    (91, 88, 'subtopic', 'Cognition and Language'),
+    (92, 88, 'subtopic', 'Motivation and Emotion'),
+    (93, 88, 'subtopic', 'Stress and Coping'),
+    (94, 88, 'subtopic', 'Personality'),
+    (95, 88, 'subtopic', 'Psychological Disorders'),
+    (96, 88, 'subtopic', 'Biological Bases of Behavior'),
+    (97, 88, 'subtopic', 'Consciousness and Sleep'),
+    (98, 88, 'subtopic', 'Development (Lifespan)'),
+    (99, 87, 'topic', 'Sociology'),
+    (100, 99, 'subtopic', 'Social Structure and Stratification'),
+    (101, 99, 'subtopic', 'Culture and Socialization'),
+    (102, 99, 'subtopic', 'Social Interaction and Groups'),
+    (103, 99, 'subtopic', 'Deviance and Social Control'),
+    (104, 99, 'subtopic', 'Demographics and Population'),
+    (105, 99, 'subtopic', 'Health Disparities'),
+    (106, 87, 'topic', 'Biology of Behavior'),
+    (107, 106, 'subtopic', 'Nervous System and Behavior'),
+    (108, 106, 'subtopic', 'Neurotransmitters and Drugs'),
+    (109, 106, 'subtopic', 'Endocrine System and Behavior'),
+    (110, 106, 'subtopic', 'Genetics and Behavior'),
+    (111, None, 'section', 'Critical Analysis and Reasoning Skills'),
+    (112, 111, 'topic', 'Reading Comprehension'),
+    (113, 112, 'subtopic', 'Main Idea and Argument'),
+    (114, 112, 'subtopic', 'Inference and Assumption'),
+    (115, 112, 'subtopic', 'Tone and Rhetoric'),
+    (116, 112, 'subtopic', 'Evidence Evaluation'),
+    (117, 111, 'topic', 'Reasoning Skills'),
+    (118, 117, 'subtopic', 'Logical Reasoning'),
+    (119, 117, 'subtopic', 'Analogy and Metaphor'),
+    (120, 117, 'subtopic', 'Application of Ideas'),
+    (121, 117, 'subtopic', 'Integration of Information'),
+    (122, 111, 'topic', 'Passage Analysis'),
+    (123, 122, 'subtopic', 'Humanities Passages'),
+    (124, 122, 'subtopic', 'Social Sciences Passages'),
+    (125, 122, 'subtopic', 'Ethics and Philosophy'),
+]
+
+# Name matching as app.utils.mcat_topics.normalize_topic did at this revision
+_CONNECTIVES = frozenset({'and', 'of', 'the', 'in'})
+
+
+def _name_words(name):
+    decomposed = unicodedata.normalize('NFKD', name.lower())
+    text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return [word for word in re.findall(r'\w+', text) if word not in _CONNECTIVES]
+
+
+def _max_typos(word):
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def _edit_distance(a, b):
+    """Damerau-Levenshtein distance with adjacent transpositions."""
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _match(children, name):
+    """Id of the child node `name` spells, or None."""
+    words = _name_words(name or '')
+    best, best_distance = None, None
+    for child_words, node_id in children:
+        if len(child_words) != len(words):
+            continue
+        distances = [_edit_distance(w, c) for w, c in zip(words, child_words)]
+        if any(d > _max_typos(c) for d, c in zip(distances, child_words)):
+            continue
+        distance = sum(distances)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = node_id, distance
+        elif distance == best_distance:
+            best = None
+    return best
+
+
+def upgrade() -> None:
+    taxonomy_nodes = op.create_table('taxonomy_nodes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['parent_id'], ['taxonomy_nodes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('parent_id', 'name', name='uq_taxonomy_node_parent_name')
+    )
+    op.create_index('uq_taxonomy_section_name', 'taxonomy_nodes', ['name'], unique=True, sqlite_where=sa.text('parent_id IS NULL'))
+    op.bulk_insert(taxonomy_nodes, [
+        {'id': node_id, 'parent_id': parent_id, 'level': level, 'name': name}
+        for node_id, parent_id, level, name in SEED_ROWS
+    ])
+
+    # Plain ADD COLUMN: a batch rebuild of questions would drop its FTS triggers
+    op.execute("ALTER TABLE questions ADD COLUMN topic_id INTEGER REFERENCES taxonomy_nodes (id)")
+    op.execute("ALTER TABLE questions ADD COLUMN subtopic_id INTEGER REFERENCES taxonomy_nodes (id)")
+
+    # Canonicalize names and fill in node ids; unknown topics keep NULL ids
+    names = {node_id: name for node_id, _, _, name in SEED_ROWS}
+    children = {}
+    for node_id, parent_id, _, name in SEED_ROWS:
+        children.setdefault(parent_id, []).append((_name_words(name), node_id))
+    conn = op.get_bind()
+    buckets = conn.execute(sa.text(
+        "SELECT DISTINCT section, topic, subtopic FROM questions"
+    )).all()
+    for section, topic, subtopic in buckets:
+        section_id = _match(children[None], section)
+        topic_id = section_id and _match(children.get(section_id, []), topic)
+        if not topic_id:
+            continue
+        subtopic_id = subtopic and _match(children.get(topic_id, []), subtopic)
+        conn.execute(
+            sa.text(
+                "UPDATE questions SET section = :new_section, topic = :new_topic,"
+                " subtopic = :new_subtopic, topic_id = :topic_id, subtopic_id = :subtopic_id"
+                " WHERE section = :section AND topic = :topic AND subtopic IS :subtopic"
+            ),
+            {
+                'new_section': names[section_id],
+                'new_topic': names[topic_id],
+                'new_subtopic': names[subtopic_id] if subtopic_id else subtopic,
+                'topic_id': topic_id,
+                'subtopic_id': subtopic_id or None,
+                'section': section,
+                'topic': topic,
+                'subtopic': subtopic,
+            },
+        )
+
+    op.drop_index('ix_questions_bucket', table_name='questions')
+    op.drop_index(op.f('ix_questions_topic'), table_name='questions')
+    op.drop_index(op.f('ix_questions_section'), table_name='questions')
+    op.create_index('ix_questions_bucket', 'questions', ['topic_id', 'question_type', 'difficulty'], unique=False)
+
+    # Cursors move to node ids. Canonicalizing merged buckets, so old
+    # positions no longer hold; they are rebuilt from 0 as lookups run.
+    op.drop_index(op.f('ix_question_cursors_id'), table_name='question_cursors')
+    op.drop_table('question_cursors')
+    op.create_table('question_cursors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('subtopic_id', sa.Integer(), nullable=False),
+    sa.Column('question_type', sa.String(), nullable=False),
+    sa.Column('difficulty', sa.Integer(), nullable=False),
+    sa.Column('answered_through', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['topic_id'], ['taxonomy_nodes.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'topic_id', 'subtopic_id', 'question_type', 'difficulty', name='uq_question_cursor_bucket')
+    )
+    op.create_index(op.f('ix_question_cursors_id'), 'question_cursors', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_question_cursors_id'), table_name='question_cursors')
+    op.drop_table('question_cursors')
+    op.create_table('question_cursors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('section', sa.String(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('subtopic', sa.String(), nullable=False),
+    sa.Column('question_type', sa.String(), nullable=False),
+    sa.Column('difficulty', sa.Integer(), nullable=False),
+    sa.Column('answered_through', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'section', 'topic', 'subtopic', 'question_type', 'difficulty', name='uq_question_cursor_bucket')
+    )
+    op.create_index(op.f('ix_question_cursors_id'), 'question_cursors', ['id'], unique=False)
+
+    op.drop_index('ix_questions_bucket', table_name='questions')
+    # Mirrors the upgrade; a batch rebuild would break the FTS view and triggers
+    op.execute("ALTER TABLE questions DROP COLUMN subtopic_id")
+    op.execute("ALTER TABLE questions DROP COLUMN topic_id")
+    op.create_index(op.f('ix_questions_section'), 'questions', ['section'], unique=False)
+    op.create_index(op.f('ix_questions_topic'), 'questions', ['topic'], unique=False)
+    op.create_index('ix_questions_bucket', 'questions', ['section', 'topic', 'question_type', 'difficulty'], unique=False)
+    op.drop_index('uq_taxonomy_section_name', table_name='taxonomy_nodes')
+    op.drop_table('taxonomy_nodes')
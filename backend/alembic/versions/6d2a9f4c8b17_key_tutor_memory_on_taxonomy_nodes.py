@@ -0,0 +1,198 @@
+"""key tutor_memory on taxonomy node ids
+
+Revision ID: 6d2a9f4c8b17
+Revises: 8c3f2a6d9e41
+Create Date: 2026-10-17 14:36:52.204718
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2a9f4c8b17'
+down_revision: Union[str, None] = '8c3f2a6d9e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Name matching as app.utils.mcat_topics.normalize_topic did at this revision
+_CONNECTIVES = frozenset({'and', 'of', 'the', 'in'})
+
+
+def _name_words(name):
+    decomposed = unicodedata.normalize('NFKD', name.lower())
+    text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return [word for word in re.findall(r'\w+', text) if word not in _CONNECTIVES]
+
+
+def _max_typos(word):
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def _edit_distance(a, b):
+    """Damerau-Levenshtein distance with adjacent transpositions."""
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _match(children, name):
+    """Id of the child node `name` spells, or None."""
+    words = _name_words(name or '')
+    best, best_distance = None, None
+    for child_words, node_id in children:
+        if len(child_words) != len(words):
+            continue
+        distances = [_edit_distance(w, c) for w, c in zip(words, child_words)]
+        if any(d > _max_typos(c) for d, c in zip(distances, child_words)):
+            continue
+        distance = sum(distances)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = node_id, distance
+        elif distance == best_distance:
+            best = None
+    return best
+
+
+def _create_indexes(no_subtopic_columns, subtopic_column):
+    op.create_index(op.f('ix_tutor_memory_id'), 'tutor_memory', ['id'], unique=False)
+    op.create_index(op.f('ix_tutor_memory_user_id'), 'tutor_memory', ['user_id'], unique=False)
+    op.create_index('uq_user_topic_no_subtopic', 'tutor_memory', no_subtopic_columns, unique=True, sqlite_where=sa.text(f'{subtopic_column} IS NULL'))
+
+
+def _untyped_table(columns):
+    # Values are copied as SQLite stored them (datetime and JSON text), so
+    # they must bypass the typed columns' conversions
+    return sa.table('tutor_memory', *(sa.column(name) for name in columns))
+
+
+def _drop_tutor_memory():
+    op.drop_index('uq_user_topic_no_subtopic', table_name='tutor_memory')
+    op.drop_index(op.f('ix_tutor_memory_user_id'), table_name='tutor_memory')
+    op.drop_index(op.f('ix_tutor_memory_id'), table_name='tutor_memory')
+    op.drop_table('tutor_memory')
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    children = {}
+    for node_id, parent_id, name in conn.execute(sa.text(
+        "SELECT id, parent_id, name FROM taxonomy_nodes"
+    )):
+        children.setdefault(parent_id, []).append((_name_words(name), node_id))
+
+    # Each row counts toward the node its names resolve to: its subtopic, or
+    # the topic when the subtopic (often a Socratic concept) is not a node.
+    # Rows whose topic is not in the taxonomy have no node to move to and
+    # are dropped; they only hold Socratic turn counts.
+    merged = {}
+    rows = conn.execute(sa.text(
+        "SELECT user_id, section, topic, subtopic, mastery_level, attempt_count,"
+        " correct_count, mistake_patterns, last_reviewed_at, created_at"
+        " FROM tutor_memory ORDER BY id"
+    )).all()
+    for row in rows:
+        section_id = _match(children.get(None, []), row.section)
+        topic_id = section_id and _match(children.get(section_id, []), row.topic)
+        if not topic_id:
+            continue
+        subtopic_id = row.subtopic and _match(children.get(topic_id, []), row.subtopic)
+        key = (row.user_id, topic_id, subtopic_id or None)
+        memory = merged.get(key)
+        if memory is None:
+            merged[key] = {
+                'user_id': row.user_id,
+                'topic_id': topic_id,
+                'subtopic_id': subtopic_id or None,
+                'mastery_level': row.mastery_level,
+                'attempt_count': row.attempt_count,
+                'correct_count': row.correct_count,
+                'mistake_patterns': row.mistake_patterns,
+                'last_reviewed_at': row.last_reviewed_at,
+                'created_at': row.created_at,
+            }
+            continue
+        # Counts add up; Socratic turns never move mastery, so the merged
+        # level is the highest any of the rows reached
+        memory['attempt_count'] += row.attempt_count
+        memory['correct_count'] += row.correct_count
+        memory['mastery_level'] = max(memory['mastery_level'], row.mastery_level)
+        memory['mistake_patterns'] = memory['mistake_patterns'] or row.mistake_patterns
+        if row.last_reviewed_at and (
+            memory['last_reviewed_at'] is None or row.last_reviewed_at > memory['last_reviewed_at']
+        ):
+            memory['last_reviewed_at'] = row.last_reviewed_at
+
+    _drop_tutor_memory()
+    op.create_table('tutor_memory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('subtopic_id', sa.Integer(), nullable=True),
+    sa.Column('mastery_level', sa.Float(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('mistake_patterns', sa.JSON(), nullable=True),
+    sa.Column('last_reviewed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['subtopic_id'], ['taxonomy_nodes.id'], ),
+    sa.ForeignKeyConstraint(['topic_id'], ['taxonomy_nodes.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'topic_id', 'subtopic_id', name='uq_user_topic_subtopic')
+    )
+    _create_indexes(['user_id', 'topic_id'], 'subtopic_id')
+    rows = list(merged.values())
+    if rows:
+        op.bulk_insert(_untyped_table(rows[0]), rows)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT m.user_id, s.name AS section, t.name AS topic, st.name AS subtopic,"
+        " m.mastery_level, m.attempt_count, m.correct_count, m.mistake_patterns,"
+        " m.last_reviewed_at, m.created_at"
+        " FROM tutor_memory AS m"
+        " JOIN taxonomy_nodes AS t ON t.id = m.topic_id"
+        " JOIN taxonomy_nodes AS s ON s.id = t.parent_id"
+        " LEFT JOIN taxonomy_nodes AS st ON st.id = m.subtopic_id"
+        " ORDER BY m.id"
+    )).mappings().all()
+
+    _drop_tutor_memory()
+    op.create_table('tutor_memory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('section', sa.String(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('subtopic', sa.String(), nullable=True),
+    sa.Column('mastery_level', sa.Float(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('mistake_patterns', sa.JSON(), nullable=True),
+    sa.Column('last_reviewed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'topic', 'subtopic', name='uq_user_topic_subtopic')
+    )
+    _create_indexes(['user_id', 'topic'], 'subtopic')
+    if rows:
+        rows = [dict(row) for row in rows]
+        op.bulk_insert(_untyped_table(rows[0]), rows)
@@ -0,0 +1,26 @@
+"""add study_sessions.history_version
+
+Revision ID: 8c3f2a6d9e41
+Revises: 5e8b1c4f7a92
+Create Date: 2026-10-17 09:12:05.481163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f2a6d9e41'
+down_revision: Union[str, None] = '5e8b1c4f7a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('study_sessions', sa.Column('history_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE study_sessions DROP COLUMN history_version")
@@ -0,0 +1,41 @@
+"""add question_cursors table
+
+Revision ID: b3c81f0d27a4
+Revises: 54ef83aaa87d
+Create Date: 2026-10-16 21:40:12.518309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c81f0d27a4'
+down_revision: Union[str, None] = '54ef83aaa87d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('question_cursors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('section', sa.String(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('subtopic', sa.String(), nullable=False),
+    sa.Column('question_type', sa.String(), nullable=False),
+    sa.Column('difficulty', sa.Integer(), nullable=False),
+    sa.Column('answered_through', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'section', 'topic', 'subtopic', 'question_type', 'difficulty', name='uq_question_cursor_bucket')
+    )
+    op.create_index(op.f('ix_question_cursors_id'), 'question_cursors', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_question_cursors_id'), table_name='question_cursors')
+    op.drop_table('question_cursors')
@@ -0,0 +1,31 @@
+"""add composite indexes for hot queries
+
+Revision ID: c7d2e94a1b05
+Revises: b3c81f0d27a4
+Create Date: 2026-10-16 21:52:37.104826
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e94a1b05'
+down_revision: Union[str, None] = 'b3c81f0d27a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_questions_bucket', 'questions', ['section', 'topic', 'question_type', 'difficulty'], unique=False)
+    op.create_index('ix_user_responses_user_question', 'user_responses', ['user_id', 'question_id'], unique=False)
+    op.create_index('ix_conversation_messages_session_created', 'conversation_messages', ['session_id', 'created_at'], unique=False)
+    op.create_index('ix_conversation_messages_session_role_concept', 'conversation_messages', ['session_id', 'role', 'concept'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversation_messages_session_role_concept', table_name='conversation_messages')
+    op.drop_index('ix_conversation_messages_session_created', table_name='conversation_messages')
+    op.drop_index('ix_user_responses_user_question', table_name='user_responses')
+    op.drop_index('ix_questions_bucket', table_name='questions')
@@ -0,0 +1,82 @@
+"""unique user answers and topic-level tutor memory
+
+Revision ID: e41a9c6f3d28
+Revises: c7d2e94a1b05
+Create Date: 2026-10-16 22:04:51.662013
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41a9c6f3d28'
+down_revision: Union[str, None] = 'c7d2e94a1b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Racing requests already left duplicates that the new unique indexes
+    # would reject. Keep each user's first answer to a question...
+    op.execute(
+        """
+        DELETE FROM user_responses
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM user_responses GROUP BY user_id, question_id
+        )
+        """
+    )
+    # ...and fold duplicate topic-level memories into the oldest row: counts
+    # add up, the latest review (and the mastery it left) wins
+    op.execute(
+        """
+        UPDATE tutor_memory
+        SET attempt_count = (
+                SELECT SUM(d.attempt_count) FROM tutor_memory AS d
+                WHERE d.user_id = tutor_memory.user_id
+                    AND d.topic = tutor_memory.topic AND d.subtopic IS NULL
+            ),
+            correct_count = (
+                SELECT SUM(d.correct_count) FROM tutor_memory AS d
+                WHERE d.user_id = tutor_memory.user_id
+                    AND d.topic = tutor_memory.topic AND d.subtopic IS NULL
+            ),
+            mastery_level = (
+                SELECT d.mastery_level FROM tutor_memory AS d
+                WHERE d.user_id = tutor_memory.user_id
+                    AND d.topic = tutor_memory.topic AND d.subtopic IS NULL
+                ORDER BY d.last_reviewed_at IS NULL, d.last_reviewed_at DESC, d.id DESC
+                LIMIT 1
+            ),
+            last_reviewed_at = (
+                SELECT MAX(d.last_reviewed_at) FROM tutor_memory AS d
+                WHERE d.user_id = tutor_memory.user_id
+                    AND d.topic = tutor_memory.topic AND d.subtopic IS NULL
+            )
+        WHERE id IN (
+            SELECT MIN(id) FROM tutor_memory WHERE subtopic IS NULL
+            GROUP BY user_id, topic HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM tutor_memory
+        WHERE subtopic IS NULL AND id NOT IN (
+            SELECT MIN(id) FROM tutor_memory WHERE subtopic IS NULL
+            GROUP BY user_id, topic
+        )
+        """
+    )
+    op.drop_index('ix_user_responses_user_question', table_name='user_responses')
+    op.create_index('uq_user_responses_user_question', 'user_responses', ['user_id', 'question_id'], unique=True)
+    op.create_index('uq_user_topic_no_subtopic', 'tutor_memory', ['user_id', 'topic'], unique=True, sqlite_where=sa.text('subtopic IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_user_topic_no_subtopic', table_name='tutor_memory')
+    op.drop_index('uq_user_responses_user_question', table_name='user_responses')
+    op.create_index('ix_user_responses_user_question', 'user_responses', ['user_id', 'question_id'], unique=False)
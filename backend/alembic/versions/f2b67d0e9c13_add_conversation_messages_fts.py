@@ -0,0 +1,76 @@
+"""add conversation_messages_fts search index
+
+Revision ID: f2b67d0e9c13
+Revises: e41a9c6f3d28
+Create Date: 2026-10-16 22:31:08.240517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b67d0e9c13'
+down_revision: Union[str, None] = 'e41a9c6f3d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# conversation_messages_fts DDL as of this revision, frozen so replaying it always
+# creates the same index (app.models.fts holds the current definitions)
+MESSAGE_FTS_CREATE = [
+    """
+    CREATE VIEW conversation_messages_fts_source AS
+    SELECT id, content, 'u' || user_id AS owner FROM conversation_messages
+    """,
+    """
+    CREATE VIRTUAL TABLE conversation_messages_fts USING fts5(
+        content, owner,
+        content='conversation_messages_fts_source', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER conversation_messages_fts_insert
+    AFTER INSERT ON conversation_messages BEGIN
+        INSERT INTO conversation_messages_fts(rowid, content, owner)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER conversation_messages_fts_delete
+    AFTER DELETE ON conversation_messages BEGIN
+        INSERT INTO conversation_messages_fts(conversation_messages_fts, rowid, content, owner)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER conversation_messages_fts_update
+    AFTER UPDATE OF content, user_id ON conversation_messages BEGIN
+        INSERT INTO conversation_messages_fts(conversation_messages_fts, rowid, content, owner)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+        INSERT INTO conversation_messages_fts(rowid, content, owner)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+]
+
+MESSAGE_FTS_DROP = [
+    "DROP TABLE IF EXISTS conversation_messages_fts",
+    "DROP VIEW IF EXISTS conversation_messages_fts_source",
+]
+
+
+def upgrade() -> None:
+    for statement in MESSAGE_FTS_CREATE:
+        op.execute(statement)
+    # Index the messages that already exist
+    op.execute("INSERT INTO conversation_messages_fts(conversation_messages_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for trigger in ("insert", "delete", "update"):
+        op.execute(f"DROP TRIGGER IF EXISTS conversation_messages_fts_{trigger}")
+    for statement in MESSAGE_FTS_DROP:
+        op.execute(statement)
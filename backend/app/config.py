@@ -1,6 +1,7 @@
 import logging
 import secrets
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -19,6 +20,60 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ANTHROPIC_API_KEY: str = ""
+    # "fake" serves Claude calls from the local stand-in in app/services/fake_llm.py
+    LLM_BACKEND: Literal["anthropic", "fake"] = "anthropic"
+    FAKE_LLM_LATENCY_MEDIAN_SECONDS: float = 0.8
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5
+    FAKE_LLM_TOKENS_PER_SECOND: float = 80.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_RATE_LIMIT_RATE: float = 0.0
+    FAKE_LLM_RETRY_AFTER_SECONDS: float = 1.0
+    FAKE_LLM_SEED: Optional[int] = None
+    # Shared HTTP connection pool for the Claude client
+    CLAUDE_MAX_CONNECTIONS: int = 100
+    CLAUDE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    CLAUDE_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    CLAUDE_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    CLAUDE_TIMEOUT_SECONDS: float = 60.0
+    # Retries of transient Claude errors, hedging of slow interactive calls
+    # (doubles cost for the slowest ~5%), and the circuit breaker
+    CLAUDE_MAX_ATTEMPTS: int = 3
+    CLAUDE_BACKOFF_BASE_SECONDS: float = 0.5
+    CLAUDE_BACKOFF_MAX_SECONDS: float = 8.0
+    CLAUDE_HEDGE_ENABLED: bool = False
+    CLAUDE_BREAKER_FAILURE_THRESHOLD: int = 5
+    CLAUDE_BREAKER_RESET_SECONDS: float = 30.0
+    # Outbound Claude call scheduler; set the per-minute budgets to your API
+    # rate-limit tier (0 = no budget). Background work leaves this fraction
+    # of concurrency and budget free for interactive requests.
+    LLM_MAX_CONCURRENCY: int = 50
+    LLM_REQUESTS_PER_MINUTE: int = 0
+    LLM_TOKENS_PER_MINUTE: int = 0
+    LLM_BACKGROUND_HEADROOM: float = 0.2
+    # Conversation history sent to Claude; older turns fold into a summary
+    HISTORY_TOKEN_BUDGET: int = 6000
+    HISTORY_SUMMARY_MAX_WORDS: int = 250
+    # Per-session history cache: message text held across all sessions, idle expiry
+    HISTORY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    HISTORY_CACHE_TTL_SECONDS: float = 900.0
+    # Verified access tokens and users' active state, cached per worker;
+    # the TTL bounds how long other workers miss a user update
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    # Background question bank warmer (off by default: it spends API credits)
+    WARMER_ENABLED: bool = False
+    WARMER_INTERVAL_SECONDS: float = 30.0
+    WARMER_BASE_STOCK: int = 2
+    WARMER_HOT_STOCK: int = 10
+    WARMER_MAX_PER_CYCLE: int = 20
+    WARMER_CONCURRENCY: int = 2
+    WARMER_HEAT_HALF_LIFE_SECONDS: float = 600.0
+    # Buffer TutorMemory updates in memory and write them in batches
+    MASTERY_WRITE_BEHIND: bool = False
+    MASTERY_FLUSH_INTERVAL_SECONDS: float = 2.0
+    MASTERY_FLUSH_MAX_PENDING: int = 500
+    # Bearer token for GET /metrics; the endpoint is disabled while unset
+    METRICS_TOKEN: str = ""
     FRONTEND_URL: str = "http://localhost:5173"
 
     model_config = {"env_file": str(_env_file), "env_file_encoding": "utf-8"}
@@ -1,16 +1,26 @@
+import secrets
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, Base, async_session_maker
 from app.models import User, StudySession, ConversationMessage, TutorMemory, Question, UserResponse  # noqa: F401
-from app.routers import auth, tutor, questions
+from app.routers import auth, tutor, questions, taxonomy
+from app.services.auth_cache import auth_cache
+from app.services.claude_tutor import tutor as claude_tutor
+from app.services.history_cache import history_cache
+from app.services.llm_scheduler import llm_scheduler
+from app.services.mastery_buffer import mastery_buffer
+from app.services.question_warmer import question_warmer
+from app.services.taxonomy import taxonomy_registry
 
 limiter = Limiter(key_func=get_remote_address)
 
@@ -19,7 +29,18 @@ limiter = Limiter(key_func=get_remote_address)
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as db:
+        await taxonomy_registry.load(db)
+        await db.commit()
+    claude_tutor.open()
+    if settings.WARMER_ENABLED:
+        question_warmer.start()
+    if settings.MASTERY_WRITE_BEHIND:
+        mastery_buffer.start()
     yield
+    await question_warmer.stop()
+    await mastery_buffer.stop()
+    await claude_tutor.close()
 
 
 app = FastAPI(
@@ -50,8 +71,44 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(tutor.router)
 app.include_router(questions.router)
+app.include_router(taxonomy.router)
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+_metrics_bearer = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_metrics_bearer),
+) -> None:
+    """Admit only callers presenting METRICS_TOKEN; 404 while it is unset."""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return {
+        "llm_scheduler": llm_scheduler.metrics(),
+        "history_cache": history_cache.metrics(),
+        "auth_cache": auth_cache.metrics(),
+        "claude_usage": claude_tutor.usage,
+        "claude_reliability": {
+            **claude_tutor.reliability,
+            "circuit": claude_tutor.breaker.state,
+            "circuit_rejections": claude_tutor.breaker.rejected,
+            "p95_seconds": claude_tutor.latency.p95(),
+        },
+    }
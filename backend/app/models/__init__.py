@@ -5,6 +5,9 @@ from app.models.refresh_token import RefreshToken
 from app.models.tutor_memory import TutorMemory
 from app.models.question import Question
 from app.models.user_response import UserResponse
+from app.models.question_cursor import QuestionCursor
+from app.models.taxonomy import TaxonomyNode
+from app.models import fts  # noqa: F401  (registers FTS5 indexes with their tables)
 
 __all__ = [
     "User",
@@ -14,4 +17,6 @@ __all__ = [
     "TutorMemory",
     "Question",
     "UserResponse",
+    "QuestionCursor",
+    "TaxonomyNode",
 ]
@@ -0,0 +1,107 @@
+"""SQLite FTS5 search indexes, kept in sync with their tables by triggers.
+
+The indexes are external-content FTS5 tables: they store only the inverted
+index and read text back from the source for snippets. Each is created and
+dropped alongside its table by create_all/drop_all; Alembic migrations
+create them for existing databases from frozen copies of these statements,
+so changing a definition here also needs a new migration.
+"""
+
+from sqlalchemy import DDL, event
+
+from app.models.conversation import ConversationMessage
+from app.models.question import Question
+
+# Conversation messages. `owner` holds "u<user_id>" as an indexed token, so
+# per-user searches intersect posting lists instead of filtering every match.
+MESSAGE_FTS_CREATE = [
+    """
+    CREATE VIEW conversation_messages_fts_source AS
+    SELECT id, content, 'u' || user_id AS owner FROM conversation_messages
+    """,
+    """
+    CREATE VIRTUAL TABLE conversation_messages_fts USING fts5(
+        content, owner,
+        content='conversation_messages_fts_source', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER conversation_messages_fts_insert
+    AFTER INSERT ON conversation_messages BEGIN
+        INSERT INTO conversation_messages_fts(rowid, content, owner)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER conversation_messages_fts_delete
+    AFTER DELETE ON conversation_messages BEGIN
+        INSERT INTO conversation_messages_fts(conversation_messages_fts, rowid, content, owner)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER conversation_messages_fts_update
+    AFTER UPDATE OF content, user_id ON conversation_messages BEGIN
+        INSERT INTO conversation_messages_fts(conversation_messages_fts, rowid, content, owner)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+        INSERT INTO conversation_messages_fts(rowid, content, owner)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+]
+MESSAGE_FTS_DROP = [
+    "DROP TABLE IF EXISTS conversation_messages_fts",
+    "DROP VIEW IF EXISTS conversation_messages_fts_source",
+]
+
+# Generated questions; concepts_tested is indexed as its JSON text
+QUESTION_FTS_CREATE = [
+    """
+    CREATE VIEW questions_fts_source AS
+    SELECT id, stem, passage, concepts_tested AS concepts FROM questions
+    """,
+    """
+    CREATE VIRTUAL TABLE questions_fts USING fts5(
+        stem, passage, concepts,
+        content='questions_fts_source', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO questions_fts(rowid, stem, passage, concepts)
+        VALUES (new.id, new.stem, new.passage, new.concepts_tested);
+    END
+    """,
+    """
+    CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN
+        INSERT INTO questions_fts(questions_fts, rowid, stem, passage, concepts)
+        VALUES ('delete', old.id, old.stem, old.passage, old.concepts_tested);
+    END
+    """,
+    """
+    CREATE TRIGGER questions_fts_update
+    AFTER UPDATE OF stem, passage, concepts_tested ON questions BEGIN
+        INSERT INTO questions_fts(questions_fts, rowid, stem, passage, concepts)
+        VALUES ('delete', old.id, old.stem, old.passage, old.concepts_tested);
+        INSERT INTO questions_fts(rowid, stem, passage, concepts)
+        VALUES (new.id, new.stem, new.passage, new.concepts_tested);
+    END
+    """,
+]
+QUESTION_FTS_DROP = [
+    "DROP TABLE IF EXISTS questions_fts",
+    "DROP VIEW IF EXISTS questions_fts_source",
+]
+
+
+def _attach(table, create, drop) -> None:
+    for statement in create:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in drop:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+_attach(ConversationMessage.__table__, MESSAGE_FTS_CREATE, MESSAGE_FTS_DROP)
+_attach(Question.__table__, QUESTION_FTS_CREATE, QUESTION_FTS_DROP)
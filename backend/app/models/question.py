@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import Integer, String, Text, Float, Boolean, DateTime, JSON
+from sqlalchemy import Integer, String, Text, Float, Boolean, DateTime, JSON, Index, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -12,11 +12,23 @@ from app.database import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Bucket lookups: topic node + question_type + difficulty range
+        Index("ix_questions_bucket", "topic_id", "question_type", "difficulty"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    section: Mapped[str] = mapped_column(String, nullable=False, index=True)
-    topic: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    section: Mapped[str] = mapped_column(String, nullable=False)
+    topic: Mapped[str] = mapped_column(String, nullable=False)
     subtopic: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # taxonomy_nodes ids for the names above; NULL where a name is not a node
+    # (free-text subtopics, rows from before names were validated)
+    topic_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("taxonomy_nodes.id"), nullable=True
+    )
+    subtopic_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("taxonomy_nodes.id"), nullable=True
+    )
     difficulty: Mapped[int] = mapped_column(Integer, nullable=False)
     question_type: Mapped[str] = mapped_column(
         String, nullable=False, default="discrete"
@@ -0,0 +1,41 @@
+"""Per-user position in each question bucket, for unanswered-question lookups."""
+
+from datetime import datetime
+
+from sqlalchemy import Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class QuestionCursor(Base):
+    """Every bucket question with id <= answered_through is answered by the user.
+
+    A bucket is the exact lookup (topic node, subtopic node, question_type,
+    difficulty); subtopic_id is 0 when the lookup spans the whole topic.
+    Lookups by a free-text subtopic have no node and keep no cursor.
+    """
+
+    __tablename__ = "question_cursors"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "topic_id", "subtopic_id", "question_type", "difficulty",
+            name="uq_question_cursor_bucket",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id"), nullable=False
+    )
+    topic_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("taxonomy_nodes.id"), nullable=False
+    )
+    subtopic_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    question_type: Mapped[str] = mapped_column(String, nullable=False)
+    difficulty: Mapped[int] = mapped_column(Integer, nullable=False)
+    answered_through: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
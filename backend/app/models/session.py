@@ -30,6 +30,10 @@ class StudySession(Base):
     state_snapshot: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     xp_earned: Mapped[int] = mapped_column(Integer, default=0)
+    # Turns saved through history_cache.append(), for cross-worker cache checks
+    history_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     user: Mapped["User"] = relationship(back_populates="sessions")
     messages: Mapped[List["ConversationMessage"]] = relationship(
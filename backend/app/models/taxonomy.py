@@ -0,0 +1,55 @@
+"""MCAT taxonomy nodes with small integer ids, referenced by hot tables."""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Integer, String, ForeignKey, Index, UniqueConstraint, event, insert, text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.utils.mcat_topics import taxonomy_paths
+
+LEVELS = ("section", "topic", "subtopic")
+
+
+class TaxonomyNode(Base):
+    """A section, topic or subtopic. Ids are never reused or renumbered."""
+
+    __tablename__ = "taxonomy_nodes"
+    __table_args__ = (
+        UniqueConstraint("parent_id", "name", name="uq_taxonomy_node_parent_name"),
+        # Sections have a NULL parent, which the constraint above never matches
+        Index(
+            "uq_taxonomy_section_name", "name",
+            unique=True, sqlite_where=text("parent_id IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # NULL for sections
+    parent_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("taxonomy_nodes.id"), nullable=True
+    )
+    level: Mapped[str] = mapped_column(String, nullable=False)  # one of LEVELS
+    name: Mapped[str] = mapped_column(String, nullable=False)
+
+
+def seed_rows() -> List[dict]:
+    """Rows for a new taxonomy_nodes table, numbered in taxonomy order."""
+    ids: Dict[Tuple[str, ...], int] = {}
+    rows = []
+    for path in taxonomy_paths():
+        ids[path] = len(ids) + 1
+        rows.append({
+            "id": ids[path],
+            "parent_id": ids.get(path[:-1]),
+            "level": LEVELS[len(path) - 1],
+            "name": path[-1],
+        })
+    return rows
+
+
+@event.listens_for(TaxonomyNode.__table__, "after_create")
+def _seed(table, connection, **kw) -> None:
+    connection.execute(insert(table), seed_rows())
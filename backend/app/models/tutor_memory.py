@@ -3,7 +3,9 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Integer, String, Float, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy import (
+    Integer, Float, DateTime, ForeignKey, JSON, UniqueConstraint, Index, text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -11,18 +13,35 @@ from app.database import Base
 
 
 class TutorMemory(Base):
+    """Mastery of one taxonomy node: a topic, or a subtopic within it.
+
+    Free-text subtopics and Socratic concepts that are not taxonomy nodes
+    count toward their topic's row (subtopic_id NULL).
+    """
+
     __tablename__ = "tutor_memory"
     __table_args__ = (
-        UniqueConstraint("user_id", "topic", "subtopic", name="uq_user_topic_subtopic"),
+        UniqueConstraint(
+            "user_id", "topic_id", "subtopic_id", name="uq_user_topic_subtopic"
+        ),
+        # NULLs never conflict in the constraint above, so topic-level rows
+        # (no subtopic) get their own partial unique index for upserts
+        Index(
+            "uq_user_topic_no_subtopic", "user_id", "topic_id",
+            unique=True, sqlite_where=text("subtopic_id IS NULL"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.id"), nullable=False, index=True
     )
-    section: Mapped[str] = mapped_column(String, nullable=False)
-    topic: Mapped[str] = mapped_column(String, nullable=False)
-    subtopic: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    topic_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("taxonomy_nodes.id"), nullable=False
+    )
+    subtopic_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("taxonomy_nodes.id"), nullable=True
+    )
     mastery_level: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
     attempt_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     correct_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -12,6 +12,12 @@ from app.database import Base
 
 class UserResponse(Base):
     __tablename__ = "user_responses"
+    __table_args__ = (
+        # One answer per user per question; also serves answered lookups
+        Index(
+            "uq_user_responses_user_question", "user_id", "question_id", unique=True
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
@@ -0,0 +1,20 @@
+"""Prompt for folding older conversation turns into a rolling summary."""
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain running notes on an MCAT tutoring conversation. "
+    "Return ONLY the updated summary text, no preamble."
+)
+
+HISTORY_SUMMARY_PROMPT = """\
+Update the running summary of this tutoring conversation.
+
+Current summary:
+{summary}
+
+Earlier turns to fold into the summary:
+{turns}
+
+Write the updated summary in at most {max_words} words. Keep the topics covered,
+what the student now understands, where they struggled, and any question that is
+still open.
+"""
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserResponse, Token, RefreshRequest
+from app.services.auth_cache import AuthenticatedUser
 from app.utils.auth import (
     get_password_hash,
     verify_password,
@@ -93,12 +94,23 @@ async def refresh(
 @router.post("/logout", status_code=204)
 async def logout(
     body: RefreshRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     await revoke_refresh_token(body.refresh_token, db, user_id=current_user.id)
 
 
 @router.get("/me", response_model=UserResponse)
-async def me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def me(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    user = await db.get(User, current_user.id)
+    if user is None:
+        # Deleted since its cache entry was loaded
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
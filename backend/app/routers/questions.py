@@ -1,26 +1,37 @@
 """Practice mode endpoints: generate questions and submit answers."""
 
-from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from sqlalchemy import select, and_
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.question import Question
 from app.models.tutor_memory import TutorMemory
-from app.models.user import User
 from app.models.user_response import UserResponse
 from app.schemas.questions import (
     QuestionGenerateRequest,
+    PracticeSetRequest,
     QuestionOut,
+    QuestionSearchHit,
+    QuestionSearchResponse,
     AnswerRequest,
     AnswerResponse,
+    BatchAnswerRequest,
+    BatchAnswerResult,
+    BatchAnswerResponse,
 )
+from app.services.auth_cache import AuthenticatedUser
 from app.services.claude_tutor import TutorServiceError
+from app.services.mastery_buffer import mastery_buffer
 from app.services.question_generator import question_generator
+from app.services.question_warmer import question_warmer
+from app.services.search import search_questions
 from app.utils.auth import get_current_user
 
 router = APIRouter(prefix="/api/questions", tags=["questions"])
@@ -33,6 +44,10 @@ XP_BY_DIFFICULTY = {
     range(7, 11): 35,  # Hard: 35 XP
 }
 
+# Mastery change per correct / incorrect answer, clamped to [0, 1]
+MASTERY_GAIN = 0.05
+MASTERY_LOSS = 0.02
+
 
 def _calculate_xp(difficulty: int) -> int:
     for diff_range, xp in XP_BY_DIFFICULTY.items():
@@ -46,9 +61,17 @@ def _calculate_xp(difficulty: int) -> int:
 async def generate_question(
     request: Request,
     body: QuestionGenerateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    question_warmer.record_request(
+        current_user.id,
+        body.section,
+        body.topic,
+        body.subtopic,
+        body.difficulty,
+        body.question_type,
+    )
     try:
         question = await question_generator.get_or_generate_question(
             user_id=current_user.id,
@@ -65,85 +88,239 @@ async def generate_question(
     return QuestionOut.model_validate(question)
 
 
+@router.post("/practice-set", response_model=List[QuestionOut])
+@limiter.limit("5/minute")
+async def generate_practice_set(
+    request: Request,
+    body: PracticeSetRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return a block of unanswered questions, batch-generating any shortfall."""
+    try:
+        questions = await question_generator.get_practice_set(
+            user_id=current_user.id,
+            section=body.section,
+            topic=body.topic,
+            subtopic=body.subtopic,
+            difficulty=body.difficulty,
+            question_type=body.question_type,
+            count=body.count,
+            db=db,
+        )
+    except TutorServiceError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return [QuestionOut.model_validate(q) for q in questions]
+
+
+@router.get("/search", response_model=QuestionSearchResponse)
+@limiter.limit("30/minute")
+async def search_question_bank(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    section: Optional[str] = Query(default=None, max_length=200),
+    topic: Optional[str] = Query(default=None, max_length=100),
+    min_difficulty: Optional[int] = Query(default=None, ge=1, le=10),
+    max_difficulty: Optional[int] = Query(default=None, ge=1, le=10),
+    question_type: Optional[str] = Query(default=None, pattern="^(discrete|passage)$"),
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text search over question stems, passages and concepts tested."""
+    if (
+        min_difficulty is not None
+        and max_difficulty is not None
+        and min_difficulty > max_difficulty
+    ):
+        raise HTTPException(
+            status_code=400, detail="min_difficulty exceeds max_difficulty"
+        )
+    matches = await search_questions(
+        db, q, section, topic, min_difficulty, max_difficulty, question_type, limit
+    )
+    hits = [
+        QuestionSearchHit(
+            **QuestionOut.model_validate(question).model_dump(),
+            snippet=snippet,
+            score=score,
+        )
+        for question, snippet, score in matches
+    ]
+    return QuestionSearchResponse(query=q, hits=hits)
+
+
 @router.post("/answer", response_model=AnswerResponse)
 @limiter.limit("60/minute")
 async def answer_question(
     request: Request,
     body: AnswerRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Load the question
-    result = await db.execute(
-        select(Question).where(Question.id == body.question_id)
-    )
-    question = result.scalar_one_or_none()
+    question = await db.get(Question, body.question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
-    # Prevent duplicate answers
-    result = await db.execute(
-        select(UserResponse).where(
-            and_(
-                UserResponse.user_id == current_user.id,
-                UserResponse.question_id == body.question_id,
+    # Check answer
+    is_correct = body.selected_answer == question.correct_answer
+    xp_earned = _calculate_xp(question.difficulty) if is_correct else 0
+
+    # Insert optimistically; the unique (user_id, question_id) index rejects repeats
+    try:
+        await db.execute(
+            insert(UserResponse).values(
+                user_id=current_user.id,
+                question_id=body.question_id,
+                session_id=body.session_id,
+                selected_answer=body.selected_answer,
+                is_correct=is_correct,
+                time_spent_seconds=body.time_spent_seconds,
+                xp_earned=xp_earned,
             )
         )
-    )
-    if result.scalar_one_or_none():
+    except IntegrityError:
         raise HTTPException(
             status_code=409, detail="You have already answered this question"
         )
 
-    # Check answer
-    is_correct = body.selected_answer == question.correct_answer
-    xp_earned = _calculate_xp(question.difficulty) if is_correct else 0
+    # Questions from before topics were validated may have no topic node
+    mastery_level = 0.0
+    if question.topic_id is not None:
+        mastery_level = await mastery_buffer.record(
+            db, current_user.id, question.topic_id, question.subtopic_id,
+            attempts=1, correct=int(is_correct),
+            delta=MASTERY_GAIN if is_correct else -MASTERY_LOSS,
+        )
 
-    # Save user response
-    user_response = UserResponse(
-        user_id=current_user.id,
-        question_id=body.question_id,
-        session_id=body.session_id,
-        selected_answer=body.selected_answer,
+    return AnswerResponse(
         is_correct=is_correct,
-        time_spent_seconds=body.time_spent_seconds,
+        correct_answer=question.correct_answer,
+        explanation=question.explanation,
         xp_earned=xp_earned,
+        mastery_level=mastery_level,
     )
-    db.add(user_response)
 
-    # Update TutorMemory mastery_level
+
+@router.post("/answer/batch", response_model=BatchAnswerResponse)
+@limiter.limit("10/minute")
+async def answer_batch(
+    request: Request,
+    body: BatchAnswerRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Grade a whole block of answers in one transaction.
+
+    Questions the user already answered (and repeats within the block) are
+    reported as already_answered with the grading that was recorded, and
+    earn no XP or mastery, so a client can safely resubmit a block. Mastery
+    is updated once per (topic, subtopic) with the net change, clamped to
+    [0, 1].
+    """
+    answers: Dict[int, AnswerRequest] = {}
+    for answer in body.answers:
+        answers.setdefault(answer.question_id, answer)
+
+    result = await db.execute(select(Question).where(Question.id.in_(answers)))
+    questions = {q.id: q for q in result.scalars().all()}
+    missing = sorted(answers.keys() - questions.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Questions not found: {missing}")
+
+    graded = {}
+    for question_id, answer in answers.items():
+        question = questions[question_id]
+        is_correct = answer.selected_answer == question.correct_answer
+        graded[question_id] = {
+            "user_id": current_user.id,
+            "question_id": question_id,
+            "session_id": answer.session_id,
+            "selected_answer": answer.selected_answer,
+            "is_correct": is_correct,
+            "time_spent_seconds": answer.time_spent_seconds,
+            "xp_earned": _calculate_xp(question.difficulty) if is_correct else 0,
+        }
     result = await db.execute(
-        select(TutorMemory).where(
-            and_(
-                TutorMemory.user_id == current_user.id,
-                TutorMemory.topic == question.topic,
-                TutorMemory.subtopic == question.subtopic,
+        sqlite_insert(UserResponse)
+        .values(list(graded.values()))
+        .on_conflict_do_nothing(index_elements=["user_id", "question_id"])
+        .returning(UserResponse.question_id)
+    )
+    inserted = set(result.scalars().all())
+
+    # The grading each question ends up recorded with
+    recorded = {qid: graded[qid]["is_correct"] for qid in inserted}
+    previously_answered = answers.keys() - inserted
+    if previously_answered:
+        result = await db.execute(
+            select(UserResponse.question_id, UserResponse.is_correct).where(
+                UserResponse.user_id == current_user.id,
+                UserResponse.question_id.in_(previously_answered),
             )
         )
-    )
-    memory = result.scalar_one_or_none()
-    if not memory:
-        memory = TutorMemory(
-            user_id=current_user.id,
-            section=question.section,
-            topic=question.topic,
-            subtopic=question.subtopic,
+        recorded.update(dict(result.all()))
+
+    # Net mastery change per (topic, subtopic) node over the newly recorded
+    # answers; questions without a topic node track no mastery
+    groups: Dict[Tuple[int, Optional[int]], Dict] = {}
+    for question_id in inserted:
+        question, row = questions[question_id], graded[question_id]
+        if question.topic_id is None:
+            continue
+        group = groups.setdefault(
+            (question.topic_id, question.subtopic_id),
+            {"attempts": 0, "correct": 0, "delta": 0.0},
         )
-        db.add(memory)
-        await db.flush()
+        group["attempts"] += 1
+        group["correct"] += int(row["is_correct"])
+        group["delta"] += MASTERY_GAIN if row["is_correct"] else -MASTERY_LOSS
 
-    memory.attempt_count += 1
-    if is_correct:
-        memory.correct_count += 1
-        memory.mastery_level = min(1.0, memory.mastery_level + 0.05)
-    else:
-        memory.mastery_level = max(0.0, memory.mastery_level - 0.02)
-    memory.last_reviewed_at = datetime.now(timezone.utc)
+    mastery: Dict[Tuple[int, Optional[int]], float] = {}
+    for (topic_id, subtopic_id), group in groups.items():
+        mastery[(topic_id, subtopic_id)] = await mastery_buffer.record(
+            db, current_user.id, topic_id, subtopic_id,
+            group["attempts"], group["correct"], group["delta"],
+        )
+    untouched = {
+        (q.topic_id, q.subtopic_id) for q in questions.values()
+        if q.topic_id is not None
+    } - mastery.keys()
+    if untouched:
+        result = await db.execute(
+            select(
+                TutorMemory.topic_id, TutorMemory.subtopic_id, TutorMemory.mastery_level
+            )
+            .where(
+                TutorMemory.user_id == current_user.id,
+                TutorMemory.topic_id.in_({topic_id for topic_id, _ in untouched}),
+            )
+        )
+        stored = {(row.topic_id, row.subtopic_id): row.mastery_level for row in result}
+        for key in untouched:
+            mastery[key] = mastery_buffer.pending_level(
+                (current_user.id, *key), stored.get(key, 0.0)
+            )
 
-    return AnswerResponse(
-        is_correct=is_correct,
-        correct_answer=question.correct_answer,
-        explanation=question.explanation,
-        xp_earned=xp_earned,
-        mastery_level=memory.mastery_level,
+    results = []
+    reported = set()
+    for answer in body.answers:
+        question, row = questions[answer.question_id], graded[answer.question_id]
+        already_answered = (
+            answer.question_id not in inserted or answer.question_id in reported
+        )
+        reported.add(answer.question_id)
+        results.append(BatchAnswerResult(
+            question_id=answer.question_id,
+            already_answered=already_answered,
+            is_correct=recorded[answer.question_id],
+            correct_answer=question.correct_answer,
+            explanation=question.explanation,
+            xp_earned=0 if already_answered else row["xp_earned"],
+            mastery_level=mastery.get((question.topic_id, question.subtopic_id), 0.0),
+        ))
+    return BatchAnswerResponse(
+        results=results,
+        total_xp=sum(r.xp_earned for r in results),
     )
@@ -0,0 +1,134 @@
+"""MCAT taxonomy for the frontend.
+
+The taxonomy is fixed for the life of the process, so every response body
+is serialized once at import into bytes with a strong ETag and served
+as-is, with long-lived caching and 304s for conditional requests.
+"""
+
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.schemas.taxonomy import TopicMatch, TopicSearchResponse
+from app.utils.mcat_topics import (
+    MCAT_TAXONOMY,
+    list_sections,
+    list_subtopics,
+    list_topics,
+    search_topics,
+)
+
+router = APIRouter(prefix="/api/taxonomy", tags=["taxonomy"])
+limiter = Limiter(key_func=get_remote_address)
+
+# Clients may reuse a response this long before revalidating with its ETag
+CACHE_CONTROL = "public, max-age=86400"
+
+
+class _Payload:
+    """A JSON body serialized once, with its strong ETag."""
+
+    def __init__(self, data):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def response(self, request: Request) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in ("*", etag):
+            return True
+    return False
+
+
+_tree = _Payload({
+    "sections": [
+        {
+            "name": section,
+            "topics": [
+                {"name": topic, "subtopics": list_subtopics(section, topic)}
+                for topic in list_topics(section)
+            ],
+        }
+        for section in list_sections()
+    ]
+})
+_sections = _Payload({"sections": list_sections()})
+_topics: Dict[str, _Payload] = {
+    section: _Payload({"section": section, "topics": list_topics(section)})
+    for section in MCAT_TAXONOMY
+}
+_subtopics: Dict[Tuple[str, str], _Payload] = {
+    (section, topic): _Payload({
+        "section": section,
+        "topic": topic,
+        "subtopics": list_subtopics(section, topic),
+    })
+    for section, topics in MCAT_TAXONOMY.items()
+    for topic in topics
+}
+
+
+def _lookup(payloads: dict, key, detail: str) -> _Payload:
+    payload: Optional[_Payload] = payloads.get(key)
+    if payload is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return payload
+
+
+@router.get("")
+async def get_taxonomy(request: Request):
+    """The whole taxonomy: sections, their topics, and each topic's subtopics."""
+    return _tree.response(request)
+
+
+@router.get("/sections")
+async def get_sections(request: Request):
+    return _sections.response(request)
+
+
+@router.get("/topics")
+async def get_topics(request: Request, section: str = Query(max_length=200)):
+    return _lookup(_topics, section, f"Unknown section: {section}").response(request)
+
+
+@router.get("/subtopics")
+async def get_subtopics(
+    request: Request,
+    section: str = Query(max_length=200),
+    topic: str = Query(max_length=100),
+):
+    payload = _lookup(
+        _subtopics,
+        (section, topic),
+        f"Unknown topic '{topic}' in section '{section}'",
+    )
+    return payload.response(request)
+
+
+@router.get("/search", response_model=TopicSearchResponse)
+@limiter.limit("600/minute")
+async def autocomplete_topics(
+    request: Request,
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+):
+    """Topic/subtopic autocomplete; tolerates typos and partial words."""
+    return TopicSearchResponse(
+        query=q,
+        matches=[TopicMatch(**match) for match in search_topics(q, limit)],
+    )
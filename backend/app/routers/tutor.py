@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+import base64
+import json
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from sqlalchemy import select
+from sqlalchemy import String, select, tuple_, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models.user import User
 from app.models.session import StudySession
 from app.models.conversation import ConversationMessage
 from app.schemas.tutor import (
@@ -13,17 +18,100 @@ from app.schemas.tutor import (
     ChatResponse,
     ChatHistoryResponse,
     MessageOut,
+    MessageSearchHit,
+    MessageSearchResponse,
     SocraticChatRequest,
     SocraticChatResponse,
 )
+from app.services.auth_cache import AuthenticatedUser
 from app.services.claude_tutor import tutor, TutorServiceError
+from app.services.conversation_history import history_compactor
+from app.services.escalation import record_attempt
+from app.services.history_cache import history_cache
+from app.services.search import search_messages
 from app.utils.auth import get_current_user
 
 router = APIRouter(prefix="/api/tutor", tags=["tutor"])
 limiter = Limiter(key_func=get_remote_address)
 
-# Max messages to send to Claude as conversation history
-MAX_HISTORY_MESSAGES = 50
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Rows fetched per round trip when streaming history
+HISTORY_STREAM_BATCH = 200
+
+
+async def _get_owned_session(
+    db: AsyncSession, user_id: int, session_id: int
+) -> StudySession:
+    result = await db.execute(
+        select(StudySession).where(
+            StudySession.id == session_id,
+            StudySession.user_id == user_id,
+        )
+    )
+    session = result.scalar_one_or_none()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+async def _get_or_create_session(
+    db: AsyncSession,
+    user_id: int,
+    session_id: Optional[int],
+    mode: str,
+    topic: Optional[str],
+) -> StudySession:
+    if session_id:
+        return await _get_owned_session(db, user_id, session_id)
+
+    session = StudySession(user_id=user_id, mode=mode, topic=topic)
+    db.add(session)
+    await db.flush()
+    # A new session has no history to load
+    history_cache.put(session, 0, [])
+    return session
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_turn(
+    db: AsyncSession,
+    chunks: AsyncIterator[str],
+    save_turn: Callable[[str], Awaitable[None]],
+    done: dict,
+) -> StreamingResponse:
+    """Relay Claude text deltas as SSE, then persist the finished turn.
+
+    get_db has already committed and closed `db` by the time the body
+    streams, so the turn is committed here explicitly. If the client
+    disconnects mid-stream the task is cancelled: the upstream stream is
+    closed and nothing is saved for the incomplete turn.
+    """
+
+    async def events():
+        parts = []
+        try:
+            try:
+                async for text in chunks:
+                    parts.append(text)
+                    yield _sse_event("token", {"text": text})
+            except TutorServiceError as e:
+                yield _sse_event("error", {"detail": str(e)})
+                return
+            await save_turn("".join(parts))
+            await db.commit()
+            yield _sse_event("done", done)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await chunks.aclose()
+                await db.close()
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -31,42 +119,19 @@ MAX_HISTORY_MESSAGES = 50
 async def chat_with_tutor(
     request: Request,
     chat_request: ChatRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Get or create session
-    if chat_request.session_id:
-        result = await db.execute(
-            select(StudySession).where(
-                StudySession.id == chat_request.session_id,
-                StudySession.user_id == current_user.id,
-            )
-        )
-        session = result.scalar_one_or_none()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-    else:
-        session = StudySession(
-            user_id=current_user.id, mode="chat", topic=chat_request.topic
-        )
-        db.add(session)
-        await db.flush()
-
-    # Load recent conversation history (capped to control cost and context window)
-    result = await db.execute(
-        select(ConversationMessage)
-        .where(ConversationMessage.session_id == session.id)
-        .order_by(ConversationMessage.created_at.desc())
-        .limit(MAX_HISTORY_MESSAGES)
+    session = await _get_or_create_session(
+        db, current_user.id, chat_request.session_id, "chat", chat_request.topic
     )
-    history_rows = list(reversed(result.scalars().all()))
-    conversation_history = [
-        {"role": m.role, "content": m.content} for m in history_rows
-    ]
+    conversation_history, summary = await history_compactor.build(db, session)
 
     # Call Claude
     try:
-        response_text = await tutor.chat(chat_request.content, conversation_history)
+        response_text = await tutor.chat(
+            chat_request.content, conversation_history, history_summary=summary
+        )
     except TutorServiceError as e:
         raise HTTPException(status_code=503, detail=str(e))
 
@@ -86,6 +151,7 @@ async def chat_with_tutor(
         topic=chat_request.topic,
     )
     db.add_all([user_msg, assistant_msg])
+    await history_cache.append(db, session, [user_msg, assistant_msg])
 
     return ChatResponse(response=response_text, session_id=session.id)
 
@@ -95,40 +161,13 @@ async def chat_with_tutor(
 async def socratic_chat(
     request: Request,
     chat_request: SocraticChatRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Get or create session with mode="socratic"
-    if chat_request.session_id:
-        result = await db.execute(
-            select(StudySession).where(
-                StudySession.id == chat_request.session_id,
-                StudySession.user_id == current_user.id,
-            )
-        )
-        session = result.scalar_one_or_none()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-    else:
-        session = StudySession(
-            user_id=current_user.id,
-            mode="socratic",
-            topic=chat_request.topic,
-        )
-        db.add(session)
-        await db.flush()
-
-    # Load recent conversation history
-    result = await db.execute(
-        select(ConversationMessage)
-        .where(ConversationMessage.session_id == session.id)
-        .order_by(ConversationMessage.created_at.desc())
-        .limit(MAX_HISTORY_MESSAGES)
+    session = await _get_or_create_session(
+        db, current_user.id, chat_request.session_id, "socratic", chat_request.topic
     )
-    history_rows = list(reversed(result.scalars().all()))
-    conversation_history = [
-        {"role": m.role, "content": m.content} for m in history_rows
-    ]
+    conversation_history, summary = await history_compactor.build(db, session)
 
     # Call Socratic chat
     try:
@@ -139,8 +178,9 @@ async def socratic_chat(
             section=chat_request.section,
             topic=chat_request.topic,
             concept=chat_request.concept,
-            session_id=session.id,
+            session=session,
             db=db,
+            history_summary=summary,
         )
     except TutorServiceError as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -163,6 +203,8 @@ async def socratic_chat(
         concept=chat_request.concept,
     )
     db.add_all([user_msg, assistant_msg])
+    await history_cache.append(db, session, [user_msg, assistant_msg])
+    await record_attempt(db, session, chat_request.concept)
 
     return SocraticChatResponse(
         response=response_text,
@@ -173,32 +215,249 @@ async def socratic_chat(
     )
 
 
+@router.post("/chat/stream")
+@limiter.limit("30/minute")
+async def chat_with_tutor_stream(
+    request: Request,
+    chat_request: ChatRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Like /chat, but streams the reply as Server-Sent Events.
+
+    Emits `token` events ({"text": ...}) as deltas arrive, then a single
+    `done` event ({"session_id": ...}) once the turn is saved, or an
+    `error` event ({"detail": ...}) if the tutor call fails.
+    """
+    session = await _get_or_create_session(
+        db, current_user.id, chat_request.session_id, "chat", chat_request.topic
+    )
+    conversation_history, summary = await history_compactor.build(db, session)
+    chunks = tutor.chat_stream(
+        chat_request.content, conversation_history, history_summary=summary
+    )
+
+    async def save_turn(response_text: str) -> None:
+        messages = [
+            ConversationMessage(
+                user_id=current_user.id,
+                session_id=session.id,
+                role="user",
+                content=chat_request.content,
+                topic=chat_request.topic,
+            ),
+            ConversationMessage(
+                user_id=current_user.id,
+                session_id=session.id,
+                role="assistant",
+                content=response_text,
+                topic=chat_request.topic,
+            ),
+        ]
+        db.add_all(messages)
+        db.add(session)
+        await history_cache.append(db, session, messages)
+
+    return _stream_turn(db, chunks, save_turn, {"session_id": session.id})
+
+
+@router.post("/socratic/stream")
+@limiter.limit("30/minute")
+async def socratic_chat_stream(
+    request: Request,
+    chat_request: SocraticChatRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Like /socratic, but streams the reply as Server-Sent Events.
+
+    The `done` event carries the same fields as SocraticChatResponse,
+    minus the response text.
+    """
+    session = await _get_or_create_session(
+        db, current_user.id, chat_request.session_id, "socratic", chat_request.topic
+    )
+    conversation_history, summary = await history_compactor.build(db, session)
+    memory, escalation_level, system_prompt = await tutor.prepare_socratic_turn(
+        user_id=current_user.id,
+        section=chat_request.section,
+        topic=chat_request.topic,
+        concept=chat_request.concept,
+        session=session,
+        db=db,
+    )
+    chunks = tutor.chat_stream(
+        chat_request.content,
+        conversation_history,
+        system_prompt,
+        history_summary=summary,
+    )
+
+    async def save_turn(response_text: str) -> None:
+        await tutor.complete_socratic_turn(memory, db)
+        messages = [
+            ConversationMessage(
+                user_id=current_user.id,
+                session_id=session.id,
+                role="user",
+                content=chat_request.content,
+                topic=chat_request.topic,
+                concept=chat_request.concept,
+            ),
+            ConversationMessage(
+                user_id=current_user.id,
+                session_id=session.id,
+                role="assistant",
+                content=response_text,
+                topic=chat_request.topic,
+                concept=chat_request.concept,
+            ),
+        ]
+        db.add_all(messages)
+        db.add(session)
+        await record_attempt(db, session, chat_request.concept)
+        await history_cache.append(db, session, messages)
+
+    done = {
+        "session_id": session.id,
+        "escalation_level": escalation_level,
+        "topic": chat_request.topic,
+        "concept": chat_request.concept,
+    }
+    return _stream_turn(db, chunks, save_turn, done)
+
+
+# created_at as SQLite stores it. Server-default timestamps have no
+# fractional seconds while bound datetimes always do, so cursors carry and
+# compare the stored text rather than a parsed datetime.
+_created_at_text = type_coerce(ConversationMessage.created_at, String)
+
+
+def _encode_cursor(created_at: str, message_id: int) -> str:
+    raw = json.dumps([created_at, message_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, message_id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(message_id, int):
+            raise ValueError
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, message_id
+
+
+def _history_query(session_id: int, cursor: Optional[str], direction: str):
+    """Messages after `cursor` in `direction`, keyset-ordered by (created_at, id)."""
+    stmt = select(
+        ConversationMessage.id,
+        ConversationMessage.role,
+        ConversationMessage.content,
+        ConversationMessage.topic,
+        ConversationMessage.created_at,
+        _created_at_text.label("created_at_text"),
+    ).where(ConversationMessage.session_id == session_id)
+    key = tuple_(_created_at_text, ConversationMessage.id)
+    if direction == "forward":
+        if cursor:
+            stmt = stmt.where(key > tuple_(*_decode_cursor(cursor)))
+        return stmt.order_by(ConversationMessage.created_at, ConversationMessage.id)
+    if cursor:
+        stmt = stmt.where(key < tuple_(*_decode_cursor(cursor)))
+    return stmt.order_by(
+        ConversationMessage.created_at.desc(), ConversationMessage.id.desc()
+    )
+
+
 @router.get("/history", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: int,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    direction: str = Query(default="forward", pattern="^(forward|backward)$"),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Verify session belongs to user
-    result = await db.execute(
-        select(StudySession).where(
-            StudySession.id == session_id,
-            StudySession.user_id == current_user.id,
-        )
-    )
-    session = result.scalar_one_or_none()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    """One page of a session's messages, oldest first.
 
-    # Load messages
-    result = await db.execute(
-        select(ConversationMessage)
-        .where(ConversationMessage.session_id == session_id)
-        .order_by(ConversationMessage.created_at)
-    )
-    messages = result.scalars().all()
+    `forward` pages from the start of the session (or after `cursor`)
+    toward newer messages; `backward` pages from the newest (or before
+    `cursor`) toward older ones. Pass `next_cursor` back to get the next
+    page in the same direction; it is null once there are no more.
+    Without `limit`, every remaining message is returned in one page, as
+    before pagination existed.
+    """
+    await _get_owned_session(db, current_user.id, session_id)
+
+    stmt = _history_query(session_id, cursor, direction)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    result = await db.execute(stmt)
+    rows = result.all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at_text, rows[-1].id)
+    if direction == "backward":
+        rows.reverse()
 
     return ChatHistoryResponse(
         session_id=session_id,
-        messages=[MessageOut.model_validate(m) for m in messages],
+        messages=[MessageOut.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/history/stream")
+async def stream_chat_history(
+    session_id: int,
+    cursor: Optional[str] = None,
+    direction: str = Query(default="forward", pattern="^(forward|backward)$"),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream a session's messages as NDJSON, one MessageOut per line.
+
+    Rows are read from a server-side cursor in batches and written as they
+    arrive, so memory stays flat however long the session is. Accepts the
+    same `cursor` and `direction` as /history; each line carries its own
+    `cursor` for resuming after a dropped connection.
+    """
+    await _get_owned_session(db, current_user.id, session_id)
+    stmt = _history_query(session_id, cursor, direction).execution_options(
+        yield_per=HISTORY_STREAM_BATCH
+    )
+
+    async def lines():
+        # get_db has already closed `db`; it reopens a connection for the stream
+        try:
+            result = await db.stream(stmt)
+            async for row in result:
+                message = MessageOut.model_validate(row).model_dump(mode="json")
+                message["cursor"] = _encode_cursor(row.created_at_text, row.id)
+                yield json.dumps(message) + "\n"
+        finally:
+            with anyio.CancelScope(shield=True):
+                await db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/search", response_model=MessageSearchResponse)
+@limiter.limit("30/minute")
+async def search_history(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    topic: Optional[str] = Query(default=None, max_length=100),
+    concept: Optional[str] = Query(default=None, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text search over all of the current user's conversation messages."""
+    rows = await search_messages(db, current_user.id, q, topic, concept, limit)
+    return MessageSearchResponse(
+        query=q, hits=[MessageSearchHit.model_validate(row) for row in rows]
     )
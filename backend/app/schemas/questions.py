@@ -2,7 +2,9 @@
 
 from typing import Optional, List, Dict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.utils.mcat_topics import normalize_topic
 
 
 class QuestionGenerateRequest(BaseModel):
@@ -12,6 +14,21 @@ class QuestionGenerateRequest(BaseModel):
     difficulty: int = Field(ge=1, le=10, default=5)
     question_type: str = Field(default="discrete", pattern="^(discrete|passage)$")
 
+    @model_validator(mode="after")
+    def canonical_topic(self):
+        """Replace names with their taxonomy spelling so buckets don't split."""
+        names = normalize_topic(self.section, self.topic, self.subtopic)
+        if names is None:
+            raise ValueError(
+                f"Unknown section/topic: {self.section!r} / {self.topic!r}"
+            )
+        self.section, self.topic, self.subtopic = names
+        return self
+
+
+class PracticeSetRequest(QuestionGenerateRequest):
+    count: int = Field(ge=1, le=20, default=10)
+
 
 class QuestionOut(BaseModel):
     """Question response — excludes correct_answer to prevent cheating."""
@@ -31,6 +48,16 @@ class QuestionOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class QuestionSearchHit(QuestionOut):
+    snippet: str  # matched words wrapped in **
+    score: float  # BM25 relevance; higher is better
+
+
+class QuestionSearchResponse(BaseModel):
+    query: str
+    hits: List[QuestionSearchHit]
+
+
 class AnswerRequest(BaseModel):
     question_id: int
     selected_answer: str = Field(pattern="^[A-D]$")
@@ -44,3 +71,19 @@ class AnswerResponse(BaseModel):
     explanation: dict
     xp_earned: int
     mastery_level: float
+
+
+class BatchAnswerRequest(BaseModel):
+    answers: List[AnswerRequest] = Field(min_length=1, max_length=100)
+
+
+class BatchAnswerResult(AnswerResponse):
+    """Per-question result; already-answered questions are not re-graded."""
+
+    question_id: int
+    already_answered: bool = False
+
+
+class BatchAnswerResponse(BaseModel):
+    results: List[BatchAnswerResult]
+    total_xp: int
@@ -0,0 +1,18 @@
+"""Response schemas for the MCAT taxonomy endpoints."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class TopicMatch(BaseModel):
+    section: str  # first section listing the match
+    sections: List[str]
+    topic: str
+    subtopic: Optional[str] = None
+    score: float  # higher is a closer match
+
+
+class TopicSearchResponse(BaseModel):
+    query: str
+    matches: List[TopicMatch]
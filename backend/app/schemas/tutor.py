@@ -28,6 +28,8 @@ class MessageOut(BaseModel):
 class ChatHistoryResponse(BaseModel):
     session_id: int
     messages: List[MessageOut]
+    # Pass back as `cursor` for the next page; None when there are no more
+    next_cursor: Optional[str] = None
 
 
 class SocraticChatRequest(BaseModel):
@@ -44,3 +46,21 @@ class SocraticChatResponse(BaseModel):
     escalation_level: int
     topic: str
     concept: str
+
+
+class MessageSearchHit(BaseModel):
+    id: int
+    session_id: Optional[int] = None
+    role: str
+    topic: Optional[str] = None
+    concept: Optional[str] = None
+    created_at: datetime
+    snippet: str  # matched words wrapped in **
+    score: float  # BM25 relevance; higher is better
+
+    model_config = {"from_attributes": True}
+
+
+class MessageSearchResponse(BaseModel):
+    query: str
+    hits: List[MessageSearchHit]
@@ -0,0 +1,126 @@
+"""In-process cache for request authentication.
+
+Every authenticated request verifies a JWT and checks that its user still
+exists and is active. Both results are cached here so the hot path does
+neither: verified tokens are remembered until they expire, and each user's
+id and active flag for AUTH_USER_CACHE_TTL_SECONDS. Both maps are LRU
+bounded at AUTH_CACHE_MAX_ENTRIES.
+
+Updating or deleting a User through the ORM drops its entry in this
+process as soon as the change commits. Other workers pick the change up within the TTL, which
+bounds how long a deactivated user keeps access.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+
+
+class AuthenticatedUser:
+    """The identity a request is authenticated as; load User for anything more."""
+
+    __slots__ = ("id", "is_active")
+
+    def __init__(self, id: int, is_active: bool):
+        self.id = id
+        self.is_active = is_active
+
+
+class AuthCache:
+    def __init__(self):
+        # token -> (user id, expiry as a Unix timestamp)
+        self._tokens: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        # user id -> (user, monotonic time it was loaded)
+        self._users: "OrderedDict[int, Tuple[AuthenticatedUser, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def token_user_id(self, token: str) -> Optional[int]:
+        """User id of a previously verified, unexpired token, else None."""
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        user_id, expires_at = entry
+        if expires_at <= time.time():
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return user_id
+
+    def put_token(self, token: str, user_id: int, expires_at: float) -> None:
+        self._tokens[token] = (user_id, expires_at)
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > settings.AUTH_CACHE_MAX_ENTRIES:
+            self._tokens.popitem(last=False)
+
+    def get_user(self, user_id: int) -> Optional[AuthenticatedUser]:
+        entry = self._users.get(user_id)
+        if entry is not None and (
+            time.monotonic() - entry[1] > settings.AUTH_USER_CACHE_TTL_SECONDS
+        ):
+            self.invalidate_user(user_id)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._users.move_to_end(user_id)
+        return entry[0]
+
+    def put_user(self, user_id: int, is_active: bool) -> AuthenticatedUser:
+        user = AuthenticatedUser(user_id, is_active)
+        self._users[user_id] = (user, time.monotonic())
+        self._users.move_to_end(user_id)
+        while len(self._users) > settings.AUTH_CACHE_MAX_ENTRIES:
+            self._users.popitem(last=False)
+        return user
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._users.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+auth_cache = AuthCache()
+
+
+# Session.info key: ids of users changed by flushes not yet committed
+_CHANGED_USERS = "auth_cache_changed_users"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = {
+        obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)
+    }
+    if changed:
+        session.info.setdefault(_CHANGED_USERS, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    # Only after commit: dropping the entry at flush time would let a
+    # concurrent request re-cache the old row for a whole TTL
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
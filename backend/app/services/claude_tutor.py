@@ -1,16 +1,33 @@
 import asyncio
+import itertools
 import logging
-from datetime import datetime, timezone
-from typing import List, Dict, Optional, Tuple
+import time
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 
-from anthropic import Anthropic, APIError, APIConnectionError, RateLimitError
-from sqlalchemy import select, and_
+import httpx
+from anthropic import AsyncAnthropic, APIError, APIConnectionError, RateLimitError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.tutor_memory import TutorMemory
-from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
 from app.prompts.socratic import build_socratic_prompt
+from app.services.escalation import concept_attempts, level_for_attempts
+from app.services.fake_llm import FakeLLM, FakeTransport, FAKE_BASE_URL
+from app.services.llm_scheduler import llm_scheduler, Priority
+from app.services.mastery_buffer import mastery_buffer, upsert_mastery
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    backoff_delay,
+    hedged,
+    indicates_outage,
+    is_transient,
+    retry_after,
+)
+from app.services.taxonomy import taxonomy_registry
+from app.utils.mcat_topics import normalize_topic
 
 logger = logging.getLogger(__name__)
 
@@ -21,53 +38,350 @@ class TutorServiceError(Exception):
     pass
 
 
+def _service_error(e: APIError) -> TutorServiceError:
+    """Map an Anthropic SDK error to a user-facing TutorServiceError."""
+    if isinstance(e, RateLimitError):
+        logger.warning("Claude API rate limit hit")
+        return TutorServiceError(
+            "The tutor is currently busy. Please try again in a moment."
+        )
+    if isinstance(e, APIConnectionError):
+        logger.error("Failed to connect to Claude API")
+        return TutorServiceError(
+            "Unable to reach the tutor service. Please try again later."
+        )
+    logger.error("Claude API error: %s", e)
+    return TutorServiceError("The tutor encountered an error. Please try again.")
+
+
 DEFAULT_SYSTEM_PROMPT = (
     "You are an expert MCAT tutor. You help students prepare for the MCAT exam. "
     "Be encouraging but rigorous. When a student asks a question, guide them toward "
     "understanding rather than just giving the answer. Keep responses concise and focused."
 )
 
+# Marks the end of a prompt prefix that Claude may cache and reuse
+CACHE_CONTROL = {"type": "ephemeral"}
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+# Fallback pause when a 429 carries no usable retry-after header
+RATE_LIMIT_PAUSE_SECONDS = 5.0
+
+
+def _estimate_tokens(params: dict) -> int:
+    """Rough token cost of a request (~4 chars/token) plus its output cap."""
+    chars = sum(len(block["text"]) for block in params["system"])
+    for message in params["messages"]:
+        content = message["content"]
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(block["text"]) for block in content)
+    return chars // 4 + params["max_tokens"]
+
 
 class ClaudeTutor:
     def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         self.model = "claude-sonnet-4-20250514"
+        self._client: Optional[AsyncAnthropic] = None
+        # Running token totals across all calls, including prompt-cache reads/writes
+        self.usage: Dict[str, int] = {"calls": 0, **{f: 0 for f in USAGE_FIELDS}}
+        # Retries are handled here rather than in the SDK (see resilience.py)
+        self.breaker = CircuitBreaker(
+            settings.CLAUDE_BREAKER_FAILURE_THRESHOLD, settings.CLAUDE_BREAKER_RESET_SECONDS
+        )
+        self.latency = LatencyTracker()
+        self.reliability: Dict[str, int] = {"retries": 0, "hedges": 0}
+
+    @property
+    def client(self) -> AsyncAnthropic:
+        """Shared async client. Opened lazily when used outside the app lifespan."""
+        if self._client is None:
+            self.open()
+        return self._client
+
+    def open(self, base_url: Optional[str] = None) -> None:
+        """Create the async client and its pooled HTTP connections.
+
+        Called from the FastAPI lifespan so every request shares one pool.
+        With LLM_BACKEND=fake, requests are answered in-process by FakeLLM.
+        """
+        if self._client is not None:
+            return
+        timeout = httpx.Timeout(
+            settings.CLAUDE_TIMEOUT_SECONDS,
+            connect=settings.CLAUDE_CONNECT_TIMEOUT_SECONDS,
+        )
+        api_key = settings.ANTHROPIC_API_KEY
+        transport = None
+        if settings.LLM_BACKEND == "fake":
+            transport = FakeTransport(FakeLLM.from_settings())
+            base_url = base_url or FAKE_BASE_URL
+            api_key = api_key or "fake-key"
+        http_client = httpx.AsyncClient(
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=settings.CLAUDE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CLAUDE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.CLAUDE_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        self._client = AsyncAnthropic(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=http_client,
+        )
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections. Called on app shutdown."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
 
     async def chat(
         self,
         user_message: str,
         conversation_history: List[Dict[str, str]],
         system_prompt: Optional[str] = None,
+        timeout: Optional[float] = None,
+        history_summary: Optional[str] = None,
+        max_tokens: int = 1024,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> str:
-        messages = conversation_history + [
-            {"role": "user", "content": user_message}
-        ]
+        params = self._request_params(
+            user_message, conversation_history, system_prompt, timeout, history_summary
+        )
+        params["max_tokens"] = max_tokens
+        tokens = _estimate_tokens(params)
 
-        try:
-            response = await asyncio.to_thread(
-                self.client.messages.create,
-                model=self.model,
-                max_tokens=1024,
-                system=system_prompt or DEFAULT_SYSTEM_PROMPT,
-                messages=messages,
-            )
+        async def attempt():
+            # Every attempt (and hedge) waits for its own scheduler slot
+            async with llm_scheduler.slot(priority, tokens) as grant:
+                started = time.monotonic()
+                response = await self.client.messages.create(**params)
+                grant.settle(self._record_usage(response.usage))
+            if priority == Priority.INTERACTIVE:
+                self.latency.record(time.monotonic() - started)
+            return response
+
+        hedge_after = None
+        if settings.CLAUDE_HEDGE_ENABLED and priority == Priority.INTERACTIVE:
+            hedge_after = self.latency.p95()
+
+        for retry in itertools.count():
+            self._check_circuit()
+            try:
+                response = await hedged(attempt, hedge_after, self._count_hedge)
+            except APIError as e:
+                await self._before_retry(e, retry)
+                continue
+            self.breaker.record_success()
             return response.content[0].text
-        except RateLimitError:
-            logger.warning("Claude API rate limit hit")
-            raise TutorServiceError(
-                "The tutor is currently busy. Please try again in a moment."
-            )
-        except APIConnectionError:
-            logger.error("Failed to connect to Claude API")
+
+    async def chat_stream(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]],
+        system_prompt: Optional[str] = None,
+        timeout: Optional[float] = None,
+        history_summary: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the reply as text deltas as they arrive from Claude.
+
+        Transient failures are retried only until the first delta has been
+        yielded; after that the caller has partial text and gets the error.
+        Closing the generator early (e.g. on client disconnect) exits the
+        stream context, which closes the upstream HTTP response.
+        """
+        params = self._request_params(
+            user_message, conversation_history, system_prompt, timeout, history_summary
+        )
+        tokens = _estimate_tokens(params)
+        for retry in itertools.count():
+            self._check_circuit()
+            started = False
+            try:
+                async with llm_scheduler.slot(Priority.INTERACTIVE, tokens) as grant:
+                    async with self.client.messages.stream(**params) as stream:
+                        async for text in stream.text_stream:
+                            started = True
+                            yield text
+                        message = await stream.get_final_message()
+                    grant.settle(self._record_usage(message.usage))
+            except APIError as e:
+                if started:
+                    self._record_failure(e)
+                    raise _service_error(e)
+                await self._before_retry(e, retry)
+                continue
+            self.breaker.record_success()
+            return
+
+    def _check_circuit(self) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
             raise TutorServiceError(
-                "Unable to reach the tutor service. Please try again later."
+                "The tutor service is temporarily unavailable. Please try again shortly."
             )
-        except APIError as e:
-            logger.error("Claude API error: %s", e)
-            raise TutorServiceError(
-                "The tutor encountered an error. Please try again."
+
+    def _record_failure(self, e: APIError) -> None:
+        if isinstance(e, RateLimitError):
+            hint = retry_after(e)
+            llm_scheduler.pause(RATE_LIMIT_PAUSE_SECONDS if hint is None else hint)
+        if indicates_outage(e):
+            self.breaker.record_failure()
+
+    async def _before_retry(self, e: APIError, retry: int) -> None:
+        """Back off before retrying a failed call, or raise if it should not be."""
+        self._record_failure(e)
+        hint = retry_after(e)
+        if (
+            not is_transient(e)
+            or retry + 1 >= settings.CLAUDE_MAX_ATTEMPTS
+            or (hint or 0) > settings.CLAUDE_BACKOFF_MAX_SECONDS
+        ):
+            raise _service_error(e)
+        delay = backoff_delay(
+            retry,
+            settings.CLAUDE_BACKOFF_BASE_SECONDS,
+            settings.CLAUDE_BACKOFF_MAX_SECONDS,
+            hint,
+        )
+        logger.warning(
+            "Claude call failed (%s); retry %d in %.2fs", type(e).__name__, retry + 1, delay
+        )
+        self.reliability["retries"] += 1
+        await asyncio.sleep(delay)
+
+    def _count_hedge(self) -> None:
+        self.reliability["hedges"] += 1
+
+    def _request_params(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        timeout: Optional[float],
+        history_summary: Optional[str] = None,
+    ) -> dict:
+        """Build Messages API arguments with prompt-cache breakpoints.
+
+        The system prompt, the rolling summary of older turns and the settled
+        history (every turn before the new user message) are identical from
+        one turn to the next, so each ends in a cache breakpoint and Claude
+        can reuse the processed prefix instead of reading it again.
+        """
+        system = [
+            {
+                "type": "text",
+                "text": system_prompt or DEFAULT_SYSTEM_PROMPT,
+                "cache_control": CACHE_CONTROL,
+            }
+        ]
+        if history_summary:
+            system.append({
+                "type": "text",
+                "text": f"Summary of the earlier conversation:\n{history_summary}",
+                "cache_control": CACHE_CONTROL,
+            })
+
+        messages = list(conversation_history)
+        if messages:
+            last = messages[-1]
+            messages[-1] = {
+                "role": last["role"],
+                "content": [
+                    {"type": "text", "text": last["content"], "cache_control": CACHE_CONTROL}
+                ],
+            }
+        messages.append({"role": "user", "content": user_message})
+        return {
+            "model": self.model,
+            "max_tokens": 1024,
+            "system": system,
+            "messages": messages,
+            "timeout": timeout or settings.CLAUDE_TIMEOUT_SECONDS,
+        }
+
+    def _record_usage(self, usage) -> int:
+        """Log per-call token usage and add it to the running totals.
+
+        Returns the tokens the call counts against the rate limit; cache reads
+        are excluded because they do not count toward input limits.
+        """
+        counts = {f: getattr(usage, f, None) or 0 for f in USAGE_FIELDS}
+        self.usage["calls"] += 1
+        for field, value in counts.items():
+            self.usage[field] += value
+        logger.info(
+            "Claude usage: input=%d output=%d cache_read=%d cache_write=%d",
+            counts["input_tokens"],
+            counts["output_tokens"],
+            counts["cache_read_input_tokens"],
+            counts["cache_creation_input_tokens"],
+        )
+        return (
+            counts["input_tokens"]
+            + counts["cache_creation_input_tokens"]
+            + counts["output_tokens"]
+        )
+
+    async def prepare_socratic_turn(
+        self,
+        user_id: int,
+        section: str,
+        topic: str,
+        concept: str,
+        session: StudySession,
+        db: AsyncSession,
+    ) -> Tuple[Optional[TutorMemory], int, str]:
+        """Pick the mastery memory and escalation level for a Socratic turn.
+
+        Returns (memory, escalation_level, system_prompt). `memory` is an
+        unsaved placeholder naming the TutorMemory row for
+        complete_socratic_turn: the concept's subtopic node if it is one,
+        else its topic's. It is None when the topic is not in the taxonomy.
+        """
+        memory = None
+        names = normalize_topic(section, topic, concept)
+        if names is not None:
+            topic_id, subtopic_id = await taxonomy_registry.node_ids(db, *names)
+            memory = TutorMemory(
+                user_id=user_id, topic_id=topic_id, subtopic_id=subtopic_id
             )
 
+        # Earlier attempts at this concept in the session set the escalation
+        attempts = await concept_attempts(db, session, concept)
+        level = level_for_attempts(attempts)
+
+        # Build adaptive system prompt
+        system_prompt = build_socratic_prompt(section, topic, concept, level)
+        return memory, level, system_prompt
+
+    async def complete_socratic_turn(
+        self, memory: Optional[TutorMemory], db: AsyncSession
+    ) -> None:
+        """Record a finished Socratic turn on the student's memory."""
+        if memory is None:
+            return
+        if mastery_buffer.enabled:
+            mastery_buffer.add(memory.user_id, memory.topic_id, memory.subtopic_id)
+            return
+        await upsert_mastery(
+            db, memory.user_id, memory.topic_id, memory.subtopic_id,
+            attempts=1, correct=0, delta=0.0,
+        )
+
     async def socratic_chat(
         self,
         user_id: int,
@@ -76,58 +390,27 @@ class ClaudeTutor:
         section: str,
         topic: str,
         concept: str,
-        session_id: int,
+        session: StudySession,
         db: AsyncSession,
+        history_summary: Optional[str] = None,
     ) -> Tuple[str, int]:
         """Socratic tutoring with adaptive escalation.
 
         Returns (response_text, escalation_level).
         """
-        # Load or create TutorMemory for this user+topic+concept
-        result = await db.execute(
-            select(TutorMemory).where(
-                and_(
-                    TutorMemory.user_id == user_id,
-                    TutorMemory.topic == topic,
-                    TutorMemory.subtopic == concept,
-                )
-            )
-        )
-        memory = result.scalar_one_or_none()
-        if not memory:
-            memory = TutorMemory(
-                user_id=user_id,
-                section=section,
-                topic=topic,
-                subtopic=concept,
-            )
-            db.add(memory)
-            await db.flush()
-
-        # Count concept attempts in this session to determine escalation
-        result = await db.execute(
-            select(ConversationMessage).where(
-                and_(
-                    ConversationMessage.session_id == session_id,
-                    ConversationMessage.role == "user",
-                    ConversationMessage.concept == concept,
-                )
-            )
+        memory, escalation_level, system_prompt = await self.prepare_socratic_turn(
+            user_id, section, topic, concept, session, db
         )
-        session_attempts = len(result.scalars().all())
-        # +1 for current message; map to escalation 1-5
-        escalation_level = min(5, (session_attempts // 2) + 1)
-
-        # Build adaptive system prompt
-        system_prompt = build_socratic_prompt(section, topic, concept, escalation_level)
 
-        # Call Claude via existing chat() method (reuses error handling + asyncio.to_thread)
-        response_text = await self.chat(user_message, conversation_history, system_prompt)
-
-        # Update memory
-        memory.attempt_count += 1
-        memory.last_reviewed_at = datetime.now(timezone.utc)
+        # Call Claude via existing chat() method (reuses error handling)
+        response_text = await self.chat(
+            user_message,
+            conversation_history,
+            system_prompt,
+            history_summary=history_summary,
+        )
 
+        await self.complete_socratic_turn(memory, db)
         return response_text, escalation_level
 
 
@@ -0,0 +1,122 @@
+"""Token-budgeted conversation history with a rolling summary of older turns."""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+from app.prompts.history_summary import HISTORY_SUMMARY_PROMPT, SUMMARY_SYSTEM_PROMPT
+from app.services.claude_tutor import tutor, TutorServiceError
+from app.services.history_cache import history_cache
+from app.services.session_state import set_snapshot_key
+
+logger = logging.getLogger(__name__)
+
+# Key in StudySession.state_snapshot: {"text": str, "through_id": int}
+SUMMARY_KEY = "history_summary"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (roughly 4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+class HistoryCompactor:
+    async def build(
+        self, db: AsyncSession, session: StudySession
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """Return (recent turns verbatim, summary of older turns) within the token budget.
+
+        Only messages newer than the summary are loaded, from history_cache
+        when the session is cached. When they no longer
+        fit in HISTORY_TOKEN_BUDGET, the oldest are folded into the summary
+        until the rest fit in half the budget, so folding (one extra Claude
+        call) happens once per half-budget of new conversation rather than
+        on every turn.
+        """
+        snapshot = session.state_snapshot or {}
+        summary = snapshot.get(SUMMARY_KEY) or {}
+        summary_text = summary.get("text")
+
+        through_id = summary.get("through_id", 0)
+        rows = history_cache.get(session, through_id)
+        if rows is None:
+            result = await db.execute(
+                select(ConversationMessage)
+                .where(
+                    ConversationMessage.session_id == session.id,
+                    ConversationMessage.id > through_id,
+                )
+                .order_by(ConversationMessage.created_at, ConversationMessage.id)
+            )
+            rows = result.scalars().all()
+            history_cache.put(session, through_id, rows)
+
+        budget = settings.HISTORY_TOKEN_BUDGET
+        summary_tokens = estimate_tokens(summary_text) if summary_text else 0
+        if summary_tokens + sum(estimate_tokens(m.content) for m in rows) <= budget:
+            return _as_history(rows), summary_text
+
+        # Keep the newest turns that fit in half the budget; fold the rest
+        keep_from = len(rows)
+        kept_tokens = 0
+        while keep_from > 0:
+            tokens = estimate_tokens(rows[keep_from - 1].content)
+            if kept_tokens + tokens > budget // 2:
+                break
+            kept_tokens += tokens
+            keep_from -= 1
+        # History sent to Claude must start on a user turn
+        while keep_from < len(rows) and rows[keep_from].role != "user":
+            keep_from += 1
+        folded, kept = rows[:keep_from], rows[keep_from:]
+        if not folded:
+            return _as_history(kept), summary_text
+
+        try:
+            summary_text = await self._summarize(summary_text, folded)
+        except TutorServiceError:
+            # Drop the folded turns for this request; the next one retries the fold
+            logger.warning("History summary failed for session %s", session.id)
+            return _as_history(kept), summary_text
+
+        # Merge only the summary, and never over one that folded further
+        # (a concurrent turn may have stored it during the Claude call)
+        stored_through_id = func.json_extract(
+            StudySession.state_snapshot, f"$.{SUMMARY_KEY}.through_id"
+        )
+        if await set_snapshot_key(
+            db,
+            session,
+            SUMMARY_KEY,
+            {"text": summary_text, "through_id": folded[-1].id},
+            func.coalesce(stored_through_id, 0) < folded[-1].id,
+        ):
+            history_cache.put(session, folded[-1].id, kept)
+        return _as_history(kept), summary_text
+
+    async def _summarize(
+        self, summary_text: Optional[str], folded: List[ConversationMessage]
+    ) -> str:
+        turns = "\n".join(f"{m.role}: {m.content}" for m in folded)
+        prompt = HISTORY_SUMMARY_PROMPT.format(
+            summary=summary_text or "(none yet)",
+            turns=turns,
+            max_words=settings.HISTORY_SUMMARY_MAX_WORDS,
+        )
+        return await tutor.chat(
+            user_message=prompt,
+            conversation_history=[],
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+        )
+
+
+def _as_history(rows: List[ConversationMessage]) -> List[Dict[str, str]]:
+    return [{"role": m.role, "content": m.content} for m in rows]
+
+
+history_compactor = HistoryCompactor()
@@ -0,0 +1,64 @@
+"""Per-session Socratic escalation, counted in StudySession.state_snapshot.
+
+Counts are incremented in SQL (see session_state.py), so overlapping turns
+in one session never overwrite each other's attempts.
+"""
+
+from typing import Dict
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+from app.services.session_state import increment_snapshot_count, set_snapshot_key
+
+# Key in StudySession.state_snapshot: {concept: user turns saved so far}
+ATTEMPTS_KEY = "concept_attempts"
+
+MAX_ESCALATION = 5
+
+
+def level_for_attempts(attempts: int) -> int:
+    """Map earlier attempts at a concept to an escalation level (1-5)."""
+    return min(MAX_ESCALATION, (attempts // 2) + 1)
+
+
+async def concept_attempts(db: AsyncSession, session: StudySession, concept: str) -> int:
+    """User turns already saved for `concept` in this session.
+
+    Read from the snapshot counter. Sessions that predate it (or whose
+    snapshot was lost) are recounted from their messages once, with a
+    single grouped query, and the counter is stored for later turns.
+    """
+    snapshot = session.state_snapshot or {}
+    counts = snapshot.get(ATTEMPTS_KEY)
+    if counts is None:
+        counts = await _count_from_history(db, session.id)
+        # Unless a concurrent turn stored the counter first
+        stored = func.json_type(StudySession.state_snapshot, f"$.{ATTEMPTS_KEY}")
+        await set_snapshot_key(db, session, ATTEMPTS_KEY, counts, stored.is_(None))
+    return counts.get(concept, 0)
+
+
+async def record_attempt(db: AsyncSession, session: StudySession, concept: str) -> int:
+    """Count a saved user turn for `concept`. Call alongside saving the turn.
+
+    Returns the concept's attempts so far, this one included.
+    """
+    return await increment_snapshot_count(db, session, ATTEMPTS_KEY, concept)
+
+
+async def _count_from_history(db: AsyncSession, session_id: int) -> Dict[str, int]:
+    if session_id is None:
+        return {}
+    result = await db.execute(
+        select(ConversationMessage.concept, func.count())
+        .where(
+            ConversationMessage.session_id == session_id,
+            ConversationMessage.role == "user",
+            ConversationMessage.concept.is_not(None),
+        )
+        .group_by(ConversationMessage.concept)
+    )
+    return {concept: count for concept, count in result}
@@ -0,0 +1,328 @@
+"""Deterministic stand-in for the Claude Messages API.
+
+Answers POST /v1/messages like the real API (JSON or SSE streaming) so the
+whole stack, including the SDK's error types, ClaudeTutor's retries and the
+scheduler, runs unchanged. Replies are derived from a hash of the request, so
+the same prompt always gets the same text:
+
+- question generation prompts get valid question JSON (an array for batches);
+- history summary prompts get a short summary;
+- anything else gets a Socratic tutor reply.
+
+Latency is time-to-first-token drawn from a log-normal distribution plus
+output tokens at a fixed rate, and a share of requests can fail with 529
+(overloaded) or 429 (rate limited) to reproduce production incidents.
+
+Use it in-process with LLM_BACKEND=fake, or as a standalone server:
+    python -m app.services.fake_llm --port 8089
+and point the app at it with ANTHROPIC_BASE_URL=http://127.0.0.1:8089.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+
+# Base URL the in-process client uses; nothing listens on it
+FAKE_BASE_URL = "http://fake-llm"
+
+# Words sent per streamed text delta
+WORDS_PER_DELTA = 3
+
+TUTOR_REPLIES = (
+    "Before we go further, what do you already know about {focus}?",
+    "Good start. Which variable changes first when you think about {focus}?",
+    "Let's test that idea. If {focus} doubled, what would you expect to happen, and why?",
+    "You're close. What assumption are you making about {focus} that might not hold?",
+    "Try connecting {focus} to a system you know well. Where have you seen it before?",
+)
+
+CONCEPTS = (
+    "equilibrium", "enzyme kinetics", "acid-base balance", "membrane transport",
+    "thermodynamics", "signal transduction", "research design", "stoichiometry",
+)
+
+
+class FakeReply:
+    """Status, headers and either a JSON body or a stream of SSE bytes."""
+
+    def __init__(
+        self,
+        status: int,
+        body: Optional[dict] = None,
+        events: Optional[AsyncIterator[bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.status = status
+        self.body = body
+        self.events = events
+        self.headers = headers or {}
+
+
+class FakeLLM:
+    def __init__(
+        self,
+        latency_median: float = 0.8,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 80.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        # Load counters, handy when reading benchmark results
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @classmethod
+    def from_settings(cls) -> "FakeLLM":
+        return cls(
+            latency_median=settings.FAKE_LLM_LATENCY_MEDIAN_SECONDS,
+            latency_sigma=settings.FAKE_LLM_LATENCY_SIGMA,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            rate_limit_rate=settings.FAKE_LLM_RATE_LIMIT_RATE,
+            retry_after=settings.FAKE_LLM_RETRY_AFTER_SECONDS,
+            seed=settings.FAKE_LLM_SEED,
+        )
+
+    async def handle(self, body: dict) -> FakeReply:
+        """Answer one Messages API request body."""
+        self.requests += 1
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return _error(429, "rate_limit_error", "Rate limited by the fake API",
+                          {"retry-after": f"{self.retry_after:g}"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return _error(529, "overloaded_error", "The fake API is overloaded")
+
+        text = self.reply_text(body)
+        usage = {
+            "input_tokens": _token_count(json.dumps(body.get("system", "")))
+            + _token_count(json.dumps(body.get("messages", []))),
+            "output_tokens": _token_count(text),
+        }
+        first_token = self._first_token_delay()
+        if body.get("stream"):
+            return FakeReply(
+                200,
+                events=self._events(body, text, usage, first_token),
+                headers={"content-type": "text/event-stream"},
+            )
+        async with self._tracking():
+            await asyncio.sleep(first_token + usage["output_tokens"] / self.tokens_per_second)
+        return FakeReply(200, body=_message(body, [{"type": "text", "text": text}], usage))
+
+    def reply_text(self, body: dict) -> str:
+        """The deterministic reply text for a request."""
+        system = _text(body.get("system", ""))
+        prompt = _text(body["messages"][-1]["content"]) if body.get("messages") else ""
+        seed = int.from_bytes(
+            hashlib.sha256(json.dumps(body, sort_keys=True).encode()).digest()[:8], "big"
+        )
+        rng = random.Random(seed)
+
+        if "question generator" in system:
+            match = re.search(r"Generate (\d+) distinct", prompt)
+            passage = '"passage"' in system
+            questions = [
+                _question(rng, prompt, passage) for _ in range(int(match.group(1)) if match else 1)
+            ]
+            return json.dumps(questions if match else questions[0])
+        if "running notes" in system:
+            return (
+                "The student has worked through "
+                f"{rng.choice(CONCEPTS)} and {rng.choice(CONCEPTS)}. They explain the "
+                "core definitions correctly but still hesitate when applying them to "
+                "experimental data. Open question: how the two ideas connect."
+            )
+        focus = " ".join(prompt.split()[:6]).rstrip("?.!,") or "this concept"
+        return rng.choice(TUTOR_REPLIES).format(focus=focus)
+
+    def _first_token_delay(self) -> float:
+        if self.latency_median <= 0:
+            return 0.0
+        return self.latency_median * math.exp(self._random.gauss(0, self.latency_sigma))
+
+    async def _events(
+        self, body: dict, text: str, usage: dict, first_token: float
+    ) -> AsyncIterator[bytes]:
+        async with self._tracking():
+            start = _message(body, [], {**usage, "output_tokens": 1})
+            yield _sse("message_start", {"type": "message_start", "message": start})
+            yield _sse("content_block_start", {
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            })
+            await asyncio.sleep(first_token)
+            words = text.split(" ")
+            for i in range(0, len(words), WORDS_PER_DELTA):
+                chunk = " ".join(words[i:i + WORDS_PER_DELTA])
+                if i + WORDS_PER_DELTA < len(words):
+                    chunk += " "
+                yield _sse("content_block_delta", {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": chunk},
+                })
+                await asyncio.sleep(_token_count(chunk) / self.tokens_per_second)
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield _sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": usage["output_tokens"]},
+            })
+            yield _sse("message_stop", {"type": "message_stop"})
+
+    @asynccontextmanager
+    async def _tracking(self) -> AsyncIterator[None]:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+class FakeTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves requests from a FakeLLM in-process."""
+
+    def __init__(self, fake: FakeLLM):
+        self.fake = fake
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread())
+        reply = await self.fake.handle(body)
+        if reply.events is not None:
+            return httpx.Response(reply.status, headers=reply.headers, stream=_ByteStream(reply.events))
+        return httpx.Response(reply.status, headers=reply.headers, json=reply.body)
+
+
+class _ByteStream(httpx.AsyncByteStream):
+    def __init__(self, events: AsyncIterator[bytes]):
+        self.events = events
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.events:
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self.events.aclose()
+
+
+def create_app(fake: FakeLLM):
+    """Starlette app exposing the fake over HTTP."""
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    async def messages(request: Request):
+        reply = await fake.handle(await request.json())
+        if reply.events is not None:
+            return StreamingResponse(
+                reply.events, status_code=reply.status, headers=reply.headers,
+                media_type="text/event-stream",
+            )
+        return JSONResponse(reply.body, status_code=reply.status, headers=reply.headers)
+
+    async def stats(request: Request):
+        return JSONResponse({
+            "requests": fake.requests,
+            "in_flight": fake.in_flight,
+            "peak_in_flight": fake.peak_in_flight,
+        })
+
+    return Starlette(routes=[
+        Route("/v1/messages", messages, methods=["POST"]),
+        Route("/stats", stats),
+    ])
+
+
+def _question(rng: random.Random, prompt: str, passage: bool) -> dict:
+    topic = re.search(r"Topic: (.+)", prompt)
+    topic = topic.group(1).strip() if topic else "this topic"
+    concept = rng.choice(CONCEPTS)
+    answer = rng.choice("ABCD")
+    question = {
+        "stem": f"In {topic}, which statement about {concept} is correct? "
+                f"(variant {rng.randrange(10**6)})",
+        "options": {k: f"Statement {k} about {concept}" for k in "ABCD"},
+        "correct_answer": answer,
+        "explanation": {
+            "why_correct": f"Statement {answer} follows from the definition of {concept}.",
+            "why_wrong": {k: f"Statement {k} misapplies {concept}." for k in "ABCD" if k != answer},
+        },
+        "concepts_tested": [concept, topic],
+        "high_yield": rng.random() < 0.5,
+    }
+    if passage:
+        question["passage"] = (
+            f"Researchers studying {topic.lower()} measured how {concept} changed "
+            "across four experimental conditions. " * 4
+        ).strip()
+    return question
+
+
+def _message(body: dict, content: List[dict], usage: dict) -> dict:
+    return {
+        "id": "msg_fake",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "fake"),
+        "content": content,
+        "stop_reason": "end_turn" if content else None,
+        "stop_sequence": None,
+        "usage": usage,
+    }
+
+
+def _error(status: int, error_type: str, message: str, headers=None) -> FakeReply:
+    body = {"type": "error", "error": {"type": error_type, "message": message}}
+    return FakeReply(status, body=body, headers=headers)
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "\n".join(block.get("text", "") for block in content)
+
+
+def _token_count(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake Messages API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+    uvicorn.run(create_app(FakeLLM.from_settings()), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
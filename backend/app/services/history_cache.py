@@ -0,0 +1,146 @@
+"""In-process cache of recent conversation history per study session.
+
+Holds the messages newer than a session's rolling summary (see
+conversation_history.py), so an active session's turns need no history
+query. Entries are appended to as turns are saved, evicted least recently
+used once HISTORY_CACHE_MAX_BYTES of message text is held, and dropped after
+HISTORY_CACHE_TTL_SECONDS without use.
+
+Workers stay consistent through StudySession.history_version, which
+append() increments atomically in SQL with every saved turn. The session
+row is loaded on every turn anyway, so an entry whose version no longer
+matches (another worker saved a turn, or a commit rolled back) is a miss
+and is reloaded from the database. invalidate() drops an entry
+outright, e.g. from a cross-worker message bus or after deleting messages.
+"""
+
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+
+# Rough per-message bookkeeping cost on top of the text itself
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+def history_version(session: StudySession) -> int:
+    return session.history_version or 0
+
+
+class _Entry:
+    def __init__(self, version: int, through_id: int, rows: List[ConversationMessage]):
+        self.version = version
+        self.through_id = through_id
+        self.rows = rows
+        self.size = sum(_message_size(m) for m in rows)
+        self.used_at = time.monotonic()
+
+
+def _message_size(message: ConversationMessage) -> int:
+    return len(message.content) + MESSAGE_OVERHEAD_BYTES
+
+
+class HistoryCache:
+    def __init__(self):
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, session: StudySession, through_id: int
+    ) -> Optional[List[ConversationMessage]]:
+        """Messages after `through_id`, oldest first, or None on a miss."""
+        entry = self._entries.get(session.id)
+        if entry is not None and (
+            entry.version != history_version(session)
+            or entry.through_id != through_id
+            or time.monotonic() - entry.used_at > settings.HISTORY_CACHE_TTL_SECONDS
+        ):
+            self.invalidate(session.id)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.used_at = time.monotonic()
+        self._entries.move_to_end(session.id)
+        return list(entry.rows)
+
+    def put(
+        self, session: StudySession, through_id: int, rows: List[ConversationMessage]
+    ) -> None:
+        """Cache the messages after `through_id` at the session's current version."""
+        self.invalidate(session.id)
+        entry = _Entry(history_version(session), through_id, list(rows))
+        self._entries[session.id] = entry
+        self._size += entry.size
+        self._evict()
+
+    async def append(
+        self, db: AsyncSession, session: StudySession, messages: List[ConversationMessage]
+    ) -> None:
+        """Record a saved turn: bump the session's version and extend its entry.
+
+        Call alongside adding `messages` to `db`, which must then be
+        committed for the new version to be seen by other workers. The bump
+        is a single UPDATE, so concurrent turns on one session always end
+        at distinct versions and at most one of them extends a cache entry.
+        """
+        version = await db.scalar(
+            update(StudySession)
+            .where(StudySession.id == session.id)
+            .values(history_version=StudySession.history_version + 1)
+            .returning(StudySession.history_version)
+        )
+        # Already written; keep the ORM from writing it again
+        set_committed_value(session, "history_version", version)
+        entry = self._entries.get(session.id)
+        if entry is None:
+            return
+        if entry.version != version - 1:
+            self.invalidate(session.id)
+            return
+        entry.version = version
+        entry.rows.extend(messages)
+        added = sum(_message_size(m) for m in messages)
+        entry.size += added
+        self._size += added
+        self._evict()
+
+    def invalidate(self, session_id: int) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones over the byte budget."""
+        # Entries are kept in last-used order, so expired ones are at the front
+        horizon = time.monotonic() - settings.HISTORY_CACHE_TTL_SECONDS
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if entry.used_at >= horizon and self._size <= settings.HISTORY_CACHE_MAX_BYTES:
+                break
+            self.invalidate(session_id)
+
+    def metrics(self) -> dict:
+        return {
+            "sessions": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+history_cache = HistoryCache()
@@ -0,0 +1,233 @@
+"""Admission control for outbound Claude calls.
+
+Every call to the Messages API waits here for a slot. The scheduler enforces a
+global concurrency cap plus requests-per-minute and tokens-per-minute budgets,
+and admits queued calls strictly by priority: interactive tutoring first, then
+question generation a student is waiting on, then background work. Background
+calls only use leftover capacity: they are held back whenever admitting them
+would eat into the headroom kept free for the other two.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    GENERATION = 1
+    BACKGROUND = 2
+
+
+class _TokenBucket:
+    """Refills `per_minute` units evenly over a minute. 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def available(self, now: float) -> float:
+        if self.unlimited:
+            return float("inf")
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.level
+
+    def seconds_until(self, amount: float, now: float) -> float:
+        """How long until `amount` units (capped at capacity) are available."""
+        if self.unlimited:
+            return 0.0
+        missing = min(amount, self.capacity) - self.available(now)
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        # May go negative when a call turns out larger than estimated; the
+        # debt is paid back before anything else is admitted.
+        if not self.unlimited:
+            self.level -= amount
+
+
+class _Request:
+    """A queued call; once admitted it is the grant handed back to the caller."""
+
+    def __init__(self, scheduler: "LLMScheduler", priority: Priority, tokens: int):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def settle(self, actual_tokens: int) -> None:
+        """Correct the token budget once the real usage of the call is known."""
+        self.scheduler._tpm.take(actual_tokens - self.tokens)
+        self.tokens = actual_tokens
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        background_headroom: float = 0.2,
+    ):
+        self.max_concurrency = max_concurrency
+        self.background_headroom = background_headroom
+        self._rpm = _TokenBucket(requests_per_minute)
+        self._tpm = _TokenBucket(tokens_per_minute)
+        self._queue: List[Tuple[int, int, _Request]] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0
+        self._timer: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.TimerHandle]] = None
+        self._stats: Dict[Priority, Dict[str, float]] = {
+            p: {"admitted": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            for p in Priority
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, tokens: int) -> AsyncIterator[_Request]:
+        """Wait for admission, hold the slot for the duration of the call.
+
+        `tokens` is the estimated input plus maximum output; call
+        `grant.settle(actual)` once the response reports real usage.
+        """
+        request = _Request(self, priority, tokens)
+        heapq.heappush(self._queue, (priority, next(self._sequence), request))
+        self._dispatch()
+        try:
+            await request.future
+        except asyncio.CancelledError:
+            # Admitted in the same tick the caller was cancelled: give it back
+            if request.future.done() and not request.future.cancelled():
+                self._release()
+            raise
+        try:
+            yield request
+        finally:
+            self._release()
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting new calls for `seconds`, e.g. after a 429."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            logger.warning("Pausing Claude calls for %.1fs after a rate limit", seconds)
+            self._paused_until = until
+        self._dispatch()
+
+    def metrics(self) -> dict:
+        """Queue depth, admissions and queueing delay per priority."""
+        queued = {p: 0 for p in Priority}
+        for priority, _, request in self._queue:
+            if not request.future.done():
+                queued[priority] += 1
+        now = time.monotonic()
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "paused_seconds": round(max(0.0, self._paused_until - now), 3),
+            "requests_available": _gauge(self._rpm.available(now)),
+            "tokens_available": _gauge(self._tpm.available(now)),
+            "priorities": {
+                p.name.lower(): {
+                    "queued": queued[p],
+                    "admitted": int(stats["admitted"]),
+                    "wait_seconds_avg": round(
+                        stats["wait_seconds_total"] / stats["admitted"], 4
+                    ) if stats["admitted"] else 0.0,
+                    "wait_seconds_max": round(stats["wait_seconds_max"], 4),
+                }
+                for p, stats in self._stats.items()
+            },
+        }
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit queued calls in priority order while capacity allows."""
+        now = time.monotonic()
+        while self._queue:
+            _, _, request = self._queue[0]
+            if request.future.done():  # caller cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            delay = self._admission_delay(request, now)
+            if delay is None:
+                return  # wait for a running call to finish
+            if delay > 0:
+                self._wake_in(delay)
+                return
+            heapq.heappop(self._queue)
+            self._admit(request, now)
+
+    def _admission_delay(self, request: _Request, now: float) -> Optional[float]:
+        """Seconds until `request` may start, or None if it needs a free slot.
+
+        Only the head of the queue is considered, so a large interactive call
+        waiting for tokens is never overtaken by smaller lower-priority ones.
+        """
+        reserve = 0.0
+        if request.priority == Priority.BACKGROUND:
+            reserve = self.background_headroom
+        slots = self.max_concurrency - int(self.max_concurrency * reserve)
+        if self._active >= max(1, slots):
+            return None
+        delays = [self._paused_until - now]
+        for bucket, amount in ((self._rpm, 1), (self._tpm, request.tokens)):
+            delays.append(
+                bucket.seconds_until(amount + bucket.capacity * reserve, now)
+            )
+        return max(delays)
+
+    def _admit(self, request: _Request, now: float) -> None:
+        self._active += 1
+        self._rpm.take(1)
+        self._tpm.take(request.tokens)
+        waited = now - request.enqueued
+        stats = self._stats[request.priority]
+        stats["admitted"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        request.future.set_result(None)
+
+    def _wake_in(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            timer_loop, handle = self._timer
+            if timer_loop is loop and not handle.cancelled() and handle.when() <= loop.time() + delay:
+                return
+            handle.cancel()
+        self._timer = (loop, loop.call_later(delay, self._on_timer))
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+
+def _gauge(value: float) -> Optional[int]:
+    return None if value == float("inf") else int(value)
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    background_headroom=settings.LLM_BACKGROUND_HEADROOM,
+)
@@ -0,0 +1,269 @@
+"""Write-behind buffer for TutorMemory counters and mastery.
+
+Answers and Socratic turns each change a student's TutorMemory row. With
+MASTERY_WRITE_BEHIND on, those changes are gathered in memory per
+(user, topic node, subtopic node) and written in one transaction every
+MASTERY_FLUSH_INTERVAL_SECONDS, or sooner once MASTERY_FLUSH_MAX_PENDING
+rows are waiting, so the request path makes no TutorMemory writes. Reads go
+through mastery_level(), which applies pending changes on top of the stored
+row. Pending changes are flushed on shutdown; a hard crash loses at most one
+interval of them.
+
+Every mastery update is "add delta, clamp to [0, 1]", and any sequence of
+those is itself "add d, clamp to [lo, hi]", so a pending entry stores just
+(d, lo, hi) and flushing it gives exactly what per-answer writes would have.
+"""
+
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.tutor_memory import TutorMemory
+
+logger = logging.getLogger(__name__)
+
+# (user_id, topic_id, subtopic_id)
+MemoryKey = Tuple[int, int, Optional[int]]
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(high, max(low, value))
+
+
+async def upsert_mastery(
+    db: AsyncSession,
+    user_id: int,
+    topic_id: int,
+    subtopic_id: Optional[int],
+    attempts: int,
+    correct: int,
+    delta: float,
+    low: float = 0.0,
+    high: float = 1.0,
+    reviewed_at: Optional[datetime] = None,
+) -> float:
+    """Create or update a TutorMemory row in one statement.
+
+    Counters are incremented and mastery becomes
+    clamp(mastery + delta, low, high) in SQL, so concurrent updates for the
+    same subtopic cannot race. Returns the new mastery level.
+    """
+    reviewed_at = reviewed_at or datetime.now(timezone.utc)
+    stmt = sqlite_insert(TutorMemory).values(
+        user_id=user_id,
+        topic_id=topic_id,
+        subtopic_id=subtopic_id,
+        attempt_count=attempts,
+        correct_count=correct,
+        mastery_level=_clamp(delta, low, high),
+        last_reviewed_at=reviewed_at,
+    )
+    # NULL subtopics never conflict in uq_user_topic_subtopic; topic-level
+    # rows use the partial uq_user_topic_no_subtopic index instead
+    if subtopic_id is None:
+        conflict = {
+            "index_elements": ["user_id", "topic_id"],
+            "index_where": TutorMemory.subtopic_id.is_(None),
+        }
+    else:
+        conflict = {"index_elements": ["user_id", "topic_id", "subtopic_id"]}
+    stmt = stmt.on_conflict_do_update(
+        **conflict,
+        set_={
+            "attempt_count": TutorMemory.attempt_count + attempts,
+            "correct_count": TutorMemory.correct_count + correct,
+            "mastery_level": func.min(
+                high, func.max(low, TutorMemory.mastery_level + delta)
+            ),
+            "last_reviewed_at": reviewed_at,
+        },
+    ).returning(TutorMemory.mastery_level)
+    result = await db.execute(stmt)
+    return result.scalar_one()
+
+
+class _Pending:
+    """Changes to one TutorMemory row not yet written."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.correct = 0
+        # mastery -> clamp(mastery + delta, low, high); starts as identity on [0, 1]
+        self.delta = 0.0
+        self.low = 0.0
+        self.high = 1.0
+        self.reviewed_at: Optional[datetime] = None
+
+    def add(self, attempts: int, correct: int, delta: float, reviewed_at: datetime) -> None:
+        self.attempts += attempts
+        self.correct += correct
+        self.delta += delta
+        self.low = _clamp(self.low + delta, 0.0, 1.0)
+        self.high = _clamp(self.high + delta, 0.0, 1.0)
+        self.reviewed_at = reviewed_at
+
+    def absorb_earlier(self, earlier: "_Pending") -> None:
+        """Fold in changes that happened before this entry's (a failed flush)."""
+        self.attempts += earlier.attempts
+        self.correct += earlier.correct
+        self.low, self.high = (
+            _clamp(earlier.low + self.delta, self.low, self.high),
+            _clamp(earlier.high + self.delta, self.low, self.high),
+        )
+        self.delta += earlier.delta
+        self.reviewed_at = self.reviewed_at or earlier.reviewed_at
+
+    def apply(self, mastery_level: float) -> float:
+        return _clamp(mastery_level + self.delta, self.low, self.high)
+
+
+class MasteryBuffer:
+    def __init__(self, session_factory=async_session_maker):
+        self.session_factory = session_factory
+        self._pending: Dict[MemoryKey, _Pending] = {}
+        # Batch being written, and how many flushes have committed
+        self._flushing: Dict[MemoryKey, _Pending] = {}
+        self._commits = 0
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.MASTERY_WRITE_BEHIND
+
+    async def record(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        topic_id: int,
+        subtopic_id: Optional[int],
+        attempts: int = 1,
+        correct: int = 0,
+        delta: float = 0.0,
+    ) -> float:
+        """Apply one change and return the resulting mastery level.
+
+        Buffered when write-behind is on, otherwise written through with
+        upsert_mastery on `db`.
+        """
+        if not self.enabled:
+            return await upsert_mastery(
+                db, user_id, topic_id, subtopic_id, attempts, correct, delta
+            )
+        self.add(user_id, topic_id, subtopic_id, attempts, correct, delta)
+        return await self.mastery_level(db, user_id, topic_id, subtopic_id)
+
+    def add(
+        self,
+        user_id: int,
+        topic_id: int,
+        subtopic_id: Optional[int],
+        attempts: int = 1,
+        correct: int = 0,
+        delta: float = 0.0,
+    ) -> None:
+        """Buffer one change without touching the database."""
+        key = (user_id, topic_id, subtopic_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending()
+        pending.add(attempts, correct, delta, datetime.now(timezone.utc))
+        if len(self._pending) >= settings.MASTERY_FLUSH_MAX_PENDING:
+            self._wake.set()
+
+    async def mastery_level(
+        self, db: AsyncSession, user_id: int, topic_id: int, subtopic_id: Optional[int]
+    ) -> float:
+        """Stored mastery with any pending changes applied (0.0 if no row yet)."""
+        subtopic_filter = (
+            TutorMemory.subtopic_id.is_(None) if subtopic_id is None
+            else TutorMemory.subtopic_id == subtopic_id
+        )
+        query = select(TutorMemory.mastery_level).where(
+            TutorMemory.user_id == user_id,
+            TutorMemory.topic_id == topic_id,
+            subtopic_filter,
+        )
+        while True:
+            commits = self._commits
+            stored = await db.scalar(query)
+            # A flush that committed mid-read may or may not be in `stored`
+            if commits == self._commits:
+                break
+        return self.pending_level((user_id, topic_id, subtopic_id), stored or 0.0)
+
+    def pending_level(self, key: MemoryKey, stored: float) -> float:
+        """Apply unwritten changes for `key` to a stored mastery level."""
+        for changes in (self._flushing, self._pending):
+            if key in changes:
+                stored = changes[key].apply(stored)
+        return stored
+
+    async def flush(self) -> int:
+        """Write all pending changes in one transaction. Returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch = self._flushing = self._pending
+            self._pending = {}
+            try:
+                async with self.session_factory() as db:
+                    for (user_id, topic_id, subtopic_id), pending in batch.items():
+                        await upsert_mastery(
+                            db, user_id, topic_id, subtopic_id,
+                            pending.attempts, pending.correct,
+                            pending.delta, pending.low, pending.high,
+                            pending.reviewed_at,
+                        )
+                    await db.commit()
+                    self._commits += 1
+                    self._flushing = {}
+            except BaseException:
+                self._flushing = {}
+                # Keep the changes for the next flush, ahead of newer ones
+                for key, earlier in batch.items():
+                    newer = self._pending.get(key)
+                    if newer is None:
+                        self._pending[key] = earlier
+                    else:
+                        newer.absorb_earlier(earlier)
+                raise
+            return len(batch)
+
+    def start(self) -> None:
+        """Start the periodic flush loop. Called from the FastAPI lifespan."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._wake.wait(), settings.MASTERY_FLUSH_INTERVAL_SECONDS
+                )
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Mastery buffer flush failed")
+
+
+mastery_buffer = MasteryBuffer()
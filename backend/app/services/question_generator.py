@@ -1,28 +1,112 @@
 """Generate MCAT questions via Claude, cache in DB, retry on parse failures."""
 
+import asyncio
 import logging
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.question import Question
+from app.models.question_cursor import QuestionCursor
 from app.models.user_response import UserResponse
-from app.prompts.question_gen import DISCRETE_QUESTION_PROMPT, PASSAGE_QUESTION_PROMPT
+from app.prompts.question_gen import (
+    DISCRETE_QUESTION_PROMPT,
+    PASSAGE_QUESTION_PROMPT,
+    QUESTION_REQUEST_PROMPT,
+    QUESTION_BATCH_PROMPT,
+)
 from app.services.claude_tutor import tutor, TutorServiceError
+from app.services.llm_scheduler import Priority
+from app.services.taxonomy import taxonomy_registry
 from app.utils.json_parser import parse_llm_json, JSONParseError
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 2
 
+# A cached question serves requests within +/- this many difficulty points
+DIFFICULTY_WINDOW = 2
+
+# Questions requested per Claude call, and output tokens allowed per question
+MAX_BATCH_SIZE = 8
+TOKENS_PER_QUESTION = 1024
+
+ANSWER_CHOICES = ("A", "B", "C", "D")
+
+# Concurrent cache misses for the same parameters share one generation.
+# The leader waits this long for others to join, then generates one
+# question per waiter, up to COALESCE_MAX_BATCH.
+COALESCE_WINDOW_SECONDS = 0.05
+COALESCE_MAX_BATCH = 5
+
+# Bucket questions checked against a user's answers per lookup query
+CURSOR_PAGE_SIZE = 32
+
 GENERATE_SYSTEM_PROMPT = (
     "You are an MCAT question generator. Return ONLY valid JSON, no markdown "
     "formatting, no explanation text. Follow the exact schema requested."
 )
 
 
+def _difficulty_description(difficulty: int) -> str:
+    if difficulty <= 3:
+        return "basic recall"
+    if difficulty <= 6:
+        return "application and analysis"
+    return "complex multi-step reasoning"
+
+
+def _validate_question_data(data: dict, question_type: str) -> None:
+    """Raise ValueError/KeyError/TypeError if a generated question is malformed."""
+    if not isinstance(data["stem"], str) or not data["stem"].strip():
+        raise ValueError("stem must be a non-empty string")
+    options = data["options"]
+    if sorted(options) != list(ANSWER_CHOICES):
+        raise ValueError(f"options must be exactly {', '.join(ANSWER_CHOICES)}")
+    if data["correct_answer"] not in ANSWER_CHOICES:
+        raise ValueError(f"invalid correct_answer: {data['correct_answer']!r}")
+    if not isinstance(data["explanation"], dict):
+        raise TypeError("explanation must be an object")
+    if question_type == "passage" and not data.get("passage"):
+        raise ValueError("passage question is missing its passage")
+
+
+class _FlightAbandoned(Exception):
+    """The leading request went away before its generation finished."""
+
+
+class _Flight:
+    """One in-flight generation shared by concurrent identical misses."""
+
+    def __init__(self):
+        self.waiters = 1
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def join(self) -> int:
+        """Register another waiter and return its index into the results."""
+        self.waiters += 1
+        return self.waiters - 1
+
+
+def _flight_key(
+    section: str, topic: str, subtopic: Optional[str], difficulty: int, question_type: str
+) -> Tuple:
+    return (
+        section.strip().casefold(),
+        topic.strip().casefold(),
+        (subtopic or "").strip().casefold(),
+        difficulty,
+        question_type,
+    )
+
+
 class QuestionGenerator:
+    def __init__(self):
+        self._inflight: Dict[Tuple, _Flight] = {}
+
     async def get_or_generate_question(
         self,
         user_id: int,
@@ -34,36 +118,233 @@ class QuestionGenerator:
         db: AsyncSession,
     ) -> Question:
         """Find a cached unanswered question or generate a new one."""
-        # Find a question the user hasn't answered yet
-        answered_subq = (
-            select(UserResponse.question_id)
-            .where(UserResponse.user_id == user_id)
-            .subquery()
+        cached = await self._find_unanswered(
+            user_id, section, topic, subtopic, difficulty, question_type, 1, db
+        )
+        if cached:
+            return cached[0]
+
+        # Generate a new question, sharing the call with concurrent misses
+        return await self._generate_coalesced(
+            section, topic, subtopic, difficulty, question_type, db
+        )
+
+    async def _generate_coalesced(
+        self,
+        section: str,
+        topic: str,
+        subtopic: Optional[str],
+        difficulty: int,
+        question_type: str,
+        db: AsyncSession,
+    ) -> Question:
+        """Single-flight generation keyed by the normalized parameters.
+
+        The first miss leads: it waits COALESCE_WINDOW_SECONDS for identical
+        misses to join, generates one question per waiter (capped), and
+        commits so the others can load the rows from their own sessions.
+        Freshly generated questions are unanswered by everyone, so every
+        waiter gets a valid question; late joiners share round-robin.
+        """
+        key = _flight_key(section, topic, subtopic, difficulty, question_type)
+        while True:
+            flight = self._inflight.get(key)
+            if flight is None:
+                break
+            index = flight.join()
+            try:
+                question_ids = await asyncio.shield(flight.future)
+            except _FlightAbandoned:
+                continue
+            return await db.get(Question, question_ids[index % len(question_ids)])
+
+        flight = _Flight()
+        self._inflight[key] = flight
+        try:
+            await asyncio.sleep(COALESCE_WINDOW_SECONDS)
+            questions = await self.generate_questions(
+                section, topic, subtopic, difficulty, question_type,
+                min(flight.waiters, COALESCE_MAX_BATCH), db,
+            )
+            await db.commit()
+            flight.future.set_result([q.id for q in questions])
+            return questions[0]
+        except BaseException as e:
+            # Waiters see the same error; if the leader was cancelled they retry
+            if not flight.future.done():
+                error = e if isinstance(e, Exception) else _FlightAbandoned()
+                flight.future.set_exception(error)
+                flight.future.exception()  # mark retrieved; the leader re-raises below
+            raise
+        finally:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+    async def get_practice_set(
+        self,
+        user_id: int,
+        section: str,
+        topic: str,
+        subtopic: Optional[str],
+        difficulty: int,
+        question_type: str,
+        count: int,
+        db: AsyncSession,
+    ) -> List[Question]:
+        """Return `count` unanswered questions, batch-generating any shortfall."""
+        questions = await self._find_unanswered(
+            user_id, section, topic, subtopic, difficulty, question_type, count, db
         )
+        if len(questions) < count:
+            questions += await self.generate_questions(
+                section, topic, subtopic, difficulty, question_type,
+                count - len(questions), db,
+            )
+        return questions
 
+    async def _find_unanswered(
+        self,
+        user_id: int,
+        section: str,
+        topic: str,
+        subtopic: Optional[str],
+        difficulty: int,
+        question_type: str,
+        limit: int,
+        db: AsyncSession,
+    ) -> List[Question]:
+        """Return up to `limit` questions the user hasn't answered, oldest first.
+
+        Bucket questions are scanned in id order from the user's cursor, and
+        only each scanned page is checked against their answers, so the cost
+        stays flat as their history and the bank grow. The cursor then moves
+        past the leading run of answered questions.
+        """
+        topic_id, subtopic_id = await taxonomy_registry.node_ids(
+            db, section, topic, subtopic
+        )
+        if topic_id is None:
+            # Requests are normalized to taxonomy topics, and questions stored
+            # under a topic before it was a node get its id when the node is
+            # inserted (see taxonomy.py), so there is nothing to find
+            return []
         filters = [
-            Question.section == section,
-            Question.topic == topic,
+            Question.topic_id == topic_id,
             Question.question_type == question_type,
-            Question.id.notin_(select(answered_subq.c.question_id)),
         ]
-        if subtopic:
+        if subtopic_id is not None:
+            filters.append(Question.subtopic_id == subtopic_id)
+        elif subtopic:
             filters.append(Question.subtopic == subtopic)
         # Allow +/- 2 difficulty range for cache hits
-        filters.append(Question.difficulty >= max(1, difficulty - 2))
-        filters.append(Question.difficulty <= min(10, difficulty + 2))
+        filters.append(Question.difficulty >= max(1, difficulty - DIFFICULTY_WINDOW))
+        filters.append(Question.difficulty <= min(10, difficulty + DIFFICULTY_WINDOW))
 
-        result = await db.execute(
-            select(Question).where(and_(*filters)).limit(1)
-        )
-        cached = result.scalar_one_or_none()
-        if cached:
-            return cached
+        # Free-text subtopics have no node to key a cursor on
+        use_cursor = subtopic_id is not None or not subtopic
+        bucket = {
+            "user_id": user_id,
+            "topic_id": topic_id,
+            "subtopic_id": subtopic_id or 0,
+            "question_type": question_type,
+            "difficulty": difficulty,
+        }
+        start = 0
+        if use_cursor:
+            start = await db.scalar(
+                select(QuestionCursor.answered_through).filter_by(**bucket)
+            ) or 0
 
-        # Generate a new question
-        return await self._generate_question(
-            section, topic, subtopic, difficulty, question_type, db
+        found: List[Question] = []
+        answered_through = after = start
+        in_answered_run = True
+        page_size = max(limit, CURSOR_PAGE_SIZE)
+        while len(found) < limit:
+            result = await db.execute(
+                select(Question)
+                .where(*filters, Question.id > after)
+                .order_by(Question.id)
+                .limit(page_size)
+            )
+            page = list(result.scalars().all())
+            if not page:
+                break
+            result = await db.execute(
+                select(UserResponse.question_id).where(
+                    UserResponse.user_id == user_id,
+                    UserResponse.question_id.in_([q.id for q in page]),
+                )
+            )
+            answered = set(result.scalars().all())
+            for question in page:
+                if question.id not in answered:
+                    in_answered_run = False
+                    found.append(question)
+                    if len(found) == limit:
+                        break
+                elif in_answered_run:
+                    answered_through = question.id
+            after = page[-1].id
+            if len(page) < page_size:
+                break
+
+        if use_cursor and answered_through > start:
+            stmt = sqlite_insert(QuestionCursor).values(
+                **bucket, answered_through=answered_through
+            )
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=list(bucket),
+                set_={"answered_through": func.max(
+                    QuestionCursor.answered_through, stmt.excluded.answered_through
+                )},
+            ))
+        return found
+
+    async def generate_questions(
+        self,
+        section: str,
+        topic: str,
+        subtopic: Optional[str],
+        difficulty: int,
+        question_type: str,
+        count: int,
+        db: AsyncSession,
+        priority: Priority = Priority.GENERATION,
+    ) -> List[Question]:
+        """Generate and persist up to `count` new questions for one bucket.
+
+        Questions are requested MAX_BATCH_SIZE at a time as a JSON array, so
+        the fixed prompt and round trip are paid once per batch. Each element
+        is validated on its own; valid ones are kept and only the shortfall
+        is asked for again. May return fewer than `count` questions; raises
+        TutorServiceError if none could be generated. Pass
+        Priority.BACKGROUND when no student is waiting on the result.
+        """
+        questions: List[Question] = []
+        while len(questions) < count:
+            wanted = min(count - len(questions), MAX_BATCH_SIZE)
+            try:
+                batch = await self._generate_batch(
+                    section, topic, subtopic, difficulty, question_type, wanted, priority
+                )
+            except TutorServiceError:
+                if not questions:
+                    raise
+                logger.warning("Keeping %d of %d questions", len(questions), count)
+                break
+            questions += batch
+            if len(batch) < wanted:
+                break
+
+        topic_id, subtopic_id = await taxonomy_registry.node_ids(
+            db, section, topic, subtopic
         )
+        for question in questions:
+            question.topic_id = topic_id
+            question.subtopic_id = subtopic_id
+        db.add_all(questions)
+        await db.flush()
+        return questions
 
     async def _generate_question(
         self,
@@ -75,69 +356,102 @@ class QuestionGenerator:
         db: AsyncSession,
     ) -> Question:
         """Call Claude to generate a question, parse JSON, persist to DB."""
+        questions = await self.generate_questions(
+            section, topic, subtopic, difficulty, question_type, 1, db
+        )
+        return questions[0]
+
+    async def _generate_batch(
+        self,
+        section: str,
+        topic: str,
+        subtopic: Optional[str],
+        difficulty: int,
+        question_type: str,
+        count: int,
+        priority: Priority = Priority.GENERATION,
+    ) -> List[Question]:
+        """Ask Claude for `count` questions, retrying for any invalid ones."""
+        # The format template is fixed per question type, so it rides in the
+        # cached system prompt; only the parameters change per request.
         template = (
             PASSAGE_QUESTION_PROMPT if question_type == "passage"
             else DISCRETE_QUESTION_PROMPT
         )
-        if difficulty <= 3:
-            difficulty_description = "basic recall"
-        elif difficulty <= 6:
-            difficulty_description = "application and analysis"
-        else:
-            difficulty_description = "complex multi-step reasoning"
-
-        prompt_text = template.format(
+        system_prompt = f"{GENERATE_SYSTEM_PROMPT}\n\n{template}"
+        request_text = QUESTION_REQUEST_PROMPT.format(
             section=section,
             topic=topic,
             subtopic=subtopic or topic,
             difficulty=difficulty,
-            difficulty_description=difficulty_description,
+            difficulty_description=_difficulty_description(difficulty),
         )
 
+        questions: List[Question] = []
         last_error = None
         for attempt in range(MAX_RETRIES + 1):
+            wanted = count - len(questions)
+            if wanted <= 0:
+                break
+            prompt_text = (
+                request_text if wanted == 1
+                else QUESTION_BATCH_PROMPT.format(request=request_text, count=wanted)
+            )
             try:
                 raw_response = await tutor.chat(
                     user_message=prompt_text,
                     conversation_history=[],
-                    system_prompt=GENERATE_SYSTEM_PROMPT,
-                )
-                data = parse_llm_json(raw_response)
-
-                question = Question(
-                    section=section,
-                    topic=topic,
-                    subtopic=subtopic,
-                    difficulty=difficulty,
-                    question_type=question_type,
-                    stem=data["stem"],
-                    passage=data.get("passage"),
-                    options=data["options"],
-                    correct_answer=data["correct_answer"],
-                    explanation=data["explanation"],
-                    concepts_tested=data.get("concepts_tested"),
-                    high_yield=data.get("high_yield", False),
+                    system_prompt=system_prompt,
+                    max_tokens=TOKENS_PER_QUESTION * wanted,
+                    timeout=settings.CLAUDE_TIMEOUT_SECONDS * wanted,
+                    priority=priority,
                 )
-                db.add(question)
-                await db.flush()
-                return question
-
+                items = parse_llm_json(raw_response)
             except JSONParseError as e:
                 last_error = e
                 logger.warning(
                     "JSON parse failed on attempt %d: %s", attempt + 1, e
                 )
-            except TutorServiceError:
-                raise
-            except (KeyError, TypeError) as e:
-                last_error = e
-                logger.warning(
-                    "Invalid question data on attempt %d: %s", attempt + 1, e
-                )
+                continue
 
-        raise TutorServiceError(
-            f"Failed to generate question after {MAX_RETRIES + 1} attempts: {last_error}"
-        )
+            if isinstance(items, dict):
+                items = [items]
+            if not isinstance(items, list):
+                last_error = TypeError("expected a JSON object or array")
+                continue
+
+            for data in items[:wanted]:
+                try:
+                    _validate_question_data(data, question_type)
+                    questions.append(Question(
+                        section=section,
+                        topic=topic,
+                        subtopic=subtopic,
+                        difficulty=difficulty,
+                        question_type=question_type,
+                        stem=data["stem"],
+                        passage=data.get("passage"),
+                        options=data["options"],
+                        correct_answer=data["correct_answer"],
+                        explanation=data["explanation"],
+                        concepts_tested=data.get("concepts_tested"),
+                        high_yield=data.get("high_yield", False),
+                    ))
+                except (KeyError, TypeError, ValueError) as e:
+                    last_error = e
+                    logger.warning(
+                        "Invalid question data on attempt %d: %s", attempt + 1, e
+                    )
+
+        if not questions:
+            raise TutorServiceError(
+                f"Failed to generate question after {MAX_RETRIES + 1} attempts: {last_error}"
+            )
+        if len(questions) < count:
+            logger.warning(
+                "Generated %d of %d questions: %s", len(questions), count, last_error
+            )
+        return questions
 
 
 question_generator = QuestionGenerator()
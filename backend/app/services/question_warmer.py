@@ -0,0 +1,258 @@
+"""Background replenisher that keeps the practice question bank stocked.
+
+A bucket is (section, topic, subtopic, difficulty band, question_type). Every
+taxonomy bucket is kept at WARMER_BASE_STOCK questions. Buckets students are
+actively requesting are "hot" and kept at WARMER_HOT_STOCK questions that each
+recent requester has not answered yet, refilled hottest first, so the
+generate endpoint can almost always serve from the database.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.question import Question
+from app.models.user_response import UserResponse
+from app.services.claude_tutor import TutorServiceError
+from app.services.llm_scheduler import Priority
+from app.services.question_generator import question_generator, DIFFICULTY_WINDOW
+from app.services.taxonomy import taxonomy_registry
+from app.utils.mcat_topics import MCAT_TAXONOMY, validate_topic
+
+logger = logging.getLogger(__name__)
+
+# Requested difficulty ranges grouped into one bucket
+DIFFICULTY_BANDS: Tuple[Tuple[int, int], ...] = ((1, 3), (4, 6), (7, 10))
+QUESTION_TYPES = ("discrete", "passage")
+
+# Decayed request count at which a bucket counts as hot
+HOT_HEAT = 0.5
+# Recent requesters remembered per bucket for unanswered-stock checks
+MAX_TRACKED_REQUESTERS = 20
+
+# (section, topic, subtopic, band index, question_type)
+BucketKey = Tuple[str, str, Optional[str], int, str]
+
+
+def difficulty_band(difficulty: int) -> int:
+    """Return the index of the band containing `difficulty`."""
+    for band, (low, high) in enumerate(DIFFICULTY_BANDS):
+        if low <= difficulty <= high:
+            return band
+    raise ValueError(f"Difficulty out of range: {difficulty}")
+
+
+def stock_window(band: int) -> Tuple[int, int]:
+    """Difficulties that every request in the band accepts as a cache hit."""
+    low, high = DIFFICULTY_BANDS[band]
+    return max(1, high - DIFFICULTY_WINDOW), min(10, low + DIFFICULTY_WINDOW)
+
+
+async def _bucket_filters(db: AsyncSession, key: BucketKey) -> list:
+    section, topic, subtopic, band, question_type = key
+    low, high = stock_window(band)
+    topic_id, subtopic_id = await taxonomy_registry.node_ids(
+        db, section, topic, subtopic
+    )
+    filters = [
+        Question.topic_id == topic_id,
+        Question.question_type == question_type,
+        Question.difficulty >= low,
+        Question.difficulty <= high,
+    ]
+    if subtopic_id is not None:
+        filters.append(Question.subtopic_id == subtopic_id)
+    elif subtopic:
+        filters.append(Question.subtopic == subtopic)
+    return filters
+
+
+class QuestionWarmer:
+    def __init__(self, session_factory=async_session_maker):
+        self.session_factory = session_factory
+        # key -> (decayed request count, monotonic time it was computed at)
+        self._heat: Dict[BucketKey, Tuple[float, float]] = {}
+        # key -> {user_id: monotonic time of last request}
+        self._requesters: Dict[BucketKey, Dict[int, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._taxonomy_buckets: List[BucketKey] = [
+            (section, topic, subtopic, band, question_type)
+            for section, topics in MCAT_TAXONOMY.items()
+            for topic, subtopics in topics.items()
+            for subtopic in subtopics
+            for band in range(len(DIFFICULTY_BANDS))
+            for question_type in QUESTION_TYPES
+        ]
+
+    def record_request(
+        self,
+        user_id: int,
+        section: str,
+        topic: str,
+        subtopic: Optional[str],
+        difficulty: int,
+        question_type: str,
+    ) -> None:
+        """Count a generate request toward its bucket's heat."""
+        if not validate_topic(section, topic):
+            return
+        key = (section, topic, subtopic, difficulty_band(difficulty), question_type)
+        now = time.monotonic()
+        self._heat[key] = (self._heat_at(key, now) + 1.0, now)
+        requesters = self._requesters.setdefault(key, {})
+        requesters[user_id] = now
+        if len(requesters) > MAX_TRACKED_REQUESTERS:
+            del requesters[min(requesters, key=requesters.get)]
+
+    def _heat_at(self, key: BucketKey, now: float) -> float:
+        heat, as_of = self._heat.get(key, (0.0, now))
+        return heat * 0.5 ** ((now - as_of) / settings.WARMER_HEAT_HALF_LIFE_SECONDS)
+
+    def _expire(self, now: float) -> None:
+        """Forget buckets and requesters that have gone quiet."""
+        horizon = now - 2 * settings.WARMER_HEAT_HALF_LIFE_SECONDS
+        for key in list(self._heat):
+            if self._heat_at(key, now) < 0.01:
+                del self._heat[key]
+        for key, requesters in list(self._requesters.items()):
+            for user_id, seen in list(requesters.items()):
+                if seen < horizon:
+                    del requesters[user_id]
+            if not requesters:
+                del self._requesters[key]
+
+    async def run_once(self) -> int:
+        """Run one refill pass. Returns the number of questions generated."""
+        now = time.monotonic()
+        self._expire(now)
+
+        keys = set(self._heat)
+        if settings.WARMER_BASE_STOCK > 0:
+            keys.update(self._taxonomy_buckets)
+
+        deficits = []
+        async with self.session_factory() as db:
+            totals = await self._bucket_totals(db)
+            for key in keys:
+                heat = self._heat_at(key, now) if key in self._heat else 0.0
+                target = (
+                    settings.WARMER_HOT_STOCK if heat >= HOT_HEAT
+                    else settings.WARMER_BASE_STOCK
+                )
+                stock = totals.get(key, 0)
+                if stock > 0 and key in self._requesters:
+                    stock = await self._unanswered_stock(db, key)
+                if stock < target:
+                    deficits.append((heat, key, target - stock))
+
+        # Hottest buckets first, within the per-cycle generation budget
+        deficits.sort(key=lambda d: d[0], reverse=True)
+        plan = []
+        budget = settings.WARMER_MAX_PER_CYCLE
+        for _, key, missing in deficits:
+            if budget <= 0:
+                break
+            plan.append((key, min(missing, budget)))
+            budget -= plan[-1][1]
+
+        semaphore = asyncio.Semaphore(settings.WARMER_CONCURRENCY)
+        generated = await asyncio.gather(
+            *(self._refill(key, count, semaphore) for key, count in plan)
+        )
+        return sum(generated)
+
+    async def _bucket_totals(self, db: AsyncSession) -> Dict[BucketKey, int]:
+        """Count stored questions per bucket with a single grouped query."""
+        result = await db.execute(
+            select(
+                Question.section,
+                Question.topic,
+                Question.subtopic,
+                Question.question_type,
+                Question.difficulty,
+                func.count(Question.id),
+            ).group_by(
+                Question.section,
+                Question.topic,
+                Question.subtopic,
+                Question.question_type,
+                Question.difficulty,
+            )
+        )
+        totals: Dict[BucketKey, int] = {}
+        for section, topic, subtopic, question_type, difficulty, count in result:
+            for band in range(len(DIFFICULTY_BANDS)):
+                low, high = stock_window(band)
+                if not low <= difficulty <= high:
+                    continue
+                # A topic-level bucket (no subtopic) is served by any subtopic
+                for sub in {subtopic, None}:
+                    key = (section, topic, sub, band, question_type)
+                    totals[key] = totals.get(key, 0) + count
+        return totals
+
+    async def _unanswered_stock(self, db: AsyncSession, key: BucketKey) -> int:
+        """Smallest number of bucket questions any recent requester has left."""
+        filters = await _bucket_filters(db, key)
+        stock = None
+        for user_id in self._requesters[key]:
+            answered = exists().where(
+                UserResponse.user_id == user_id,
+                UserResponse.question_id == Question.id,
+            )
+            result = await db.execute(
+                select(func.count(Question.id)).where(*filters, ~answered)
+            )
+            remaining = result.scalar_one()
+            stock = remaining if stock is None else min(stock, remaining)
+        return stock or 0
+
+    async def _refill(
+        self, key: BucketKey, count: int, semaphore: asyncio.Semaphore
+    ) -> int:
+        section, topic, subtopic, band, question_type = key
+        low, high = stock_window(band)
+        async with semaphore, self.session_factory() as db:
+            try:
+                questions = await question_generator.generate_questions(
+                    section, topic, subtopic, (low + high) // 2, question_type, count, db,
+                    priority=Priority.BACKGROUND,
+                )
+                await db.commit()
+            except TutorServiceError as e:
+                await db.rollback()
+                logger.warning("Warmer could not refill %s: %s", key, e)
+                return 0
+        return len(questions)
+
+    def start(self) -> None:
+        """Start the periodic refill loop. Called from the FastAPI lifespan."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                generated = await self.run_once()
+                if generated:
+                    logger.info("Question warmer generated %d questions", generated)
+            except Exception:
+                logger.exception("Question warmer pass failed")
+            await asyncio.sleep(settings.WARMER_INTERVAL_SECONDS)
+
+
+question_warmer = QuestionWarmer()
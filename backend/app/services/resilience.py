@@ -0,0 +1,163 @@
+"""Retry, hedging and circuit-breaking helpers for Claude calls.
+
+ClaudeTutor uses these to ride out transient provider errors: retries back off
+exponentially with full jitter (never sooner than a retry-after hint), slow
+interactive calls can be hedged with a duplicate once they pass the recent
+p95 latency, and a circuit breaker fails fast while the upstream keeps failing
+so requests do not pile up behind a dead dependency.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from anthropic import APIError, APIConnectionError, APIStatusError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Latency samples kept for the hedging threshold, and the minimum before hedging
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream the breaker considers down."""
+
+    pass
+
+
+def is_transient(e: APIError) -> bool:
+    """Whether a failed call may succeed if simply tried again."""
+    if isinstance(e, APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(e, APIStatusError):
+        if e.response.headers.get("x-should-retry") == "false":
+            return False
+        return e.status_code in (408, 409, 429) or e.status_code >= 500
+    return False
+
+
+def indicates_outage(e: APIError) -> bool:
+    """Transient failures that say the provider is unhealthy, not just busy."""
+    return is_transient(e) and not isinstance(e, RateLimitError)
+
+
+def retry_after(e: APIError) -> Optional[float]:
+    """Seconds the API asked us to wait before retrying, if it said."""
+    response = getattr(e, "response", None)
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+def backoff_delay(
+    attempt: int, base: float, cap: float, hint: Optional[float] = None
+) -> float:
+    """Full-jitter exponential backoff for the given 0-based retry attempt.
+
+    A retry-after hint is a floor: the server knows better than our curve.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, hint) if hint is not None else delay
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive outage failures.
+
+    While open, calls fail fast with CircuitOpenError. Every `reset_seconds`
+    one call is let through as a probe; a success closes the circuit, a
+    failure keeps it open for another period.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        return "closed" if self.opened_at is None else "open"
+
+    def before_call(self) -> None:
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_seconds:
+            self.opened_at = now  # let this call probe; others keep failing fast
+            return
+        self.rejected += 1
+        raise CircuitOpenError("Claude API circuit is open")
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("Claude API recovered; closing circuit")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.error(
+                    "Opening Claude API circuit after %d consecutive failures",
+                    self.failures,
+                )
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    hedge_after: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> T:
+    """Run `call`; if it is still running after `hedge_after` seconds, start a
+    duplicate and return whichever succeeds first, cancelling the other.
+
+    Raises the last error only if every copy fails.
+    """
+    tasks = {asyncio.ensure_future(call())}
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                logger.info("Hedging Claude call after %.2fs", hedge_after)
+                if on_hedge is not None:
+                    on_hedge()
+                tasks.add(asyncio.ensure_future(call()))
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
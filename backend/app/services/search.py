@@ -0,0 +1,142 @@
+"""Full-text search over the FTS5 indexes defined in app/models/fts.py."""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DateTime, select, text
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.question import Question
+
+# Query words used; more add little to ranking and slow the match down
+MAX_QUERY_TERMS = 12
+# Highlight markers around matched words in snippets, and words per snippet
+SNIPPET_OPEN = "**"
+SNIPPET_CLOSE = "**"
+SNIPPET_WORDS = 16
+
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 expression requiring all of its words.
+
+    Words are quoted, so FTS5 operators typed by the user are matched as
+    plain text. The last word also matches as a prefix, for search-as-you-
+    type. Returns None if the query has no words.
+    """
+    words = re.findall(r"\w+", query)[:MAX_QUERY_TERMS]
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+_MESSAGE_SEARCH = """
+SELECT m.id, m.session_id, m.role, m.topic, m.concept, m.created_at,
+       snippet(conversation_messages_fts, 0, :open, :close, '…', :words) AS snippet,
+       -bm25(conversation_messages_fts, 1.0, 0.0) AS score
+FROM conversation_messages_fts
+JOIN conversation_messages AS m ON m.id = conversation_messages_fts.rowid
+WHERE conversation_messages_fts MATCH :match {filters}
+ORDER BY bm25(conversation_messages_fts, 1.0, 0.0)
+LIMIT :limit
+"""
+
+
+async def search_messages(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    topic: Optional[str] = None,
+    concept: Optional[str] = None,
+    limit: int = 20,
+) -> List[Row]:
+    """BM25-ranked messages of one user matching `query`, best first."""
+    terms = match_expression(query)
+    if terms is None:
+        return []
+    params = {
+        "match": f'owner : "u{int(user_id)}" AND content : ({terms})',
+        "open": SNIPPET_OPEN,
+        "close": SNIPPET_CLOSE,
+        "words": SNIPPET_WORDS,
+        "limit": limit,
+    }
+    filters = ""
+    if topic:
+        filters += " AND m.topic = :topic"
+        params["topic"] = topic
+    if concept:
+        filters += " AND m.concept = :concept"
+        params["concept"] = concept
+    stmt = text(_MESSAGE_SEARCH.format(filters=filters)).columns(
+        created_at=DateTime(timezone=True)
+    )
+    # Raw SQL does not autoflush; make turns added in this session visible
+    await db.flush()
+    result = await db.execute(stmt, params)
+    return list(result.all())
+
+
+# BM25 weights for the questions_fts columns (stem, passage, concepts): the
+# concepts a question tests say most about what it is about
+_QUESTION_WEIGHTS = "2.0, 1.0, 3.0"
+
+_QUESTION_SEARCH = """
+SELECT q.id,
+       snippet(questions_fts, -1, :open, :close, '…', :words) AS snippet,
+       -bm25(questions_fts, {weights}) AS score
+FROM questions_fts
+JOIN questions AS q ON q.id = questions_fts.rowid
+WHERE questions_fts MATCH :match {filters}
+ORDER BY bm25(questions_fts, {weights})
+LIMIT :limit
+"""
+
+
+async def search_questions(
+    db: AsyncSession,
+    query: str,
+    section: Optional[str] = None,
+    topic: Optional[str] = None,
+    min_difficulty: Optional[int] = None,
+    max_difficulty: Optional[int] = None,
+    question_type: Optional[str] = None,
+    limit: int = 20,
+) -> List[Tuple[Question, str, float]]:
+    """BM25-ranked (question, snippet, score) matches for `query`, best first."""
+    terms = match_expression(query)
+    if terms is None:
+        return []
+    params = {
+        "match": terms,
+        "open": SNIPPET_OPEN,
+        "close": SNIPPET_CLOSE,
+        "words": SNIPPET_WORDS,
+        "limit": limit,
+    }
+    filters = ""
+    for column, op, value in (
+        ("section", "=", section),
+        ("topic", "=", topic),
+        ("question_type", "=", question_type),
+        ("difficulty", ">=", min_difficulty),
+        ("difficulty", "<=", max_difficulty),
+    ):
+        if value is not None:
+            name = f"p_{len(params)}"
+            filters += f" AND q.{column} {op} :{name}"
+            params[name] = value
+    stmt = text(_QUESTION_SEARCH.format(weights=_QUESTION_WEIGHTS, filters=filters))
+    await db.flush()
+    ranked = (await db.execute(stmt, params)).all()
+    if not ranked:
+        return []
+    result = await db.execute(
+        select(Question).where(Question.id.in_([row.id for row in ranked]))
+    )
+    questions = {question.id: question for question in result.scalars()}
+    return [
+        (questions[row.id], row.snippet, row.score)
+        for row in ranked
+        if row.id in questions
+    ]
@@ -0,0 +1,84 @@
+"""Single-key updates to StudySession.state_snapshot, merged in SQL.
+
+Turns for the same session can overlap (two tabs, or a streamed reply saved
+after another turn started), and each one holds the snapshot it loaded when
+it began. Writing that dict back whole would drop whatever the others
+stored in the meantime, so keys are merged into the row's current JSON
+instead and the session object is refreshed from the result.
+"""
+
+import json
+from typing import Any
+
+from sqlalchemy import case, func, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.session import StudySession
+
+
+def current_snapshot():
+    """The row's state_snapshot in SQL, or an empty object if it has none."""
+    return case(
+        (
+            func.json_type(StudySession.state_snapshot) == "object",
+            StudySession.state_snapshot,
+        ),
+        else_=literal_column("'{}'"),
+    )
+
+
+async def set_snapshot_key(
+    db: AsyncSession, session: StudySession, key: str, value: Any, *conditions
+) -> bool:
+    """Store `value` under `key`, leaving the snapshot's other keys as they are.
+
+    `conditions` are extra WHERE clauses on the session row, e.g. to refuse
+    replacing a newer value. Returns whether the row was updated.
+    """
+    result = await db.execute(
+        update(StudySession)
+        .where(StudySession.id == session.id, *conditions)
+        .values(
+            state_snapshot=func.json_set(
+                current_snapshot(), f"$.{key}", func.json(json.dumps(value))
+            )
+        )
+        .returning(StudySession.state_snapshot)
+    )
+    snapshot = result.scalar_one_or_none()
+    if snapshot is None:
+        return False
+    set_committed_value(session, "state_snapshot", snapshot)
+    return True
+
+
+async def increment_snapshot_count(
+    db: AsyncSession, session: StudySession, key: str, name: str
+) -> int:
+    """Add one to the counter `name` in the {name: count} object under `key`.
+
+    The count is read and written by the same UPDATE, so concurrent
+    increments all land. Returns the new count.
+    """
+    counts = current_snapshot()
+    entries = func.json_each(counts, f"$.{key}").table_valued("key", "value")
+    count = select(entries.c.value).where(entries.c.key == name).scalar_subquery()
+    result = await db.execute(
+        update(StudySession)
+        .where(StudySession.id == session.id)
+        .values(
+            state_snapshot=func.json_set(
+                counts,
+                f"$.{key}",
+                func.json_patch(
+                    func.coalesce(func.json_extract(counts, f"$.{key}"), "{}"),
+                    func.json_object(name, func.coalesce(count, 0) + 1),
+                ),
+            )
+        )
+        .returning(StudySession.state_snapshot)
+    )
+    snapshot = result.scalar_one()
+    set_committed_value(session, "state_snapshot", snapshot)
+    return snapshot[key][name]
@@ -0,0 +1,133 @@
+"""In-memory map between taxonomy names and taxonomy_nodes ids.
+
+Loaded once per process from the database. Nodes added to MCAT_TAXONOMY
+since the table was seeded are inserted on load and get new ids; existing
+ids never change, so every worker resolves a name to the same id. Questions
+stored under those names before they were nodes are pointed at the new
+nodes in the same transaction, so bucket lookups by id still find them.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.question import Question
+from app.models.taxonomy import LEVELS, TaxonomyNode
+from app.utils.mcat_topics import normalize_topic, taxonomy_paths
+
+
+class TaxonomyRegistry:
+    def __init__(self):
+        self._ids: Optional[Dict[Tuple[str, ...], int]] = None
+
+    async def load(self, db: AsyncSession) -> None:
+        """Read all nodes, inserting any the table does not have yet."""
+        result = await db.execute(
+            select(TaxonomyNode.id, TaxonomyNode.parent_id, TaxonomyNode.name)
+            .order_by(TaxonomyNode.id)
+        )
+        paths: Dict[int, Tuple[str, ...]] = {}
+        for node_id, parent_id, name in result:
+            # Parents always have smaller ids than their children
+            paths[node_id] = paths.get(parent_id, ()) + (name,)
+        ids = {path: node_id for node_id, path in paths.items()}
+        inserted: List[Tuple[str, ...]] = []
+        for path in taxonomy_paths():
+            if path in ids:
+                continue
+            node = {"parent_id": ids.get(path[:-1]), "name": path[-1]}
+            node_id = await db.scalar(
+                sqlite_insert(TaxonomyNode)
+                .values(**node, level=LEVELS[len(path) - 1])
+                .on_conflict_do_nothing()
+                .returning(TaxonomyNode.id)
+            )
+            if node_id is None:
+                # Another worker inserted it first, and backfills for it
+                node_id = await db.scalar(select(TaxonomyNode.id).filter_by(**node))
+            else:
+                inserted.append(path)
+            ids[path] = node_id
+        self._ids = ids
+        if inserted:
+            await self._backfill_questions(db, inserted)
+
+    async def _backfill_questions(
+        self, db: AsyncSession, inserted: List[Tuple[str, ...]]
+    ) -> None:
+        """Give questions whose names match newly inserted nodes their ids."""
+        # Questions under a topic that had no node (a new topic's subtopics
+        # are resolved along with it)
+        result = await db.execute(
+            select(Question.section, Question.topic, Question.subtopic)
+            .where(Question.topic_id.is_(None))
+            .distinct()
+        )
+        for section, topic, subtopic in result.all():
+            await self._point_at_nodes(
+                db, Question.topic_id.is_(None), section, topic, subtopic
+            )
+
+        # Free-text subtopics of existing topics that are now nodes
+        topics = {path[:2] for path in inserted if len(path) == 3} - set(inserted)
+        for section, topic in topics:
+            topic_id = self._ids[(section, topic)]
+            result = await db.execute(
+                select(Question.subtopic)
+                .where(
+                    Question.topic_id == topic_id,
+                    Question.subtopic_id.is_(None),
+                    Question.subtopic.is_not(None),
+                )
+                .distinct()
+            )
+            for subtopic in result.scalars().all():
+                await self._point_at_nodes(
+                    db,
+                    (Question.topic_id == topic_id) & Question.subtopic_id.is_(None),
+                    section, topic, subtopic,
+                )
+
+    async def _point_at_nodes(
+        self, db: AsyncSession, bucket, section: str, topic: str, subtopic: Optional[str]
+    ) -> None:
+        """Canonicalize one (section, topic, subtopic) of questions in `bucket`."""
+        names = normalize_topic(section, topic, subtopic)
+        if names is None:
+            return
+        topic_id = self._ids.get(names[:2])
+        subtopic_id = self._ids.get(names) if names[2] else None
+        if topic_id is None:
+            return
+        await db.execute(
+            update(Question)
+            .where(
+                bucket,
+                Question.section == section,
+                Question.topic == topic,
+                Question.subtopic.is_(None) if subtopic is None
+                else Question.subtopic == subtopic,
+            )
+            .values(
+                section=names[0], topic=names[1], subtopic=names[2],
+                topic_id=topic_id, subtopic_id=subtopic_id,
+            )
+        )
+
+    async def node_ids(
+        self, db: AsyncSession, section: str, topic: str, subtopic: Optional[str]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """(topic id, subtopic id) for canonical names; None where not a node."""
+        if self._ids is None:
+            await self.load(db)
+        topic_id = self._ids.get((section, topic))
+        subtopic_id = self._ids.get((section, topic, subtopic)) if subtopic else None
+        return topic_id, subtopic_id
+
+    def clear(self) -> None:
+        self._ids = None
+
+
+taxonomy_registry = TaxonomyRegistry()
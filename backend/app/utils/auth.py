@@ -13,6 +13,7 @@ from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
+from app.services.auth_cache import AuthenticatedUser, auth_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -40,25 +41,39 @@ def create_access_token(
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> AuthenticatedUser:
+    """Authenticate the request, usually without decoding or querying.
+
+    See app/services/auth_cache.py. Routes that need more than the user's
+    id load the User row themselves.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id = payload.get("sub")
-        if user_id is None:
+    user_id = auth_cache.token_user_id(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            user_id = int(payload["sub"])
+        except (JWTError, KeyError, TypeError, ValueError):
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        if "exp" in payload:
+            auth_cache.put_token(token, user_id, payload["exp"])
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if user is None or not user.is_active:
+    user = auth_cache.get_user(user_id)
+    if user is None:
+        result = await db.execute(
+            select(User.is_active).where(User.id == user_id)
+        )
+        is_active = result.scalar_one_or_none()
+        if is_active is None:
+            raise credentials_exception
+        user = auth_cache.put_user(user_id, is_active)
+    if not user.is_active:
         raise credentials_exception
     return user
 
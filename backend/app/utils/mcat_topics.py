@@ -1,6 +1,8 @@
 """MCAT taxonomy: 4 sections, topics, and subtopics with helper functions."""
 
-from typing import Dict, List, Optional
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 MCAT_TAXONOMY: Dict[str, Dict[str, List[str]]] = {
     "Chemical and Physical Foundations of Biological Systems": {
@@ -172,25 +174,255 @@ def list_subtopics(section: str, topic: str) -> List[str]:
     return MCAT_TAXONOMY[section][topic]
 
 
-def search_topics(query: str) -> List[Dict[str, str]]:
-    """Search for topics/subtopics matching a query string (case-insensitive).
+def _normalize(text: str) -> str:
+    """Lowercase and strip accents, for matching."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
 
-    Returns list of dicts with keys: section, topic, subtopic (if matched at subtopic level).
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", _normalize(text))
+
+
+def _max_typos(word: str) -> int:
+    """Edits tolerated in a query word: none for short words, more for long."""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def _deletions(word: str, max_edits: int) -> Set[str]:
+    """`word` with up to `max_edits` characters removed (itself included)."""
+    variants = frontier = {word}
+    for _ in range(max_edits):
+        frontier = {
+            w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))
+        }
+        variants = variants | frontier
+    return variants
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (adjacent transpositions) distance, or limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+# Per-word match scores; a fuzzy match loses FUZZY_PENALTY per edit
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_PENALTY = 0.75
+
+
+class TopicIndex:
+    """Autocomplete index over topic and subtopic names, built once.
+
+    A name that appears under several sections or topics (Biochemistry,
+    Enzyme Kinetics) is one entry listing every section it belongs to. Each
+    query word must match a word of the name exactly, as a prefix, or within
+    _max_typos edits; entries are ranked by how well the words matched, then
+    by whether the whole name starts with the query, then by shorter name.
+    Typo candidates come from a precomputed deletion index (a candidate and
+    the query share a string reachable by deleting characters from both),
+    so no query compares itself against every word.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Dict[str, List[str]]]):
+        # (topic, subtopic) -> sections, in taxonomy order
+        entries: Dict[Tuple[str, Optional[str]], List[str]] = {}
+        for section, topics in taxonomy.items():
+            for topic, subtopics in topics.items():
+                entries.setdefault((topic, None), []).append(section)
+                for subtopic in subtopics:
+                    entries.setdefault((topic, subtopic), []).append(section)
+        self._entries = [
+            {"topic": topic, "subtopic": subtopic, "sections": sections}
+            for (topic, subtopic), sections in entries.items()
+        ]
+        self._names = [
+            _normalize(e["subtopic"] or e["topic"]) for e in self._entries
+        ]
+
+        self._exact: Dict[str, Set[int]] = {}
+        self._prefix: Dict[str, Set[int]] = {}
+        for entry_id, name in enumerate(self._names):
+            for word in _words(name):
+                self._exact.setdefault(word, set()).add(entry_id)
+                for end in range(1, len(word)):
+                    self._prefix.setdefault(word[:end], set()).add(entry_id)
+        self._deletes: Dict[str, Set[str]] = {}
+        for word in self._exact:
+            for variant in _deletions(word, _max_typos(word)):
+                self._deletes.setdefault(variant, set()).add(word)
+
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        max_typos = _max_typos(word)
+        if max_typos:
+            candidates = set()
+            for variant in _deletions(word, max_typos):
+                candidates |= self._deletes.get(variant, set())
+            for candidate in candidates:
+                distance = _edit_distance(word, candidate, max_typos)
+                if 0 < distance <= max_typos:
+                    score = EXACT_SCORE - FUZZY_PENALTY * distance
+                    for entry_id in self._exact[candidate]:
+                        scores[entry_id] = max(scores.get(entry_id, 0.0), score)
+        for entry_id in self._prefix.get(word, ()):
+            scores[entry_id] = max(scores.get(entry_id, 0.0), PREFIX_SCORE)
+        for entry_id in self._exact.get(word, ()):
+            scores[entry_id] = EXACT_SCORE
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        words = _words(query)
+        if not words:
+            return []
+        totals = self._word_scores(words[0])
+        for word in words[1:]:
+            if not totals:
+                break
+            scores = self._word_scores(word)
+            totals = {
+                entry_id: total + scores[entry_id]
+                for entry_id, total in totals.items()
+                if entry_id in scores
+            }
+        phrase = " ".join(words)
+        ranked = sorted(
+            totals.items(),
+            key=lambda item: (
+                -item[1],
+                not self._names[item[0]].startswith(phrase),
+                len(self._names[item[0]]),
+                self._names[item[0]],
+            ),
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        results = []
+        for entry_id, score in ranked:
+            entry = self._entries[entry_id]
+            result = {
+                "section": entry["sections"][0],
+                "topic": entry["topic"],
+                "sections": list(entry["sections"]),
+                "score": score,
+            }
+            if entry["subtopic"] is not None:
+                result["subtopic"] = entry["subtopic"]
+            results.append(result)
+        return results
+
+
+_topic_index = TopicIndex(MCAT_TAXONOMY)
+
+
+def search_topics(query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Search topics/subtopics by name, tolerating typos and partial words.
+
+    Returns dicts, best match first, with keys: section (the first section
+    listing the match), sections (all of them), topic, subtopic (for
+    subtopic-level matches) and score.
+    """
+    return _topic_index.search(query, limit)
+
+
+def taxonomy_paths() -> List[Tuple[str, ...]]:
+    """Every node as (section,), (section, topic) or (section, topic, subtopic).
+
+    Parents come before their children, in taxonomy order.
     """
-    query_lower = query.lower()
-    results = []
+    paths: List[Tuple[str, ...]] = []
     for section, topics in MCAT_TAXONOMY.items():
+        paths.append((section,))
         for topic, subtopics in topics.items():
-            if query_lower in topic.lower():
-                results.append({"section": section, "topic": topic})
-            for subtopic in subtopics:
-                if query_lower in subtopic.lower():
-                    results.append(
-                        {"section": section, "topic": topic, "subtopic": subtopic}
-                    )
-    return results
+            paths.append((section, topic))
+            paths.extend((section, topic, subtopic) for subtopic in subtopics)
+    return paths
+
+
+# Ignored when matching names, so "Acids & Bases" is "Acids and Bases"
+_CONNECTIVES = frozenset({"and", "of", "the", "in"})
+
+
+def _name_words(name: str) -> List[str]:
+    return [word for word in _words(name) if word not in _CONNECTIVES]
+
+
+# parent path -> {normalized child name: canonical child name}
+_children: Dict[Tuple[str, ...], Dict[str, str]] = {}
+for _path in taxonomy_paths():
+    _children.setdefault(_path[:-1], {})[" ".join(_name_words(_path[-1]))] = _path[-1]
+
+
+def _canonical_child(parent: Tuple[str, ...], name: str) -> Optional[str]:
+    """The child of `parent` that `name` spells, allowing _max_typos per word."""
+    children = _children.get(parent, {})
+    words = _name_words(name)
+    key = " ".join(words)
+    if key in children:
+        return children[key]
+    best, best_distance = None, None
+    for child_key, child in children.items():
+        child_words = child_key.split(" ")
+        if len(child_words) != len(words):
+            continue
+        distance = 0
+        for word, child_word in zip(words, child_words):
+            limit = _max_typos(child_word)
+            edits = _edit_distance(word, child_word, limit)
+            if edits > limit:
+                break
+            distance += edits
+        else:
+            if best_distance is None or distance < best_distance:
+                best, best_distance = child, distance
+            elif distance == best_distance:
+                best = None  # ambiguous
+    return best
+
+
+def normalize_topic(
+    section: str, topic: str, subtopic: Optional[str] = None
+) -> Optional[Tuple[str, str, Optional[str]]]:
+    """Canonical (section, topic, subtopic) names, or None if not in the taxonomy.
+
+    Matching ignores case, accents, punctuation, spacing and connectives
+    ("and", "of") and allows a typo or two per long word. A subtopic that is not in the taxonomy is
+    kept as free text, trimmed, since students may ask about narrower ideas.
+    """
+    canonical_section = _canonical_child((), section)
+    if canonical_section is None:
+        return None
+    canonical_topic = _canonical_child((canonical_section,), topic)
+    if canonical_topic is None:
+        return None
+    if subtopic is not None:
+        subtopic = (
+            _canonical_child((canonical_section, canonical_topic), subtopic)
+            or subtopic.strip()
+            or None
+        )
+    return canonical_section, canonical_topic, subtopic
 
 
 def validate_topic(section: str, topic: str) -> bool:
-    """Check if a section/topic combination exists in the taxonomy."""
-    return section in MCAT_TAXONOMY and topic in MCAT_TAXONOMY[section]
+    """Check if a section/topic combination exists in the taxonomy.
+
+    Names are matched as normalize_topic does; use it to get the canonical
+    spelling.
+    """
+    return normalize_topic(section, topic) is not None
@@ -0,0 +1,132 @@
+"""Benchmark: how many concurrent /api/tutor/chat calls one worker keeps in flight.
+
+Starts a stand-in Messages API on localhost that answers every request after a
+fixed delay, points the shared ClaudeTutor client at it, and fires N concurrent
+chat turns through the ASGI app. The stand-in counts how many requests it is
+serving at once, so the peak it reports is the number of upstream calls the
+worker actually held open. With the async client that number is bounded by
+LLM_MAX_CONCURRENCY (and CLAUDE_MAX_CONNECTIONS), not by a thread pool.
+
+Each virtual student gets its own study session up front, so the measured turns
+only append to existing sessions (the realistic multi-turn case).
+
+Usage (from backend/):
+    python -m benchmarks.bench_concurrent_chat --concurrency 50 200 500 --latency 1.0
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.config import settings
+from app.services.claude_tutor import tutor
+from benchmarks.harness import bench_app, login, percentile
+
+
+class StandInAPI:
+    """Minimal Messages API that sleeps `latency` seconds per call."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.app = Starlette(routes=[Route("/v1/messages", self.messages, methods=["POST"])])
+
+    async def messages(self, request: Request) -> JSONResponse:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return JSONResponse({
+            "id": "msg_bench",
+            "type": "message",
+            "role": "assistant",
+            "model": "stand-in",
+            "content": [{"type": "text", "text": "What do you already know about this?"}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 50, "output_tokens": 10},
+        })
+
+
+async def _start_server(stand_in: StandInAPI) -> tuple:
+    config = uvicorn.Config(stand_in.app, host="127.0.0.1", port=0, log_level="warning")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def run(concurrency_levels, latency: float) -> None:
+    stand_in = StandInAPI(latency=0.0)
+    server, server_task, base_url = await _start_server(stand_in)
+    tutor.open(base_url=base_url)
+
+    async with bench_app() as (_, client):
+        headers = await login(client, "bench@test.com")
+
+        session_ids = []
+        for _ in range(max(concurrency_levels)):
+            resp = await client.post(
+                "/api/tutor/chat", headers=headers, json={"content": "Hi"}
+            )
+            session_ids.append(resp.json()["session_id"])
+
+        stand_in.latency = latency
+        print(
+            f"max_concurrency={settings.LLM_MAX_CONCURRENCY} "
+            f"max_connections={settings.CLAUDE_MAX_CONNECTIONS} "
+            f"upstream_latency={latency:.2f}s"
+        )
+        print(f"{'concurrency':>11} {'peak_in_flight':>14} {'ok':>5} {'wall_s':>7} "
+              f"{'req/s':>7} {'p50_s':>6} {'p95_s':>6}")
+
+        for n in concurrency_levels:
+            stand_in.peak = 0
+
+            async def _turn(session_id: int) -> tuple:
+                start = time.perf_counter()
+                r = await client.post(
+                    "/api/tutor/chat",
+                    headers=headers,
+                    json={"content": "Why does Km matter?", "session_id": session_id},
+                )
+                return r.status_code, time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*[_turn(sid) for sid in session_ids[:n]])
+            wall = time.perf_counter() - start
+
+            latencies = sorted(t for _, t in results)
+            ok = sum(1 for status, _ in results if status == 200)
+            p95 = percentile(latencies, 0.95)
+            print(f"{n:>11} {stand_in.peak:>14} {ok:>5} {wall:>7.2f} "
+                  f"{n / wall:>7.1f} {statistics.median(latencies):>6.2f} {p95:>6.2f}")
+
+    await tutor.close()
+    server.should_exit = True
+    await server_task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="simulated upstream latency per call, seconds")
+    args = parser.parse_args()
+    asyncio.run(run(sorted(args.concurrency), args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Shared setup for benchmarks: a throwaway database and an in-process client."""
+
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.main import limiter as main_limiter
+from app.routers.auth import limiter as auth_limiter
+from app.routers.tutor import limiter as tutor_limiter
+from app.routers.questions import limiter as questions_limiter
+
+
+@asynccontextmanager
+async def bench_app() -> AsyncIterator[Tuple[async_sessionmaker, AsyncClient]]:
+    """Run the ASGI app against a temp-file SQLite database, rate limits off.
+
+    Yields the session factory (for seeding) and an httpx client for the app.
+    Each request gets its own session that commits on success, as in production.
+    """
+    db_dir = tempfile.mkdtemp(prefix="mcat-bench-")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(db_dir, 'bench.db')}",
+        connect_args={"timeout": 30},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db():
+        async with session_maker() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    limiters = (main_limiter, auth_limiter, tutor_limiter, questions_limiter)
+    app.dependency_overrides[get_db] = _get_db
+    for lim in limiters:
+        lim.enabled = False
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            yield session_maker, client
+    finally:
+        for lim in limiters:
+            lim.enabled = True
+        app.dependency_overrides.clear()
+        await engine.dispose()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+async def login(client: AsyncClient, email: str, password: str = "benchpass123") -> dict:
+    """Register and log in a user; returns the Authorization header."""
+    await client.post(
+        "/api/auth/register",
+        json={"email": email, "password": password, "name": email.split("@")[0]},
+    )
+    resp = await client.post("/api/auth/login", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
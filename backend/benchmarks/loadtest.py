@@ -0,0 +1,298 @@
+"""Load test: mixed student traffic against the full ASGI app and a fake LLM.
+
+Seeds a throwaway database with questions, then runs virtual students for a
+fixed duration. Each student registers and logs in, then loops over a weighted
+mix of question generation, answers, Socratic turns and history reads. Claude
+calls go to the in-process FakeLLM (LLM_BACKEND=fake) with a configurable
+latency profile, so results reflect our stack rather than the provider.
+
+Sign-ups are timed as their own phase before the traffic window. Prints
+p50/p95/p99 latency and requests/s per route and writes the same numbers
+as JSON to benchmarks/results/ for comparing runs across commits.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --users 50 --duration 30
+    python -m benchmarks.loadtest --latency-median 1.5 --error-rate 0.05 \\
+        --compare benchmarks/results/loadtest-20240101-120000-abc1234.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.services.claude_tutor import tutor
+from app.services.question_generator import question_generator
+from app.utils.mcat_topics import MCAT_TAXONOMY
+from benchmarks.harness import bench_app, percentile
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Relative weights of each student action
+DEFAULT_MIX = {"generate": 3, "answer": 3, "socratic": 3, "history": 1}
+
+SOCRATIC_PROMPTS = (
+    "Why does increasing substrate stop increasing the rate?",
+    "I think a competitive inhibitor lowers Vmax.",
+    "How does this connect to the Henderson-Hasselbalch equation?",
+    "Can you give me a hint?",
+)
+
+
+def _buckets(limit: int) -> List[tuple]:
+    """The first `limit` (section, topic, subtopic) buckets of each section."""
+    buckets = []
+    for section, topics in MCAT_TAXONOMY.items():
+        section_buckets = [
+            (section, topic, subtopic)
+            for topic, subtopics in topics.items()
+            for subtopic in subtopics
+        ]
+        buckets += section_buckets[:limit]
+    return buckets
+
+
+def _configure_fake(args, seeding: bool) -> None:
+    settings.LLM_BACKEND = "fake"
+    settings.FAKE_LLM_LATENCY_MEDIAN_SECONDS = 0.0 if seeding else args.latency_median
+    settings.FAKE_LLM_LATENCY_SIGMA = args.latency_sigma
+    settings.FAKE_LLM_TOKENS_PER_SECOND = 1e6 if seeding else args.tokens_per_second
+    settings.FAKE_LLM_ERROR_RATE = 0.0 if seeding else args.error_rate
+    settings.FAKE_LLM_RATE_LIMIT_RATE = 0.0 if seeding else args.rate_limit_rate
+    settings.FAKE_LLM_SEED = args.seed
+
+
+async def _seed(session_maker, buckets: List[tuple], per_bucket: int) -> int:
+    total = 0
+    for section, topic, subtopic in buckets:
+        for difficulty in (2, 5, 8):
+            async with session_maker() as db:
+                questions = await question_generator.generate_questions(
+                    section, topic, subtopic, difficulty, "discrete", per_bucket, db
+                )
+                await db.commit()
+            total += len(questions)
+    return total
+
+
+class Recorder:
+    """Latencies and failures per route."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, route: str, request) -> Optional[dict]:
+        start = time.perf_counter()
+        resp = await request
+        self.latencies[route].append(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            self.errors[route][resp.status_code] += 1
+            return None
+        return resp.json() if resp.content else {}
+
+    def summary(self, wall: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            routes[route] = {
+                "count": len(ordered),
+                "errors": dict(self.errors[route]),
+                "rps": round(len(ordered) / wall, 2),
+                "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+            }
+        return routes
+
+
+async def _sign_up(client, recorder: "Recorder", index: int) -> Optional[dict]:
+    email = f"student{index}@example.com"
+    password = "benchpass123"
+    await recorder.call("register", client.post(
+        "/api/auth/register", json={"email": email, "password": password, "name": f"Student {index}"}
+    ))
+    token = await recorder.call("login", client.post(
+        "/api/auth/login", data={"username": email, "password": password}
+    ))
+    if token is None:
+        return None
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+async def _student(
+    client, recorder: Recorder, headers: dict, buckets, mix: Dict[str, int],
+    deadline: float, rng: random.Random,
+) -> None:
+    section, topic, subtopic = rng.choice(buckets)
+    pending_question = None
+    session_id = None
+    actions, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        action = rng.choices(actions, weights)[0]
+        if action == "answer" and pending_question is None:
+            action = "generate"
+        if action == "history" and session_id is None:
+            action = "socratic"
+
+        if action == "generate":
+            question = await recorder.call("generate", client.post(
+                "/api/questions/generate", headers=headers, json={
+                    "section": section, "topic": topic, "subtopic": subtopic,
+                    "difficulty": rng.choice((2, 5, 8)),
+                },
+            ))
+            pending_question = question["id"] if question else None
+        elif action == "answer":
+            await recorder.call("answer", client.post(
+                "/api/questions/answer", headers=headers, json={
+                    "question_id": pending_question,
+                    "selected_answer": rng.choice("ABCD"),
+                    "time_spent_seconds": rng.randint(20, 120),
+                },
+            ))
+            pending_question = None
+        elif action == "socratic":
+            turn = await recorder.call("socratic", client.post(
+                "/api/tutor/socratic", headers=headers, json={
+                    "content": rng.choice(SOCRATIC_PROMPTS),
+                    "session_id": session_id,
+                    "section": section, "topic": topic, "concept": subtopic,
+                },
+            ))
+            if turn:
+                session_id = turn["session_id"]
+        else:
+            await recorder.call("history", client.get(
+                "/api/tutor/history", headers=headers, params={"session_id": session_id},
+            ))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_table(routes: dict, baseline: Optional[dict]) -> None:
+    print(f"{'route':<10} {'count':>6} {'err':>5} {'req/s':>7} "
+          f"{'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}" + ("  p95 vs base" if baseline else ""))
+    for route, row in routes.items():
+        line = (f"{route:<10} {row['count']:>6} {sum(row['errors'].values()):>5} "
+                f"{row['rps']:>7.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                f"{row['p99_ms']:>8.1f}")
+        base = (baseline or {}).get(route)
+        if base and base["p95_ms"]:
+            line += f"  {(row['p95_ms'] / base['p95_ms'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+async def run(args) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix or []:
+        name, _, weight = item.partition("=")
+        mix[name] = float(weight)
+    buckets = _buckets(args.buckets_per_section)
+    rng = random.Random(args.seed)
+
+    async with bench_app() as (session_maker, client):
+        _configure_fake(args, seeding=True)
+        tutor.open()
+        seeded = await _seed(session_maker, buckets, args.seed_per_bucket)
+        await tutor.close()
+
+        _configure_fake(args, seeding=False)
+        tutor.open()
+        # Sign-ups run first, timed on their own: password hashing is
+        # deliberately slow and would otherwise dominate the traffic window.
+        auth = Recorder()
+        started = time.perf_counter()
+        logins = await asyncio.gather(*(_sign_up(client, auth, i) for i in range(args.users)))
+        auth_wall = time.perf_counter() - started
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        try:
+            await asyncio.gather(*(
+                _student(client, recorder, headers, buckets, mix, deadline,
+                         random.Random(rng.random()))
+                for headers in logins if headers
+            ))
+        finally:
+            await tutor.close()
+        wall = time.perf_counter() - started
+
+    routes = {**auth.summary(auth_wall), **recorder.summary(wall)}
+    total = sum(row["count"] for row in recorder.summary(wall).values())
+    return {
+        "benchmark": "loadtest",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "mix": mix,
+            "buckets": len(buckets),
+            "seeded_questions": seeded,
+            "fake_llm": {
+                "latency_median_s": args.latency_median,
+                "latency_sigma": args.latency_sigma,
+                "tokens_per_second": args.tokens_per_second,
+                "error_rate": args.error_rate,
+                "rate_limit_rate": args.rate_limit_rate,
+            },
+        },
+        "wall_s": round(wall, 2),
+        "total": {"count": total, "rps": round(total / wall, 2)},
+        "routes": routes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--mix", nargs="*", metavar="ACTION=WEIGHT",
+                        help=f"override action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--buckets-per-section", type=int, default=3)
+    parser.add_argument("--seed-per-bucket", type=int, default=5,
+                        help="questions seeded per bucket and difficulty")
+    parser.add_argument("--latency-median", type=float, default=0.8,
+                        help="fake LLM median time to first token, seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare p95 against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text())["routes"] if args.compare else None
+    _print_table(result["routes"], baseline)
+    print(f"total {result['total']['count']} requests, {result['total']['rps']:.1f} req/s")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = args.output / f"loadtest-{stamp}-{result['git_commit']}.json"
+    path.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
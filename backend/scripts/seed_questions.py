@@ -0,0 +1,70 @@
+"""Seed the question bank for every taxonomy bucket using batch generation.
+
+Usage (from backend/):
+    python -m scripts.seed_questions --per-bucket 5
+    python -m scripts.seed_questions --section "Critical Analysis and Reasoning Skills" --type passage
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.database import Base, engine, async_session_maker
+from app.models import Question  # noqa: F401
+from app.services.claude_tutor import tutor, TutorServiceError
+from app.services.question_generator import question_generator
+from app.services.question_warmer import DIFFICULTY_BANDS, QUESTION_TYPES, stock_window
+from app.utils.mcat_topics import MCAT_TAXONOMY
+
+logger = logging.getLogger("seed_questions")
+
+
+async def seed(per_bucket: int, sections, question_types) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    tutor.open()
+
+    total = 0
+    try:
+        for section, topics in MCAT_TAXONOMY.items():
+            if sections and section not in sections:
+                continue
+            for topic, subtopics in topics.items():
+                for subtopic in subtopics:
+                    for band in range(len(DIFFICULTY_BANDS)):
+                        low, high = stock_window(band)
+                        for question_type in question_types:
+                            async with async_session_maker() as db:
+                                try:
+                                    questions = await question_generator.generate_questions(
+                                        section, topic, subtopic, (low + high) // 2,
+                                        question_type, per_bucket, db,
+                                    )
+                                    await db.commit()
+                                except TutorServiceError as e:
+                                    logger.warning("Skipped %s / %s: %s", topic, subtopic, e)
+                                    continue
+                            total += len(questions)
+                            logger.info(
+                                "%s / %s / band %d / %s: +%d",
+                                topic, subtopic, band + 1, question_type, len(questions),
+                            )
+    finally:
+        await tutor.close()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-bucket", type=int, default=3)
+    parser.add_argument("--section", action="append", default=[])
+    parser.add_argument("--type", action="append", choices=QUESTION_TYPES, default=[])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    total = asyncio.run(seed(args.per_bucket, args.section, args.type or list(QUESTION_TYPES)))
+    logger.info("Seeded %d questions", total)
+
+
+if __name__ == "__main__":
+    main()
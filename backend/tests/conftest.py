@@ -14,14 +14,39 @@ from app.main import limiter as main_limiter
 from app.routers.auth import limiter as auth_limiter
 from app.routers.tutor import limiter as tutor_limiter
 from app.routers.questions import limiter as questions_limiter
+from app.routers.taxonomy import limiter as taxonomy_limiter
+from app.services.auth_cache import auth_cache
+from app.services.history_cache import history_cache
+from app.services.taxonomy import taxonomy_registry
+from tests.index_advisor import IndexAdvisor
 
-_all_limiters = [main_limiter, auth_limiter, tutor_limiter, questions_limiter]
+_all_limiters = [
+    main_limiter, auth_limiter, tutor_limiter, questions_limiter, taxonomy_limiter,
+]
 
 
 # Use in-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "allow_table_scans: skip the index advisor for this test"
+    )
+
+
+@pytest.fixture(autouse=True)
+def index_advisor(request):
+    """Fail any test whose queries full-scan a large table (see index_advisor.py)."""
+    if request.node.get_closest_marker("allow_table_scans"):
+        yield None
+        return
+    with IndexAdvisor() as advisor:
+        yield advisor
+    if advisor.violations:
+        pytest.fail(f"Full table scans on large tables:\n{advisor.report()}")
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     loop = asyncio.new_event_loop()
@@ -35,6 +60,11 @@ async def db_session():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # Cached history is keyed by session id, which every test DB reuses
+    history_cache.clear()
+    taxonomy_registry.clear()
+    # So are user ids, which the auth cache is keyed by
+    auth_cache.clear()
     session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     async with session_maker() as session:
         yield session
@@ -44,6 +74,19 @@ async def db_session():
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Session factory over a fresh file database, for code that opens its own sessions.
+
+    A file rather than :memory: so concurrent sessions get separate connections.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
 @pytest_asyncio.fixture
 async def client(db_session):
     """Async test client with DB override and rate limiting disabled."""
@@ -93,3 +136,16 @@ def mock_claude_response(text: str):
         new_callable=AsyncMock,
         return_value=text,
     )
+
+
+def mock_claude_stream(chunks):
+    """Patch ClaudeTutor.chat_stream to yield fixed text deltas without calling the API."""
+
+    async def _stream(*args, **kwargs):
+        for chunk in chunks:
+            yield chunk
+
+    return patch(
+        "app.services.claude_tutor.ClaudeTutor.chat_stream",
+        side_effect=_stream,
+    )
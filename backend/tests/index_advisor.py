@@ -0,0 +1,66 @@
+"""Test-time index advisor: flags filtered queries that full-scan a large table.
+
+While active, every SELECT/UPDATE/DELETE issued through any SQLAlchemy engine
+is run through SQLite's EXPLAIN QUERY PLAN on the same connection. A plan
+step that scans one of LARGE_TABLES row by row (or has SQLite build an
+automatic index for it) while the statement has a WHERE clause is recorded.
+Unfiltered statements are deliberate full passes and are not flagged.
+"""
+
+import re
+from typing import List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Tables that grow with users and usage; small lookup tables may be scanned
+LARGE_TABLES = frozenset({
+    "questions",
+    "user_responses",
+    "conversation_messages",
+    "tutor_memory",
+    "question_cursors",
+})
+
+_CHECKED_VERBS = ("SELECT", "UPDATE", "DELETE", "WITH")
+_WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+# "SCAN questions" (SQLite >= 3.36) or "SCAN TABLE questions" (older)
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_AUTO_INDEX = re.compile(r"^SEARCH (?:TABLE )?(\w+).*USING AUTOMATIC")
+
+
+class IndexAdvisor:
+    def __init__(self):
+        self.violations: List[Tuple[str, str]] = []
+
+    def __enter__(self) -> "IndexAdvisor":
+        event.listen(Engine, "before_cursor_execute", self._check)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(Engine, "before_cursor_execute", self._check)
+
+    def _check(self, conn, cursor, statement, parameters, context, executemany):
+        words = statement.lstrip().split(None, 1)
+        if (
+            executemany
+            or not words
+            or words[0].upper() not in _CHECKED_VERBS
+            or not _WHERE.search(statement)
+        ):
+            return
+        explain = conn.connection.cursor()
+        try:
+            explain.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = [row[-1] for row in explain.fetchall()]
+        finally:
+            explain.close()
+        for step in plan:
+            match = _FULL_SCAN.match(step) or _AUTO_INDEX.match(step)
+            if match and match.group(1) in LARGE_TABLES:
+                self.violations.append((step, " ".join(statement.split())))
+
+    def report(self) -> str:
+        return "\n".join(
+            f"{step}\n    in: {statement}" for step, statement in self.violations
+        )
@@ -0,0 +1,75 @@
+"""Tests for cached request authentication."""
+
+import time
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from app.models.user import User
+from app.services.auth_cache import AuthCache
+
+
+class _UserQueries:
+    """Counts statements that read the users table."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self._check)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(Engine, "before_cursor_execute", self._check)
+
+    def _check(self, conn, cursor, statement, *args):
+        if "FROM users" in statement:
+            self.count += 1
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_user_lookup(client, auth_headers):
+    with _UserQueries() as queries:
+        for _ in range(3):
+            resp = await client.get(
+                "/api/tutor/search", headers=auth_headers, params={"q": "enzyme"}
+            )
+            assert resp.status_code == 200
+    assert queries.count <= 1
+
+
+@pytest.mark.asyncio
+async def test_deactivated_user_is_rejected(client, auth_headers, db_session):
+    resp = await client.get("/api/auth/me", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["email"] == "test@test.com"
+
+    user = await db_session.get(User, 1)
+    user.is_active = False
+    await db_session.commit()
+
+    resp = await client.get("/api/auth/me", headers=auth_headers)
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_me_rejects_user_deleted_behind_the_cache(client, auth_headers, db_session):
+    resp = await client.get("/api/auth/me", headers=auth_headers)
+    assert resp.status_code == 200
+
+    # Bypass the ORM so the cached entry survives
+    await db_session.execute(text("DELETE FROM users WHERE id = 1"))
+    await db_session.commit()
+    db_session.expunge_all()
+
+    resp = await client.get("/api/auth/me", headers=auth_headers)
+    assert resp.status_code == 401
+
+
+def test_expired_tokens_are_not_served_from_cache():
+    cache = AuthCache()
+    cache.put_token("live", 1, time.time() + 60)
+    cache.put_token("dead", 2, time.time() - 1)
+    assert cache.token_user_id("live") == 1
+    assert cache.token_user_id("dead") is None
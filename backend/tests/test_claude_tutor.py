@@ -0,0 +1,286 @@
+"""Unit tests for the ClaudeTutor service against a stubbed Messages API."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from anthropic import AsyncAnthropic
+
+from app.config import settings
+from app.services.claude_tutor import ClaudeTutor, TutorServiceError
+from app.services.llm_scheduler import LLMScheduler
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    """Give each test its own scheduler so pauses do not leak between tests."""
+    fresh = LLMScheduler(max_concurrency=10)
+    monkeypatch.setattr("app.services.claude_tutor.llm_scheduler", fresh)
+    monkeypatch.setattr(settings, "CLAUDE_BACKOFF_BASE_SECONDS", 0.01)
+    return fresh
+
+
+def _error(status: int, error_type: str, headers=None) -> httpx.Response:
+    return httpx.Response(
+        status,
+        headers=headers,
+        json={"type": "error", "error": {"type": error_type, "message": "nope"}},
+    )
+
+
+def _message_body(text: str) -> dict:
+    return {
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-test",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+
+
+class _SSEStream(httpx.AsyncByteStream):
+    """Streams Messages API SSE events and records whether it was closed."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.closed = False
+
+    async def __aiter__(self):
+        start = {"type": "message_start", "message": {**_message_body(""), "content": []}}
+        yield f"event: message_start\ndata: {json.dumps(start)}\n\n".encode()
+        block = {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+        yield f"event: content_block_start\ndata: {json.dumps(block)}\n\n".encode()
+        for text in self.texts:
+            delta = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+            yield f"event: content_block_delta\ndata: {json.dumps(delta)}\n\n".encode()
+        yield b'event: content_block_stop\ndata: {"type": "content_block_stop", "index": 0}\n\n'
+        end = {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": 5}}
+        yield f"event: message_delta\ndata: {json.dumps(end)}\n\n".encode()
+        yield b'event: message_stop\ndata: {"type": "message_stop"}\n\n'
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _tutor_with_handler(handler) -> ClaudeTutor:
+    """Build a ClaudeTutor whose HTTP client is served by `handler`."""
+    tutor = ClaudeTutor()
+    tutor._client = AsyncAnthropic(
+        api_key="test-key",
+        base_url="http://claude.test",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return tutor
+
+
+@pytest.mark.asyncio
+async def test_chat_returns_text_and_sends_history():
+    seen = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json=_message_body("Think about Km."))
+
+    tutor = _tutor_with_handler(handler)
+    history = [
+        {"role": "user", "content": "What is Vmax?"},
+        {"role": "assistant", "content": "What limits the rate?"},
+    ]
+    text = await tutor.chat("Substrate?", history, system_prompt="Be brief.")
+    await tutor.close()
+
+    assert text == "Think about Km."
+    assert seen["body"]["messages"][-1] == {"role": "user", "content": "Substrate?"}
+    assert len(seen["body"]["messages"]) == 3
+    assert tutor.usage["input_tokens"] == 10
+
+
+@pytest.mark.asyncio
+async def test_chat_marks_system_and_settled_history_cacheable():
+    seen = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        body = _message_body("ok")
+        body["usage"].update(cache_read_input_tokens=900, cache_creation_input_tokens=40)
+        return httpx.Response(200, json=body)
+
+    tutor = _tutor_with_handler(handler)
+    history = [
+        {"role": "user", "content": "What is Vmax?"},
+        {"role": "assistant", "content": "What limits the rate?"},
+    ]
+    await tutor.chat("Substrate?", history, system_prompt="Be brief.")
+    await tutor.close()
+
+    body = seen["body"]
+    assert body["system"] == [
+        {"type": "text", "text": "Be brief.", "cache_control": {"type": "ephemeral"}}
+    ]
+    # Breakpoint sits on the last settled turn, not the new user message
+    assert body["messages"][0]["content"] == "What is Vmax?"
+    assert body["messages"][1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert body["messages"][2] == {"role": "user", "content": "Substrate?"}
+
+    assert tutor.usage["calls"] == 1
+    assert tutor.usage["cache_read_input_tokens"] == 900
+    assert tutor.usage["cache_creation_input_tokens"] == 40
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_with_long_retry_after_fails_fast_and_pauses(scheduler):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return _error(429, "rate_limit_error", {"retry-after": "30"})
+
+    tutor = _tutor_with_handler(handler)
+    with pytest.raises(TutorServiceError):
+        await tutor.chat("hi", [])
+    await tutor.close()
+    assert len(calls) == 1  # waiting 30s would outlast the request
+    assert 29 < scheduler.metrics()["paused_seconds"] <= 30
+    assert scheduler.metrics()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    responses = [
+        _error(529, "overloaded_error"),
+        _error(500, "api_error"),
+        httpx.Response(200, json=_message_body("Recovered.")),
+    ]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    tutor = _tutor_with_handler(handler)
+    assert await tutor.chat("hi", []) == "Recovered."
+    await tutor.close()
+    assert tutor.reliability["retries"] == 2
+    assert tutor.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_bad_request_is_not_retried():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return _error(400, "invalid_request_error")
+
+    tutor = _tutor_with_handler(handler)
+    with pytest.raises(TutorServiceError):
+        await tutor.chat("hi", [])
+    await tutor.close()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast(monkeypatch):
+    monkeypatch.setattr(settings, "CLAUDE_MAX_ATTEMPTS", 1)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ConnectError("connection refused")
+
+    tutor = _tutor_with_handler(handler)
+    for _ in range(tutor.breaker.failure_threshold):
+        with pytest.raises(TutorServiceError):
+            await tutor.chat("hi", [])
+    assert tutor.breaker.state == "open"
+
+    with pytest.raises(TutorServiceError, match="temporarily unavailable"):
+        await tutor.chat("hi", [])
+    await tutor.close()
+    assert len(calls) == tutor.breaker.failure_threshold
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "CLAUDE_HEDGE_ENABLED", True)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(5)  # the stuck original
+        return httpx.Response(200, json=_message_body("Fast copy."))
+
+    tutor = _tutor_with_handler(handler)
+    for _ in range(20):
+        tutor.latency.record(0.05)
+    assert await asyncio.wait_for(tutor.chat("hi", []), timeout=2) == "Fast copy."
+    await tutor.close()
+    assert tutor.reliability["hedges"] == 1
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_yields_deltas():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            stream=_SSEStream(["What ", "limits ", "Vmax?"]),
+        )
+
+    tutor = _tutor_with_handler(handler)
+    chunks = [text async for text in tutor.chat_stream("Explain Vmax", [])]
+    await tutor.close()
+    assert "".join(chunks) == "What limits Vmax?"
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_retries_before_first_token():
+    responses = [_error(529, "overloaded_error")]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if responses:
+            return responses.pop(0)
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=_SSEStream(["Km ", "again"])
+        )
+
+    tutor = _tutor_with_handler(handler)
+    chunks = [text async for text in tutor.chat_stream("Explain Km", [])]
+    await tutor.close()
+    assert "".join(chunks) == "Km again"
+    assert tutor.reliability["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_closed_early_closes_upstream():
+    body = _SSEStream(["one ", "two ", "three"])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=body
+        )
+
+    tutor = _tutor_with_handler(handler)
+    stream = tutor.chat_stream("Count", [])
+    assert await stream.__anext__() == "one "
+    await stream.aclose()  # what a client disconnect does to the relay
+    await tutor.close()
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_open_creates_pooled_client_and_close_releases_it():
+    tutor = ClaudeTutor()
+    tutor.open(base_url="http://claude.test")
+    http_client = tutor.client._client
+    assert tutor.client.timeout.read == settings.CLAUDE_TIMEOUT_SECONDS
+    assert tutor.client.max_retries == 0  # retries are ours, not the SDK's
+
+    await tutor.close()
+    assert http_client.is_closed
+    assert tutor._client is None
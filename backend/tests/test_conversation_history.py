@@ -0,0 +1,102 @@
+"""Unit tests for token-budgeted history compaction."""
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+from app.services.conversation_history import (
+    SUMMARY_KEY,
+    estimate_tokens,
+    history_compactor,
+)
+from app.services.history_cache import history_cache
+from tests.conftest import mock_claude_response
+
+
+async def _session_with_turns(db, turns: int, words: int = 40) -> StudySession:
+    session = StudySession(user_id=1, mode="chat")
+    db.add(session)
+    await db.flush()
+    for i in range(turns):
+        db.add_all([
+            ConversationMessage(
+                user_id=1, session_id=session.id, role="user",
+                content=f"question {i} " + "word " * words,
+            ),
+            ConversationMessage(
+                user_id=1, session_id=session.id, role="assistant",
+                content=f"answer {i} " + "word " * words,
+            ),
+        ])
+    await db.flush()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_history_under_budget_is_verbatim(db_session):
+    session = await _session_with_turns(db_session, turns=3)
+    with mock_claude_response("unused") as mock_chat:
+        history, summary = await history_compactor.build(db_session, session)
+    assert len(history) == 6
+    assert history[0]["content"].startswith("question 0")
+    assert summary is None
+    mock_chat.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_history_over_budget_folds_older_turns(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 400)
+    session = await _session_with_turns(db_session, turns=10)
+
+    with mock_claude_response("Student covered Km and Vmax.") as mock_chat:
+        history, summary = await history_compactor.build(db_session, session)
+    assert mock_chat.call_count == 1
+    assert summary == "Student covered Km and Vmax."
+    assert history[0]["role"] == "user"
+    assert history[-1]["content"].startswith("answer 9")
+    assert sum(estimate_tokens(m["content"]) for m in history) <= 200
+    assert session.state_snapshot[SUMMARY_KEY]["text"] == summary
+
+    # Summary is reused, not regenerated, while the new turns still fit
+    with mock_claude_response("unused") as mock_chat:
+        history_again, summary_again = await history_compactor.build(db_session, session)
+    mock_chat.assert_not_called()
+    assert history_again == history
+    assert summary_again == summary
+
+
+@pytest.mark.asyncio
+async def test_summary_write_merges_into_current_snapshot(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 400)
+    session = await _session_with_turns(db_session, turns=10)
+    # Another turn stores its own key after this one loaded the session
+    await db_session.execute(
+        update(StudySession)
+        .where(StudySession.id == session.id)
+        .values(state_snapshot={"concept_attempts": {"Km": 2}})
+    )
+
+    with mock_claude_response("Student covered Km and Vmax."):
+        await history_compactor.build(db_session, session)
+    await db_session.refresh(session)
+    assert session.state_snapshot["concept_attempts"] == {"Km": 2}
+    assert session.state_snapshot[SUMMARY_KEY]["text"] == "Student covered Km and Vmax."
+
+
+@pytest.mark.asyncio
+async def test_stale_fold_does_not_replace_newer_summary(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 400)
+    session = await _session_with_turns(db_session, turns=10)
+    with mock_claude_response("Newer summary."):
+        await history_compactor.build(db_session, session)
+
+    # A turn that loaded the session before that summary was stored
+    set_committed_value(session, "state_snapshot", None)
+    history_cache.clear()
+    with mock_claude_response("Stale summary."):
+        await history_compactor.build(db_session, session)
+    await db_session.refresh(session)
+    assert session.state_snapshot[SUMMARY_KEY]["text"] == "Newer summary."
@@ -0,0 +1,87 @@
+"""Tests for the local Messages API stand-in."""
+
+import httpx
+import pytest
+from anthropic import AsyncAnthropic
+
+from app.config import settings
+from app.services.claude_tutor import ClaudeTutor, TutorServiceError
+from app.services.fake_llm import FakeLLM, FakeTransport
+from app.services.llm_scheduler import LLMScheduler
+from app.services.question_generator import QuestionGenerator
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.claude_tutor.llm_scheduler", LLMScheduler(max_concurrency=10)
+    )
+    monkeypatch.setattr(settings, "CLAUDE_BACKOFF_BASE_SECONDS", 0.01)
+
+
+def _tutor(fake: FakeLLM) -> ClaudeTutor:
+    tutor = ClaudeTutor()
+    tutor._client = AsyncAnthropic(
+        api_key="fake-key",
+        base_url="http://fake-llm",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=FakeTransport(fake)),
+    )
+    return tutor
+
+
+@pytest.mark.asyncio
+async def test_tutor_reply_is_deterministic():
+    tutor = _tutor(FakeLLM(latency_median=0))
+    first = await tutor.chat("Why does Km matter?", [])
+    second = await tutor.chat("Why does Km matter?", [])
+    await tutor.close()
+    assert first == second
+    assert first.endswith("?")
+    assert tutor.usage["output_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_several_deltas():
+    tutor = _tutor(FakeLLM(latency_median=0, tokens_per_second=10_000))
+    chunks = [text async for text in tutor.chat_stream("Explain osmotic pressure", [])]
+    await tutor.close()
+    assert len(chunks) > 1
+    assert "".join(chunks).endswith("?")
+
+
+@pytest.mark.asyncio
+async def test_generated_batch_is_valid_question_json(db_session, monkeypatch):
+    tutor = _tutor(FakeLLM(latency_median=0, tokens_per_second=10_000))
+    monkeypatch.setattr("app.services.question_generator.tutor", tutor)
+
+    questions = await QuestionGenerator().generate_questions(
+        "Biological and Biochemical Foundations of Living Systems",
+        "Biochemistry", "Enzyme Kinetics", 5, "passage", 4, db_session,
+    )
+    await tutor.close()
+    assert len(questions) == 4
+    assert len({q.stem for q in questions}) == 4
+    assert all(q.passage for q in questions)
+
+
+@pytest.mark.asyncio
+async def test_errors_surface_as_real_api_errors(monkeypatch):
+    monkeypatch.setattr(settings, "CLAUDE_MAX_ATTEMPTS", 2)
+    fake = FakeLLM(latency_median=0, rate_limit_rate=1.0, retry_after=0)
+    tutor = _tutor(fake)
+    with pytest.raises(TutorServiceError, match="busy"):
+        await tutor.chat("hi", [])
+    await tutor.close()
+    assert fake.requests == 2  # retried once, as for a real 429
+
+
+@pytest.mark.asyncio
+async def test_open_uses_fake_backend(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY_MEDIAN_SECONDS", 0.0)
+    tutor = ClaudeTutor()
+    tutor.open()
+    reply = await tutor.chat("What is a buffer?", [])
+    await tutor.close()
+    assert "buffer" in reply
@@ -0,0 +1,106 @@
+"""Integration tests for paginated and streamed conversation history."""
+
+import json
+
+import pytest
+
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+
+
+async def _session_with_messages(db, count: int) -> int:
+    # The auth_headers user is the first registered, so has id 1
+    session = StudySession(user_id=1, mode="chat")
+    db.add(session)
+    await db.flush()
+    # Flushed together, so most share a created_at second; ids break ties
+    db.add_all([
+        ConversationMessage(
+            user_id=1, session_id=session.id,
+            role="user" if i % 2 == 0 else "assistant", content=f"message {i}",
+        )
+        for i in range(count)
+    ])
+    await db.commit()
+    return session.id
+
+
+async def _pages(client, headers, session_id, direction):
+    contents, cursor = [], None
+    while True:
+        params = {"session_id": session_id, "limit": 2, "direction": direction}
+        if cursor:
+            params["cursor"] = cursor
+        resp = await client.get("/api/tutor/history", headers=headers, params=params)
+        assert resp.status_code == 200
+        data = resp.json()
+        contents.append([m["content"] for m in data["messages"]])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return contents
+
+
+@pytest.mark.asyncio
+async def test_history_pages_forward(client, auth_headers, db_session):
+    session_id = await _session_with_messages(db_session, 5)
+    pages = await _pages(client, auth_headers, session_id, "forward")
+    assert pages == [
+        ["message 0", "message 1"], ["message 2", "message 3"], ["message 4"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_pages_backward(client, auth_headers, db_session):
+    session_id = await _session_with_messages(db_session, 5)
+    pages = await _pages(client, auth_headers, session_id, "backward")
+    assert pages == [
+        ["message 3", "message 4"], ["message 1", "message 2"], ["message 0"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_without_limit_returns_everything(client, auth_headers, db_session):
+    session_id = await _session_with_messages(db_session, 120)
+    resp = await client.get(
+        "/api/tutor/history", headers=auth_headers, params={"session_id": session_id}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data["messages"]) == 120
+    assert data["messages"][0]["content"] == "message 0"
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_history_rejects_bad_cursor(client, auth_headers, db_session):
+    session_id = await _session_with_messages(db_session, 1)
+    resp = await client.get(
+        "/api/tutor/history",
+        headers=auth_headers,
+        params={"session_id": session_id, "cursor": "not-a-cursor"},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_history_stream_ndjson(client, auth_headers, db_session):
+    session_id = await _session_with_messages(db_session, 5)
+    resp = await client.get(
+        "/api/tutor/history/stream",
+        headers=auth_headers,
+        params={"session_id": session_id},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [m["content"] for m in lines] == [f"message {i}" for i in range(5)]
+
+    # Each line's cursor resumes the stream after it
+    resp = await client.get(
+        "/api/tutor/history/stream",
+        headers=auth_headers,
+        params={"session_id": session_id, "cursor": lines[2]["cursor"]},
+    )
+    assert [json.loads(line)["content"] for line in resp.text.splitlines()] == [
+        "message 3", "message 4",
+    ]
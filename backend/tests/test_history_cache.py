@@ -0,0 +1,102 @@
+"""Unit tests for the per-session conversation history cache."""
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+from app.services.history_cache import HistoryCache, history_cache
+from tests.conftest import mock_claude_response
+
+
+def _message(role: str, content: str) -> ConversationMessage:
+    return ConversationMessage(user_id=1, role=role, content=content)
+
+
+@pytest.mark.asyncio
+async def test_append_extends_entry_and_bumps_version(db_session):
+    cache = HistoryCache()
+    session = StudySession(user_id=1, mode="chat")
+    db_session.add(session)
+    await db_session.flush()
+    cache.put(session, 0, [])
+
+    await cache.append(
+        db_session, session, [_message("user", "hi"), _message("assistant", "hello")]
+    )
+    assert session.history_version == 1
+    rows = cache.get(session, 0)
+    assert [m.content for m in rows] == ["hi", "hello"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_append_invalidates_entry(db_session):
+    cache = HistoryCache()
+    session = StudySession(user_id=1, mode="chat")
+    db_session.add(session)
+    await db_session.flush()
+    cache.put(session, 0, [])
+
+    # Another worker saved a turn first: the row is at 1, this copy still at 0
+    await db_session.execute(
+        update(StudySession)
+        .where(StudySession.id == session.id)
+        .values(history_version=1)
+    )
+    await cache.append(db_session, session, [_message("user", "hi")])
+    assert session.history_version == 2
+    assert cache.get(session, 0) is None
+
+
+def test_version_mismatch_is_a_miss():
+    cache = HistoryCache()
+    session = StudySession(id=1, user_id=1, mode="chat", history_version=0)
+    cache.put(session, 0, [_message("user", "hi")])
+
+    # Another worker saved a turn: the loaded row carries a newer version
+    session.history_version = 1
+    assert cache.get(session, 0) is None
+    assert cache.metrics()["sessions"] == 0
+
+
+def test_evicts_least_recently_used_over_byte_budget(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_CACHE_MAX_BYTES", 1000)
+    cache = HistoryCache()
+    sessions = [StudySession(id=i, user_id=1, mode="chat") for i in range(3)]
+    for session in sessions[:2]:
+        cache.put(session, 0, [_message("user", "x" * 300)])
+    cache.get(sessions[0], 0)  # session 1 is now least recently used
+
+    cache.put(sessions[2], 0, [_message("user", "x" * 300)])
+    assert cache.get(sessions[1], 0) is None
+    assert cache.get(sessions[0], 0) is not None
+    assert cache.metrics()["bytes"] <= 1000
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_CACHE_TTL_SECONDS", -1)
+    cache = HistoryCache()
+    session = StudySession(id=1, user_id=1, mode="chat")
+    cache.put(session, 0, [])
+    assert cache.get(session, 0) is None
+
+
+@pytest.mark.asyncio
+async def test_active_session_turns_hit_the_cache(client, auth_headers):
+    with mock_claude_response("First reply"):
+        resp = await client.post(
+            "/api/tutor/chat", headers=auth_headers, json={"content": "Hello"}
+        )
+    session_id = resp.json()["session_id"]
+    misses = history_cache.misses
+
+    with mock_claude_response("Second reply") as mock_chat:
+        await client.post(
+            "/api/tutor/chat",
+            headers=auth_headers,
+            json={"content": "More", "session_id": session_id},
+        )
+    assert history_cache.misses == misses
+    sent = mock_chat.call_args.args[1]
+    assert [m["content"] for m in sent] == ["Hello", "First reply"]
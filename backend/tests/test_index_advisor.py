@@ -0,0 +1,40 @@
+"""Tests for the test-time index advisor and the composite indexes it guards."""
+
+import pytest
+from sqlalchemy import select
+
+from app.models.conversation import ConversationMessage
+from app.models.question import Question
+from tests.index_advisor import IndexAdvisor
+
+
+@pytest.mark.asyncio
+@pytest.mark.allow_table_scans
+async def test_advisor_flags_unindexed_filter(db_session):
+    with IndexAdvisor() as advisor:
+        await db_session.execute(select(Question).where(Question.stem == "x"))
+    assert len(advisor.violations) == 1
+    assert "questions" in advisor.violations[0][0]
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(db_session):
+    with IndexAdvisor() as advisor:
+        await db_session.execute(
+            select(Question).where(
+                Question.topic_id == 5,
+                Question.question_type == "discrete",
+                Question.difficulty >= 3,
+                Question.difficulty <= 7,
+            )
+        )
+        await db_session.execute(
+            select(ConversationMessage).where(
+                ConversationMessage.session_id == 1,
+                ConversationMessage.role == "user",
+                ConversationMessage.concept == "pH",
+            )
+        )
+        # Unfiltered passes are deliberate and not flagged
+        await db_session.execute(select(Question))
+    assert advisor.violations == []
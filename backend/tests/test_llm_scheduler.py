@@ -0,0 +1,104 @@
+"""Tests for priority admission of outbound Claude calls."""
+
+import asyncio
+
+import pytest
+
+from app.services.llm_scheduler import LLMScheduler, Priority
+
+
+async def _hold(scheduler, priority, started, release, tokens=10):
+    async with scheduler.slot(priority, tokens):
+        started.append(priority)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_admitted_by_priority():
+    scheduler = LLMScheduler(max_concurrency=1)
+    started, release = [], asyncio.Event()
+
+    blocker = asyncio.create_task(_hold(scheduler, Priority.GENERATION, started, release))
+    await asyncio.sleep(0)
+    waiting = [
+        asyncio.create_task(_hold(scheduler, p, started, release))
+        for p in (Priority.BACKGROUND, Priority.GENERATION, Priority.INTERACTIVE)
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.metrics()["priorities"]["interactive"]["queued"] == 1
+
+    release.set()
+    await asyncio.gather(blocker, *waiting)
+    assert started == [
+        Priority.GENERATION, Priority.INTERACTIVE, Priority.GENERATION, Priority.BACKGROUND
+    ]
+    assert scheduler.metrics()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_background_leaves_headroom():
+    scheduler = LLMScheduler(max_concurrency=5, background_headroom=0.2)
+    started, release = [], asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(_hold(scheduler, Priority.BACKGROUND, started, release))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    assert started.count(Priority.BACKGROUND) == 4  # one slot kept free
+
+    tasks.append(asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, started, release)))
+    await asyncio.sleep(0)
+    assert Priority.INTERACTIVE in started
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_token_budget_delays_admission():
+    scheduler = LLMScheduler(max_concurrency=10, tokens_per_minute=600)  # 10 tokens/s
+    started, release = [], asyncio.Event()
+    release.set()
+
+    await _hold(scheduler, Priority.INTERACTIVE, started, release, tokens=600)
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    await _hold(scheduler, Priority.INTERACTIVE, started, release, tokens=2)
+    assert loop.time() - begin >= 0.15
+
+    wait = scheduler.metrics()["priorities"]["interactive"]["wait_seconds_max"]
+    assert wait >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_pause_holds_new_calls():
+    scheduler = LLMScheduler(max_concurrency=10)
+    started, release = [], asyncio.Event()
+    release.set()
+
+    scheduler.pause(0.1)
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    await _hold(scheduler, Priority.INTERACTIVE, started, release)
+    assert loop.time() - begin >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_frees_its_place():
+    scheduler = LLMScheduler(max_concurrency=1)
+    started, release = [], asyncio.Event()
+
+    blocker = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, started, release))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, started, release))
+    await asyncio.sleep(0)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    release.set()
+    await blocker
+    await _hold(scheduler, Priority.BACKGROUND, started, release)
+    assert started == [Priority.INTERACTIVE, Priority.BACKGROUND]
+    assert scheduler.metrics()["active"] == 0
@@ -0,0 +1,71 @@
+"""Unit tests for the TutorMemory write-behind buffer."""
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.tutor_memory import TutorMemory
+from app.services.mastery_buffer import MasteryBuffer
+
+# Seeded taxonomy_nodes ids: General Chemistry and its Atomic Structure subtopic
+TOPIC_ID = 2
+SUBTOPIC_ID = 3
+
+
+async def _memories(session_factory):
+    async with session_factory() as db:
+        return (await db.execute(select(TutorMemory))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_buffered_changes_are_read_before_flush(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "MASTERY_WRITE_BEHIND", True)
+    buffer = MasteryBuffer(session_factory=session_factory)
+
+    async with session_factory() as db:
+        # Wrong then right: the clamp at 0 applies per answer, not to the net
+        await buffer.record(db, 1, TOPIC_ID, SUBTOPIC_ID, 1, 0, -0.02)
+        level = await buffer.record(db, 1, TOPIC_ID, SUBTOPIC_ID, 1, 1, 0.05)
+    assert level == pytest.approx(0.05)
+    assert await _memories(session_factory) == []
+
+    assert await buffer.flush() == 1
+    [memory] = await _memories(session_factory)
+    assert (memory.attempt_count, memory.correct_count) == (2, 1)
+    assert memory.mastery_level == pytest.approx(0.05)
+    assert memory.last_reviewed_at is not None
+
+    async with session_factory() as db:
+        assert await buffer.mastery_level(db, 1, TOPIC_ID, SUBTOPIC_ID) == pytest.approx(0.05)
+
+
+@pytest.mark.asyncio
+async def test_flush_applies_clamped_changes_to_stored_row(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "MASTERY_WRITE_BEHIND", True)
+    buffer = MasteryBuffer(session_factory=session_factory)
+    async with session_factory() as db:
+        db.add(TutorMemory(
+            user_id=1, topic_id=TOPIC_ID, subtopic_id=None, mastery_level=0.98,
+        ))
+        await db.commit()
+
+    for _ in range(3):
+        buffer.add(1, TOPIC_ID, None, correct=1, delta=0.05)
+    buffer.add(1, TOPIC_ID, None, delta=-0.02)
+    await buffer.stop()
+
+    [memory] = await _memories(session_factory)
+    assert memory.attempt_count == 4
+    assert memory.mastery_level == pytest.approx(0.98)
+
+
+@pytest.mark.asyncio
+async def test_write_through_when_disabled(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "MASTERY_WRITE_BEHIND", False)
+    buffer = MasteryBuffer(session_factory=session_factory)
+    async with session_factory() as db:
+        level = await buffer.record(db, 1, TOPIC_ID, None, 1, 1, 0.05)
+        await db.commit()
+    assert level == pytest.approx(0.05)
+    assert len(await _memories(session_factory)) == 1
+    assert await buffer.flush() == 0
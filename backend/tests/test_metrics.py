@@ -0,0 +1,30 @@
+"""Access control for the operational /metrics endpoint."""
+
+import pytest
+
+from app.config import settings
+
+
+@pytest.mark.asyncio
+async def test_metrics_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    resp = await client.get("/metrics")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_metrics_rejects_missing_or_wrong_token(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "ops-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    # A user's access token is not the metrics token
+    assert (await client.get("/metrics", headers=auth_headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_metrics_with_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "ops-secret")
+    resp = await client.get(
+        "/metrics", headers={"Authorization": "Bearer ops-secret"}
+    )
+    assert resp.status_code == 200
+    assert "llm_scheduler" in resp.json()
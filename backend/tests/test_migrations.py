@@ -0,0 +1,111 @@
+"""Alembic migrations run against a SQLite file seeded with legacy data."""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from app.config import settings
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+@pytest.fixture
+def migrate(tmp_path, monkeypatch):
+    """Return (upgrade to a revision, sqlite3 connection) for a fresh database."""
+    db_path = tmp_path / "migrate.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+
+    def upgrade(revision: str) -> None:
+        # env.py runs migrations with asyncio.run(), which would leave this
+        # thread without the event loop the async tests share
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(command.upgrade, config, revision).result()
+
+    conn = sqlite3.connect(db_path)
+    yield upgrade, conn
+    conn.close()
+
+
+@pytest.mark.allow_table_scans
+def test_unique_answers_migration_removes_duplicates(migrate):
+    upgrade, conn = migrate
+    upgrade("c7d2e94a1b05")
+    conn.executemany(
+        "INSERT INTO user_responses (id, user_id, question_id, selected_answer,"
+        " is_correct, xp_earned) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (1, 1, 10, "A", 1, 10),
+            (2, 1, 10, "B", 0, 0),
+            (3, 1, 11, "C", 1, 10),
+            (4, 2, 10, "A", 1, 10),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO tutor_memory (id, user_id, section, topic, subtopic, mastery_level,"
+        " attempt_count, correct_count, last_reviewed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (1, 1, "S", "T", None, 0.1, 2, 1, "2026-01-01 10:00:00"),
+            (2, 1, "S", "T", None, 0.4, 3, 3, "2026-01-03 10:00:00"),
+            (3, 1, "S", "T", None, 0.2, 1, 0, None),
+            (4, 1, "S", "T", "Sub", 0.5, 4, 2, "2026-01-02 10:00:00"),
+            (5, 2, "S", "T", None, 0.3, 1, 1, "2026-01-02 10:00:00"),
+        ],
+    )
+    conn.commit()
+
+    upgrade("e41a9c6f3d28")
+
+    responses = conn.execute(
+        "SELECT id, selected_answer FROM user_responses ORDER BY id"
+    ).fetchall()
+    assert responses == [(1, "A"), (3, "C"), (4, "A")]
+    memories = conn.execute(
+        "SELECT id, subtopic, mastery_level, attempt_count, correct_count, last_reviewed_at"
+        " FROM tutor_memory ORDER BY id"
+    ).fetchall()
+    assert memories == [
+        (1, None, 0.4, 6, 4, "2026-01-03 10:00:00"),
+        (4, "Sub", 0.5, 4, 2, "2026-01-02 10:00:00"),
+        (5, None, 0.3, 1, 1, "2026-01-02 10:00:00"),
+    ]
+
+
+@pytest.mark.allow_table_scans
+def test_tutor_memory_migration_keys_rows_on_nodes(migrate):
+    upgrade, conn = migrate
+    upgrade("8c3f2a6d9e41")
+    section = "Biological and Biochemical Foundations of Living Systems"
+    conn.executemany(
+        "INSERT INTO tutor_memory (user_id, section, topic, subtopic, mastery_level,"
+        " attempt_count, correct_count, last_reviewed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (1, section, "Biochemistry", None, 0.2, 2, 1, "2026-01-01 10:00:00"),
+            # Socratic concepts that are not nodes count toward the topic
+            (1, section, "biochemistry", "Michaelis-Menten", 0.0, 3, 0, "2026-01-03 10:00:00"),
+            (1, section, "Biochemistry", "enzyme kinetcs", 0.5, 4, 2, None),
+            (1, section, "Astrology", None, 0.0, 5, 0, None),
+        ],
+    )
+    conn.commit()
+
+    upgrade("6d2a9f4c8b17")
+
+    memories = conn.execute(
+        "SELECT t.name, s.name, m.mastery_level, m.attempt_count, m.correct_count,"
+        " m.last_reviewed_at FROM tutor_memory AS m"
+        " JOIN taxonomy_nodes AS t ON t.id = m.topic_id"
+        " JOIN taxonomy_nodes AS p ON p.id = t.parent_id AND p.name = ?"
+        " LEFT JOIN taxonomy_nodes AS s ON s.id = m.subtopic_id ORDER BY m.id",
+        (section,),
+    ).fetchall()
+    assert memories == [
+        ("Biochemistry", None, 0.2, 5, 1, "2026-01-03 10:00:00"),
+        ("Biochemistry", "Enzyme Kinetics", 0.5, 4, 2, None),
+    ]
+    assert conn.execute("SELECT COUNT(*) FROM tutor_memory").fetchone() == (2,)
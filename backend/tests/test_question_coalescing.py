@@ -0,0 +1,65 @@
+"""Concurrent identical cache misses share one question generation."""
+
+import asyncio
+import json
+import re
+
+import pytest
+from unittest.mock import patch
+
+from app.services.claude_tutor import TutorServiceError
+from app.services.question_generator import QuestionGenerator
+from tests.test_questions import SAMPLE_QUESTION_JSON
+
+SECTION = "Chemical and Physical Foundations of Biological Systems"
+TOPIC = "General Chemistry"
+
+
+async def _slow_batch(*args, **kwargs):
+    """Fake Claude: answers after a delay with as many questions as were asked for."""
+    await asyncio.sleep(0.1)
+    match = re.search(r"Generate (\d+) distinct", kwargs["user_message"])
+    if not match:
+        return SAMPLE_QUESTION_JSON
+    item = json.loads(SAMPLE_QUESTION_JSON)
+    return json.dumps([dict(item, stem=f"Q{i}") for i in range(int(match.group(1)))])
+
+
+async def _request(generator, session_factory, user_id: int):
+    async with session_factory() as db:
+        question = await generator.get_or_generate_question(
+            user_id, SECTION, TOPIC, None, 5, "discrete", db
+        )
+        await db.commit()
+        return question.id
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call(session_factory):
+    generator = QuestionGenerator()
+    with patch(
+        "app.services.claude_tutor.ClaudeTutor.chat", side_effect=_slow_batch
+    ) as mock_chat:
+        ids = await asyncio.gather(
+            *(_request(generator, session_factory, user_id) for user_id in range(1, 5))
+        )
+    assert mock_chat.call_count == 1
+    assert len(set(ids)) == 4  # one fresh question per waiter
+    assert generator._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_waiters_share_leader_failure(session_factory):
+    generator = QuestionGenerator()
+
+    async def _fail(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        raise TutorServiceError("busy")
+
+    with patch("app.services.claude_tutor.ClaudeTutor.chat", side_effect=_fail) as mock_chat:
+        results = await asyncio.gather(
+            *(_request(generator, session_factory, user_id) for user_id in range(1, 4)),
+            return_exceptions=True,
+        )
+    assert mock_chat.call_count == 1
+    assert all(isinstance(r, TutorServiceError) for r in results)
@@ -0,0 +1,75 @@
+"""Unit tests for the background question bank warmer."""
+
+import pytest
+from sqlalchemy import select, func
+
+from app.config import settings
+from app.models.question import Question
+from app.models.user_response import UserResponse
+from app.services.question_warmer import QuestionWarmer, difficulty_band, stock_window
+from tests.conftest import mock_claude_response
+from tests.test_questions import SAMPLE_QUESTION_JSON
+
+SECTION = "Chemical and Physical Foundations of Biological Systems"
+TOPIC = "General Chemistry"
+
+
+async def _count(session_factory) -> int:
+    async with session_factory() as db:
+        return (await db.execute(select(func.count(Question.id)))).scalar_one()
+
+
+def test_stock_window_serves_whole_band():
+    for band in range(3):
+        low, high = stock_window(band)
+        for difficulty in range(1, 11):
+            if difficulty_band(difficulty) == band:
+                assert max(1, difficulty - 2) <= low and high <= min(10, difficulty + 2)
+
+
+@pytest.mark.asyncio
+async def test_hot_bucket_is_filled_to_target(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "WARMER_BASE_STOCK", 0)
+    monkeypatch.setattr(settings, "WARMER_HOT_STOCK", 3)
+    warmer = QuestionWarmer(session_factory=session_factory)
+    warmer.record_request(1, SECTION, TOPIC, None, 5, "discrete")
+
+    with mock_claude_response(SAMPLE_QUESTION_JSON) as mock_chat:
+        assert await warmer.run_once() == 3
+        assert mock_chat.call_count == 3
+        # Stock is at target: nothing more to do
+        assert await warmer.run_once() == 0
+
+    async with session_factory() as db:
+        difficulties = (await db.execute(select(Question.difficulty))).scalars().all()
+    assert all(4 <= d <= 6 for d in difficulties)
+
+
+@pytest.mark.asyncio
+async def test_answered_questions_are_replenished(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "WARMER_BASE_STOCK", 0)
+    monkeypatch.setattr(settings, "WARMER_HOT_STOCK", 2)
+    warmer = QuestionWarmer(session_factory=session_factory)
+    warmer.record_request(7, SECTION, TOPIC, None, 2, "discrete")
+
+    with mock_claude_response(SAMPLE_QUESTION_JSON):
+        await warmer.run_once()
+        async with session_factory() as db:
+            question_id = (await db.execute(select(Question.id).limit(1))).scalar_one()
+            db.add(UserResponse(
+                user_id=7, question_id=question_id, selected_answer="B",
+                is_correct=True, xp_earned=10,
+            ))
+            await db.commit()
+        assert await warmer.run_once() == 1
+    assert await _count(session_factory) == 3
+
+
+@pytest.mark.asyncio
+async def test_unknown_topics_are_ignored(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "WARMER_BASE_STOCK", 0)
+    warmer = QuestionWarmer(session_factory=session_factory)
+    warmer.record_request(1, "Made Up", "Nonsense", None, 5, "discrete")
+    with mock_claude_response(SAMPLE_QUESTION_JSON) as mock_chat:
+        assert await warmer.run_once() == 0
+    mock_chat.assert_not_called()
@@ -4,7 +4,13 @@ import json
 
 import pytest
 from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
 
+from app.models.question import Question
+from app.models.question_cursor import QuestionCursor
+from app.models.tutor_memory import TutorMemory
+from app.models.user_response import UserResponse
+from app.services.question_generator import question_generator
 from tests.conftest import mock_claude_response
 
 SAMPLE_QUESTION_JSON = json.dumps({
@@ -189,6 +195,40 @@ async def test_duplicate_answer_rejected(client, auth_headers):
     assert resp.status_code == 409
 
 
+@pytest.mark.asyncio
+async def test_topic_level_answers_share_one_memory_row(client, auth_headers, db_session):
+    with mock_claude_response(_question_batch(2)):
+        resp = await client.post(
+            "/api/questions/practice-set",
+            headers=auth_headers,
+            json={
+                "section": "Chemical and Physical Foundations of Biological Systems",
+                "topic": "General Chemistry",
+                "difficulty": 5,
+                "count": 2,
+            },
+        )
+    first, second = [q["id"] for q in resp.json()]
+
+    await client.post(
+        "/api/questions/answer",
+        headers=auth_headers,
+        json={"question_id": first, "selected_answer": "B"},
+    )
+    resp = await client.post(
+        "/api/questions/answer",
+        headers=auth_headers,
+        json={"question_id": second, "selected_answer": "A"},
+    )
+    assert resp.json()["mastery_level"] == pytest.approx(0.03)
+
+    result = await db_session.execute(select(TutorMemory))
+    memories = result.scalars().all()
+    assert len(memories) == 1
+    assert memories[0].subtopic_id is None
+    assert (memories[0].attempt_count, memories[0].correct_count) == (2, 1)
+
+
 @pytest.mark.asyncio
 async def test_answer_nonexistent_question(client, auth_headers):
     resp = await client.post(
@@ -250,3 +290,172 @@ async def test_cached_question_reused(client, auth_headers):
     )
     assert resp2.status_code == 200
     assert resp2.json()["id"] == resp1.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_topic_names_are_normalized_to_taxonomy_nodes(
+    client, auth_headers, db_session
+):
+    with mock_claude_response(SAMPLE_QUESTION_JSON):
+        resp1 = await client.post(
+            "/api/questions/generate",
+            headers=auth_headers,
+            json={
+                "section": "Chemical and Physical Foundations of Biological Systems",
+                "topic": "General Chemistry",
+                "subtopic": "Acids and Bases",
+                "difficulty": 3,
+            },
+        )
+    # A differently spelled request lands in the same bucket
+    resp2 = await client.post(
+        "/api/questions/generate",
+        headers=auth_headers,
+        json={
+            "section": "chemical and physical foundations of biological systems",
+            "topic": "genral chemistry",
+            "subtopic": "acids & bases",
+            "difficulty": 3,
+        },
+    )
+    assert resp2.status_code == 200
+    assert resp2.json()["id"] == resp1.json()["id"]
+    assert resp2.json()["topic"] == "General Chemistry"
+
+    question = await db_session.get(Question, resp1.json()["id"])
+    assert question.topic_id is not None and question.subtopic_id is not None
+
+    resp = await client.post(
+        "/api/questions/generate",
+        headers=auth_headers,
+        json={"section": "Made Up", "topic": "Nonsense", "difficulty": 3},
+    )
+    assert resp.status_code == 422
+
+
+def _question_batch(n: int, invalid: int = 0) -> str:
+    items = [dict(json.loads(SAMPLE_QUESTION_JSON), stem=f"Question {i}") for i in range(n)]
+    for item in items[:invalid]:
+        item["correct_answer"] = "Z"
+    return json.dumps(items)
+
+
+@pytest.mark.asyncio
+async def test_practice_set_generates_in_one_call(client, auth_headers):
+    with mock_claude_response(_question_batch(4)) as mock_chat:
+        resp = await client.post(
+            "/api/questions/practice-set",
+            headers=auth_headers,
+            json={
+                "section": "Chemical and Physical Foundations of Biological Systems",
+                "topic": "General Chemistry",
+                "difficulty": 5,
+                "count": 4,
+            },
+        )
+    assert resp.status_code == 200
+    assert len({q["id"] for q in resp.json()}) == 4
+    assert mock_chat.call_count == 1
+    assert "4 distinct questions" in mock_chat.call_args.kwargs["user_message"]
+
+
+@pytest.mark.asyncio
+async def test_batch_retries_only_for_invalid_questions(db_session):
+    responses = [_question_batch(3, invalid=1), _question_batch(1)]
+    with patch(
+        "app.services.claude_tutor.ClaudeTutor.chat",
+        new_callable=AsyncMock,
+        side_effect=responses,
+    ) as mock_chat:
+        questions = await question_generator.generate_questions(
+            "Chemical and Physical Foundations of Biological Systems",
+            "General Chemistry", None, 5, "discrete", 3, db_session,
+        )
+    assert len(questions) == 3
+    assert all(q.id is not None for q in questions)
+    assert mock_chat.call_count == 2
+    # The retry asks only for the single missing question
+    retry_prompt = mock_chat.call_args_list[1].kwargs["user_message"]
+    assert "distinct questions" not in retry_prompt
+
+
+@pytest.mark.asyncio
+async def test_unanswered_lookup_advances_cursor(db_session):
+    section = "Chemical and Physical Foundations of Biological Systems"
+    with mock_claude_response(_question_batch(4)):
+        questions = await question_generator.generate_questions(
+            section, "General Chemistry", None, 5, "discrete", 4, db_session,
+        )
+    # Answer the first two and the last; the third is still open
+    for q in (questions[0], questions[1], questions[3]):
+        db_session.add(UserResponse(
+            user_id=1, question_id=q.id, selected_answer="B", is_correct=True,
+        ))
+    await db_session.flush()
+
+    found = await question_generator._find_unanswered(
+        1, section, "General Chemistry", None, 5, "discrete", 5, db_session,
+    )
+    assert [q.id for q in found] == [questions[2].id]
+    cursor = await db_session.scalar(
+        select(QuestionCursor.answered_through).where(QuestionCursor.user_id == 1)
+    )
+    assert cursor == questions[1].id
+
+    # Another user's lookup starts from the beginning
+    found = await question_generator._find_unanswered(
+        2, section, "General Chemistry", None, 5, "discrete", 5, db_session,
+    )
+    assert len(found) == 4
+
+
+@pytest.mark.asyncio
+async def test_answer_batch_grades_block_once(client, auth_headers):
+    with mock_claude_response(_question_batch(3)):
+        resp = await client.post(
+            "/api/questions/practice-set",
+            headers=auth_headers,
+            json={
+                "section": "Chemical and Physical Foundations of Biological Systems",
+                "topic": "General Chemistry",
+                "difficulty": 2,
+                "count": 3,
+            },
+        )
+    ids = [q["id"] for q in resp.json()]
+    answers = [
+        {"question_id": ids[0], "selected_answer": "B"},
+        {"question_id": ids[1], "selected_answer": "B"},
+        {"question_id": ids[2], "selected_answer": "C"},
+    ]
+
+    resp = await client.post(
+        "/api/questions/answer/batch", headers=auth_headers, json={"answers": answers}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [r["is_correct"] for r in data["results"]] == [True, True, False]
+    assert data["total_xp"] == 20
+    # One grouped mastery update: +0.05 +0.05 -0.02
+    assert all(r["mastery_level"] == pytest.approx(0.08) for r in data["results"])
+
+    # Resubmitting the block is a no-op and reports the recorded grading
+    answers[2]["selected_answer"] = "B"
+    resp = await client.post(
+        "/api/questions/answer/batch", headers=auth_headers, json={"answers": answers}
+    )
+    data = resp.json()
+    assert all(r["already_answered"] for r in data["results"])
+    assert [r["is_correct"] for r in data["results"]] == [True, True, False]
+    assert data["total_xp"] == 0
+    assert data["results"][0]["mastery_level"] == pytest.approx(0.08)
+
+
+@pytest.mark.asyncio
+async def test_answer_batch_unknown_question(client, auth_headers):
+    resp = await client.post(
+        "/api/questions/answer/batch",
+        headers=auth_headers,
+        json={"answers": [{"question_id": 99999, "selected_answer": "A"}]},
+    )
+    assert resp.status_code == 404
@@ -0,0 +1,122 @@
+"""Integration tests for full-text search endpoints."""
+
+import pytest
+
+from app.models.conversation import ConversationMessage
+from app.models.question import Question
+from app.services.search import match_expression
+from tests.conftest import mock_claude_response
+
+
+def test_match_expression_quotes_words():
+    assert match_expression('le "Chatelier" OR') == '"le" "Chatelier" "OR"*'
+    assert match_expression("  ?!  ") is None
+
+
+async def _add_messages(db, user_id, rows):
+    db.add_all([
+        ConversationMessage(user_id=user_id, role=role, content=content, topic=topic)
+        for role, content, topic in rows
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_search_messages_ranked_and_scoped(client, auth_headers, db_session):
+    await _add_messages(db_session, 1, [
+        ("assistant", "Le Chatelier's principle: a stressed equilibrium shifts to "
+                      "relieve the stress.", "General Chemistry"),
+        ("user", "Is Le Chatelier on the exam?", "Biochemistry"),
+        ("assistant", "Enzymes lower activation energy.", "Biochemistry"),
+    ])
+    await _add_messages(db_session, 2, [
+        ("assistant", "Le Chatelier and equilibrium, for someone else.", None),
+    ])
+
+    resp = await client.get(
+        "/api/tutor/search", headers=auth_headers, params={"q": "chatelier equilibrium"}
+    )
+    assert resp.status_code == 200
+    hits = resp.json()["hits"]
+    assert len(hits) == 1
+    assert "**Chatelier**" in hits[0]["snippet"]
+    assert hits[0]["score"] > 0
+
+    resp = await client.get(
+        "/api/tutor/search",
+        headers=auth_headers,
+        params={"q": "chatelier", "topic": "Biochemistry"},
+    )
+    assert [h["role"] for h in resp.json()["hits"]] == ["user"]
+
+
+@pytest.mark.asyncio
+async def test_search_sees_newly_saved_turns(client, auth_headers):
+    with mock_claude_response("Michaelis-Menten kinetics relate rate to substrate."):
+        await client.post(
+            "/api/tutor/chat", headers=auth_headers, json={"content": "Explain Km"}
+        )
+    resp = await client.get(
+        "/api/tutor/search", headers=auth_headers, params={"q": "michaelis"}
+    )
+    assert [h["role"] for h in resp.json()["hits"]] == ["assistant"]
+
+
+def _question(stem, topic="Biochemistry", difficulty=5, concepts=None, **kwargs):
+    return Question(
+        section="Biological and Biochemical Foundations",
+        topic=topic,
+        difficulty=difficulty,
+        stem=stem,
+        options={"A": "1", "B": "2", "C": "3", "D": "4"},
+        correct_answer="A",
+        explanation={"A": "Correct."},
+        concepts_tested=concepts,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_questions_ranked_and_filtered(client, auth_headers, db_session):
+    db_session.add_all([
+        _question("Which change increases an enzyme's Km?", concepts=["enzyme kinetics"]),
+        _question("A competitive inhibitor binds the active site.", difficulty=8,
+                  concepts=["enzyme inhibition"]),
+        _question("What is the pKa of acetic acid?", topic="General Chemistry",
+                  concepts=["acid-base chemistry"]),
+    ])
+    await db_session.commit()
+
+    resp = await client.get(
+        "/api/questions/search", headers=auth_headers, params={"q": "enzyme"}
+    )
+    assert resp.status_code == 200
+    hits = resp.json()["hits"]
+    assert len(hits) == 2
+    assert all(h["score"] > 0 for h in hits)
+    assert "**enzyme" in hits[0]["snippet"]
+    assert "correct_answer" not in hits[0]
+
+    resp = await client.get(
+        "/api/questions/search",
+        headers=auth_headers,
+        params={"q": "enzym", "min_difficulty": 7, "question_type": "discrete"},
+    )
+    assert [h["difficulty"] for h in resp.json()["hits"]] == [8]
+
+    resp = await client.get(
+        "/api/questions/search",
+        headers=auth_headers,
+        params={"q": "acid", "topic": "Biochemistry"},
+    )
+    assert resp.json()["hits"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_questions_rejects_inverted_difficulty(client, auth_headers):
+    resp = await client.get(
+        "/api/questions/search",
+        headers=auth_headers,
+        params={"q": "enzyme", "min_difficulty": 8, "max_difficulty": 3},
+    )
+    assert resp.status_code == 400
@@ -3,7 +3,14 @@
 import json
 
 import pytest
-
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.conversation import ConversationMessage
+from app.models.session import StudySession
+from app.models.tutor_memory import TutorMemory
+from app.services.escalation import ATTEMPTS_KEY, concept_attempts, record_attempt
+from app.services.taxonomy import taxonomy_registry
 from tests.conftest import mock_claude_response
 
 
@@ -29,6 +36,33 @@ async def test_socratic_chat_creates_session(client, auth_headers):
     assert "enzymes" in data["response"].lower()
 
 
+@pytest.mark.asyncio
+async def test_socratic_turns_count_toward_taxonomy_nodes(client, auth_headers, db_session):
+    section = "Biological and Biochemical Foundations of Living Systems"
+    # A misspelled subtopic, a concept that is not a node, and an unknown topic
+    for topic, concept in [
+        ("biochemistry", "enzyme kinetcs"),
+        ("Biochemistry", "Michaelis-Menten"),
+        ("Astrology", "Horoscopes"),
+    ]:
+        with mock_claude_response("What limits the rate?"):
+            resp = await client.post(
+                "/api/tutor/socratic",
+                headers=auth_headers,
+                json={"content": "Help", "section": section, "topic": topic, "concept": concept},
+            )
+        assert resp.status_code == 200
+
+    topic_id, subtopic_id = await taxonomy_registry.node_ids(
+        db_session, section, "Biochemistry", "Enzyme Kinetics"
+    )
+    result = await db_session.execute(
+        select(TutorMemory.topic_id, TutorMemory.subtopic_id, TutorMemory.attempt_count)
+        .order_by(TutorMemory.id)
+    )
+    assert result.all() == [(topic_id, subtopic_id, 1), (topic_id, None, 1)]
+
+
 @pytest.mark.asyncio
 async def test_socratic_chat_reuses_session(client, auth_headers):
     with mock_claude_response("Tell me more."):
@@ -120,3 +154,44 @@ async def test_socratic_requires_auth(client):
         },
     )
     assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_escalation_counter_rebuilt_from_history(db_session):
+    session = StudySession(user_id=1, mode="socratic")
+    db_session.add(session)
+    await db_session.flush()
+    for role in ("user", "assistant", "user", "assistant", "user"):
+        db_session.add(ConversationMessage(
+            user_id=1, session_id=session.id, role=role, content="x",
+            concept="Enzyme Kinetics",
+        ))
+    await db_session.flush()
+
+    assert await concept_attempts(db_session, session, "Enzyme Kinetics") == 3
+    assert session.state_snapshot[ATTEMPTS_KEY] == {"Enzyme Kinetics": 3}
+
+    assert await record_attempt(db_session, session, "Enzyme Kinetics") == 4
+    assert await record_attempt(db_session, session, "Km") == 1
+    assert await concept_attempts(db_session, session, "Enzyme Kinetics") == 4
+    assert await concept_attempts(db_session, session, "Km") == 1
+
+
+@pytest.mark.asyncio
+async def test_escalation_counter_survives_stale_snapshots(db_session):
+    session = StudySession(user_id=1, mode="socratic", state_snapshot={"other": 1})
+    db_session.add(session)
+    await db_session.flush()
+    loaded = dict(session.state_snapshot)
+
+    assert await record_attempt(db_session, session, "Km") == 1
+    # A concurrent turn still holding the snapshot from before that attempt
+    set_committed_value(session, "state_snapshot", loaded)
+    assert await record_attempt(db_session, session, "Km") == 2
+    assert await record_attempt(db_session, session, 'the "Km" of E.coli') == 1
+
+    await db_session.refresh(session)
+    assert session.state_snapshot == {
+        "other": 1,
+        ATTEMPTS_KEY: {"Km": 2, 'the "Km" of E.coli': 1},
+    }
@@ -0,0 +1,77 @@
+"""Integration tests for the SSE streaming tutor endpoints."""
+
+import json
+
+import pytest
+
+from tests.conftest import mock_claude_stream
+
+
+def _parse_sse(body: str):
+    """Return a list of (event, data) pairs from an SSE response body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_sends_tokens_and_saves_turn(client, auth_headers):
+    with mock_claude_stream(["What ", "limits ", "Vmax?"]):
+        resp = await client.post(
+            "/api/tutor/chat/stream",
+            headers=auth_headers,
+            json={"content": "Explain Vmax"},
+        )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(resp.text)
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert "".join(tokens) == "What limits Vmax?"
+    assert events[-1][0] == "done"
+    session_id = events[-1][1]["session_id"]
+
+    history = await client.get(
+        f"/api/tutor/history?session_id={session_id}", headers=auth_headers
+    )
+    messages = history.json()["messages"]
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+    assert messages[1]["content"] == "What limits Vmax?"
+
+
+@pytest.mark.asyncio
+async def test_socratic_stream_reports_escalation(client, auth_headers):
+    with mock_claude_stream(["What do you ", "know already?"]):
+        resp = await client.post(
+            "/api/tutor/socratic/stream",
+            headers=auth_headers,
+            json={
+                "content": "Help me with enzyme kinetics",
+                "section": "Biological and Biochemical Foundations of Living Systems",
+                "topic": "Biochemistry",
+                "concept": "Enzyme Kinetics",
+            },
+        )
+    assert resp.status_code == 200
+    event, done = _parse_sse(resp.text)[-1]
+    assert event == "done"
+    assert done["escalation_level"] == 1
+    assert done["concept"] == "Enzyme Kinetics"
+
+    history = await client.get(
+        f"/api/tutor/history?session_id={done['session_id']}", headers=auth_headers
+    )
+    assert len(history.json()["messages"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_invalid_session(client, auth_headers):
+    with mock_claude_stream(["unused"]):
+        resp = await client.post(
+            "/api/tutor/chat/stream",
+            headers=auth_headers,
+            json={"content": "hi", "session_id": 99999},
+        )
+    assert resp.status_code == 404
@@ -0,0 +1,115 @@
+"""Integration tests for the taxonomy endpoints."""
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models.question import Question
+from app.models.taxonomy import TaxonomyNode
+from app.services.taxonomy import taxonomy_registry
+
+SECTION = "Chemical and Physical Foundations of Biological Systems"
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_topics(client):
+    resp = await client.get("/api/taxonomy/search", params={"q": "enzym", "limit": 3})
+    assert resp.status_code == 200
+    matches = resp.json()["matches"]
+    assert matches[0]["subtopic"] == "Enzyme Kinetics"
+    assert len(matches[0]["sections"]) == 2
+    assert len(matches) <= 3
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_requires_query(client):
+    resp = await client.get("/api/taxonomy/search", params={"q": ""})
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_taxonomy_tree_is_cacheable(client):
+    resp = await client.get("/api/taxonomy")
+    assert resp.status_code == 200
+    sections = resp.json()["sections"]
+    assert len(sections) == 4
+    assert sections[0]["topics"][0]["subtopics"]
+    etag = resp.headers["etag"]
+    assert etag.startswith('"')
+    assert "max-age" in resp.headers["cache-control"]
+
+    resp = await client.get("/api/taxonomy", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+
+    resp = await client.get("/api/taxonomy", headers={"If-None-Match": '"stale"'})
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_taxonomy_levels(client):
+    resp = await client.get("/api/taxonomy/sections")
+    assert "Critical Analysis and Reasoning Skills" in resp.json()["sections"]
+
+    section = "Biological and Biochemical Foundations of Living Systems"
+    resp = await client.get("/api/taxonomy/topics", params={"section": section})
+    assert "Biochemistry" in resp.json()["topics"]
+
+    resp = await client.get(
+        "/api/taxonomy/subtopics", params={"section": section, "topic": "Biochemistry"}
+    )
+    assert "Enzyme Kinetics" in resp.json()["subtopics"]
+    # Distinct bodies get distinct ETags
+    assert resp.headers["etag"] != (await client.get("/api/taxonomy")).headers["etag"]
+
+    resp = await client.get("/api/taxonomy/topics", params={"section": "Fake"})
+    assert resp.status_code == 404
+
+
+def _stored_question(topic, subtopic, topic_id=None):
+    return Question(
+        section=SECTION, topic=topic, subtopic=subtopic, topic_id=topic_id,
+        difficulty=5, stem="Stem?", correct_answer="A",
+        options={"A": "1", "B": "2", "C": "3", "D": "4"},
+        explanation={"correct": "Because."},
+    )
+
+
+@pytest.mark.asyncio
+async def test_new_nodes_adopt_questions_stored_by_name(db_session):
+    await taxonomy_registry.load(db_session)
+    chemistry_id, _ = await taxonomy_registry.node_ids(
+        db_session, SECTION, "General Chemistry", None
+    )
+    physics_id, _ = await taxonomy_registry.node_ids(db_session, SECTION, "Physics", None)
+    # As if both were added to the taxonomy after these questions were stored
+    await db_session.execute(
+        delete(TaxonomyNode).where(
+            (TaxonomyNode.parent_id == chemistry_id)
+            & (TaxonomyNode.name == "Electrochemistry")
+        )
+    )
+    await db_session.execute(delete(TaxonomyNode).where(TaxonomyNode.parent_id == physics_id))
+    await db_session.execute(delete(TaxonomyNode).where(TaxonomyNode.id == physics_id))
+    db_session.add_all([
+        _stored_question("General Chemistry", "electrochemistry", topic_id=chemistry_id),
+        _stored_question("physics", "Magnetsim"),
+    ])
+    await db_session.commit()
+
+    taxonomy_registry.clear()
+    await taxonomy_registry.load(db_session)
+
+    _, electrochemistry_id = await taxonomy_registry.node_ids(
+        db_session, SECTION, "General Chemistry", "Electrochemistry"
+    )
+    physics_ids = await taxonomy_registry.node_ids(db_session, SECTION, "Physics", "Magnetism")
+    result = await db_session.execute(
+        select(Question.topic, Question.subtopic, Question.topic_id, Question.subtopic_id)
+        .order_by(Question.id)
+    )
+    assert result.all() == [
+        ("General Chemistry", "Electrochemistry", chemistry_id, electrochemistry_id),
+        ("Physics", "Magnetism", *physics_ids),
+    ]
+    assert None not in physics_ids
@@ -7,6 +7,7 @@ from app.utils.mcat_topics import (
     list_sections,
     list_topics,
     list_subtopics,
+    normalize_topic,
     search_topics,
     validate_topic,
 )
@@ -96,12 +97,50 @@ class TestMCATTopics:
         results = search_topics("xyznonexistent")
         assert results == []
 
+    def test_search_topics_tolerates_typos_and_prefixes(self):
+        results = search_topics("enzym kinetcs")
+        assert results[0]["subtopic"] == "Enzyme Kinetics"
+        assert search_topics("thermodynamcis")[0]["subtopic"].startswith("Thermodynamics")
+        assert search_topics("biochem")[0]["topic"] == "Biochemistry"
+
+    def test_search_topics_ranks_exact_names_first(self):
+        results = search_topics("kinetics")
+        assert [r.get("subtopic") for r in results[:2]] == ["Kinetics", "Enzyme Kinetics"]
+        assert all(r["score"] <= results[0]["score"] for r in results)
+
+    def test_search_topics_dedupes_across_sections(self):
+        results = search_topics("biochemistry")
+        topic_level = [r for r in results if "subtopic" not in r]
+        assert len(topic_level) == 1
+        assert len(topic_level[0]["sections"]) == 2
+        assert search_topics("a", limit=3) == search_topics("a")[:3]
+
     def test_validate_topic_true(self):
         assert validate_topic(
             "Chemical and Physical Foundations of Biological Systems",
             "General Chemistry",
         )
 
+    def test_normalize_topic_fixes_case_and_typos(self):
+        assert normalize_topic(
+            "chemical and physical foundations of biological systems",
+            "Genral  Chemistry",
+            "acids and bases",
+        ) == (
+            "Chemical and Physical Foundations of Biological Systems",
+            "General Chemistry",
+            "Acids and Bases",
+        )
+
+    def test_normalize_topic_keeps_free_text_subtopics(self):
+        names = normalize_topic(
+            "Biological and Biochemical Foundations of Living Systems",
+            "Biochemistry",
+            " Michaelis-Menten ",
+        )
+        assert names[2] == "Michaelis-Menten"
+        assert normalize_topic("Fake Section", "Biochemistry") is None
+
     def test_validate_topic_false_section(self):
         assert not validate_topic("Fake Section", "General Chemistry")
 